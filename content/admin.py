@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Blog, Research, ImageAsset
+from .models import Blog, Research, ImageAsset, Job
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -19,7 +19,7 @@ class BlogAdmin(admin.ModelAdmin):
     # ✅ Only include ForeignKey fields in autocomplete_fields
     autocomplete_fields = ("author",)  # 'featured_image' is now ImageField, not FK
     
-    readonly_fields = ("created_at", "updated_at",)
+    readonly_fields = ("created_at", "updated_at", "word_count", "reading_time")
     prepopulated_fields = {"slug": ("title",)}
 
 
@@ -32,5 +32,12 @@ class ResearchAdmin(admin.ModelAdmin):
     # ✅ Removed 'featured_image' from autocomplete_fields since it's now an ImageField
     autocomplete_fields = ()  # or remove this line entirely
     
-    readonly_fields = ("created_at", "updated_at",)
+    readonly_fields = ("created_at", "updated_at", "page_count", "file_size", "content_hash")
     prepopulated_fields = {"slug": ("title",)}
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "attempts", "run_after", "updated_at")
+    list_filter = ("status", "kind")
+    readonly_fields = ("created_at", "updated_at",)
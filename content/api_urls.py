@@ -1,15 +1,18 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from .views import BlogViewSet, ResearchViewSet, ImageAssetViewSet
+from .async_reads import async_read_urls
+from .views import BlogViewSet, ResearchViewSet, ImageAssetViewSet, JobViewSet
 
 router = DefaultRouter()
 router.register(r"blogs", BlogViewSet, basename="blog")
 router.register(r"research", ResearchViewSet, basename="research")
 router.register(r"images", ImageAssetViewSet, basename="images")
+router.register(r"jobs", JobViewSet, basename="job")
 
 urlpatterns = [
     path("auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
-    path("", include(router.urls)),
+    path("", include(async_read_urls(router.urls) if settings.ASYNC_READS else router.urls)),
 ]
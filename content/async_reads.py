@@ -0,0 +1,129 @@
+"""
+Async read path for the public blog and research endpoints.
+
+With ``ASYNC_READS`` on (the ASGI deployment, see zrcp_backend/asgi.py),
+``async_read_urls`` swaps the router's list and detail views for
+``async_read_view``. Anonymous JSON GETs are then answered on the event loop
+by the viewset's async actions (``alist``/``aretrieve``, chained through the
+same mixins as their sync versions), which reach the database through the
+async ORM: ``aaggregate`` for validators, ``acount`` and async iteration for
+pages, ``aget`` for objects. A request waiting on the database or the cache
+holds a coroutine, not a worker.
+
+Everything else (writes, requests carrying a token, the browsable API, extra
+actions) goes to the regular viewset in a thread, unchanged.
+
+The viewset still builds the queryset, negotiates, checks permissions and
+picks the serializer; for an anonymous request none of that queries. Rows
+arrive fully loaded (``select_related``, deferred columns are never
+rendered), so serializers run on the event loop without touching the
+database either.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.urls import URLPattern
+from rest_framework.response import Response
+
+ASYNC_ACTIONS = ("list", "retrieve")
+
+
+class AsyncReadMixin:
+    """Async ``list``/``retrieve`` and the dispatch that runs them; put it after the caching/conditional mixins."""
+
+    async def adispatch(self, request, *args, **kwargs):
+        """
+        ``dispatch()`` for the async actions, returning a rendered response;
+        None if the request has to be served by the sync view after all.
+        """
+        self.args, self.kwargs = args, kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            self.initial(request, *args, **kwargs)
+            if self.action not in ASYNC_ACTIONS or request.accepted_renderer.format != "json":
+                return None
+            response = await getattr(self, f"a{self.action}")(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        response = self.finalize_response(request, response, *args, **kwargs)
+        if isinstance(response, Response):
+            response.render()
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.alist_response(await self.afilter_queryset(self.get_queryset()))
+
+    async def alist_response(self, queryset):
+        """The response for an already filtered ``queryset``."""
+        if self.paginator is None:
+            return Response(self.get_serializer([obj async for obj in queryset], many=True).data)
+        page = await self.apaginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    async def apaginate_queryset(self, queryset):
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return Response(self.get_serializer(await self.aget_object()).data)
+
+    async def afilter_queryset(self, queryset):
+        for backend_class in self.filter_backends:
+            backend = backend_class()
+            if hasattr(backend, "afilter_queryset"):
+                queryset = await backend.afilter_queryset(self.request, queryset, self)
+            else:
+                queryset = backend.filter_queryset(self.request, queryset, self)
+        return queryset
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except queryset.model.DoesNotExist:
+            # Same messages as DRF's get_object_or_404
+            raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+def async_read_view(view):
+    """
+    Async wrapper around a router-generated viewset view: anonymous GETs of
+    the async actions run on the event loop, the rest goes to ``view``.
+    """
+    async def async_view(request, *args, **kwargs):
+        if (request.method == "GET" and view.actions.get("get") in ASYNC_ACTIONS
+                and "HTTP_AUTHORIZATION" not in request.META):
+            # Token authentication may query the user; only anonymous reads are async
+            viewset = view.cls(**view.initkwargs)
+            # As ViewSetMixin.as_view() does; the Allow header lists these
+            viewset.action_map = {"head": view.actions["get"], **view.actions}
+            for method, action in viewset.action_map.items():
+                setattr(viewset, method, getattr(viewset, action))
+            response = await viewset.adispatch(request, *args, **kwargs)
+            if response is not None:
+                return response
+        return await sync_to_async(view)(request, *args, **kwargs)
+
+    # What DRF's as_view() sets; schema generators and CsrfViewMiddleware read these
+    async_view.cls, async_view.initkwargs, async_view.actions = view.cls, view.initkwargs, view.actions
+    async_view.csrf_exempt = True
+    return async_view
+
+
+def async_read_urls(urlpatterns):
+    """Router URL patterns with the views of ``AsyncReadMixin`` viewsets' list/detail routes made async."""
+    patterns = []
+    for pattern in urlpatterns:
+        view = getattr(pattern, "callback", None)
+        cls = getattr(view, "cls", None)
+        if (cls is not None and issubclass(cls, AsyncReadMixin)
+                and getattr(view, "actions", {}).get("get") in ASYNC_ACTIONS):
+            pattern = URLPattern(pattern.pattern, async_read_view(view), pattern.default_args, pattern.name)
+        patterns.append(pattern)
+    return patterns
@@ -0,0 +1,129 @@
+"""
+JWT authentication that remembers validated tokens.
+
+``CachedJWTAuthentication`` behaves like simplejwt's ``JWTAuthentication``
+but, once a token has been verified and its user loaded, keeps the claims
+and the user's identity/permission flags in the API cache for
+``JWT_AUTH_CACHE_TIMEOUT`` seconds (never past the token's expiry). Repeat
+requests with the same token skip signature verification and the user
+query. Entries carry the user's generation counter, bumped from
+content.signals whenever the user is saved or deleted, so deactivating or
+demoting a user takes effect on their next request in every process that
+shares the API cache. With a per-process cache (LocMemCache) other workers
+keep their entries for up to ``JWT_AUTH_CACHE_TIMEOUT`` seconds; the
+content.W001 deploy check warns about that combination.
+
+``request.user`` on a cache hit is a ``User`` with only ``USER_FIELDS``
+loaded; any other attribute is fetched on first access. ``request.auth`` is
+an instance of the same simplejwt token class as on a miss, rebuilt from the
+cached claims without decoding the token again.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from .cache import get_cache
+
+USER_FIELDS = ("id", "username", "is_active", "is_staff", "is_superuser")
+
+
+def _generation_key(user_id):
+    return f"api:auth:user:{user_id}"
+
+
+def get_user_generation(user_id):
+    """Clock-seeded like content.cache.get_version, so an evicted counter never matches an old entry."""
+    cache = get_cache()
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key, time.time_ns())
+    return generation
+
+
+def bump_user_generation(user_id):
+    cache = get_cache()
+    key = _generation_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def cached_attnames(model):
+    # Model.from_db expects partial values in concrete field order
+    return [f.attname for f in model._meta.concrete_fields if f.name in USER_FIELDS]
+
+
+def token_cache_key(raw_token):
+    return f"api:auth:token:{hashlib.sha256(raw_token).hexdigest()}"
+
+
+def restore_token(token_class, raw_token, claims):
+    """A ``token_class`` instance for a token verified earlier, as Token.__init__ would leave it."""
+    token = token_class.__new__(token_class)
+    token.token = raw_token
+    token.current_time = aware_utcnow()
+    token.payload = claims
+    return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        timeout = settings.JWT_AUTH_CACHE_TIMEOUT
+        if not timeout:
+            return super().authenticate(request)
+
+        cache = get_cache()
+        key = token_cache_key(raw_token)
+        entry = cache.get(key)
+        if entry is not None:
+            cached = self.from_entry(entry, raw_token)
+            if cached is not None:
+                return cached
+            cache.delete(key)
+
+        validated_token = self.get_validated_token(raw_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        # Read the generation before the user row so a save in between invalidates this entry
+        generation = get_user_generation(user_id) if user_id is not None else None
+        user = self.get_user(validated_token)
+
+        exp = validated_token.get("exp")
+        ttl = timeout if exp is None else min(timeout, int(exp - time.time()))
+        if ttl > 0:
+            cache.set(key, {
+                "user_id": user_id,
+                "generation": generation,
+                "exp": exp,
+                "user": [getattr(user, attname) for attname in cached_attnames(type(user))],
+                "claims": dict(validated_token.payload),
+                "token_class": f"{type(validated_token).__module__}.{type(validated_token).__qualname__}",
+            }, ttl)
+        return user, validated_token
+
+    def from_entry(self, entry, raw_token):
+        if entry["exp"] is not None and entry["exp"] <= time.time():
+            return None
+        if "token_class" not in entry:
+            return None  # Written before token classes were recorded
+        if entry["generation"] != get_user_generation(entry["user_id"]):
+            return None
+        model = get_user_model()
+        user = model.from_db(router.db_for_read(model), cached_attnames(model), entry["user"])
+        return user, restore_token(import_string(entry["token_class"]), raw_token, entry["claims"])
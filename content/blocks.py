@@ -0,0 +1,176 @@
+"""
+Renderer for ``Blog.body`` block lists.
+
+Blocks are dicts with a ``type`` and their content either inline
+(``{"type": "paragraph", "text": ...}``) or under ``data`` (Editor.js style).
+``render(blocks)`` compiles them once, on save, to sanitized HTML, plaintext,
+a word count and a reading time so readers never re-walk the JSON.
+"""
+import math
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+from django.utils.html import strip_tags
+
+WORDS_PER_MINUTE = 200
+
+# Inline markup allowed inside block text, with the attributes kept per tag
+ALLOWED_TAGS = {
+    "a": {"href", "title"}, "b": set(), "strong": set(), "i": set(), "em": set(), "u": set(),
+    "s": set(), "mark": set(), "code": set(), "sub": set(), "sup": set(), "br": set(),
+}
+VOID_TAGS = {"br"}
+SAFE_SCHEMES = {"http", "https", "mailto", ""}
+
+# Keys in unknown blocks that hold markup/metadata rather than readable text
+NON_TEXT_KEYS = {
+    "type", "id", "url", "src", "href", "image", "image_id", "style", "level", "align", "width", "height",
+    "file", "withBorder", "stretched", "withBackground", "alignment",
+}
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.open = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in ALLOWED_TAGS:
+            return
+        kept = []
+        for name, value in attrs:
+            if name not in ALLOWED_TAGS[tag] or value is None:
+                continue
+            if name == "href" and urlparse(value.strip()).scheme.lower() not in SAFE_SCHEMES:
+                continue
+            kept.append(f' {name}="{escape(value)}"')
+        if tag == "a":
+            kept.append(' rel="noopener nofollow"')
+        self.out.append(f"<{tag}{''.join(kept)}>")
+        if tag not in VOID_TAGS:
+            self.open.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.open:
+            # Close anything left open inside it so the output stays well-formed
+            while self.open:
+                current = self.open.pop()
+                self.out.append(f"</{current}>")
+                if current == tag:
+                    break
+
+    def handle_data(self, data):
+        self.out.append(escape(data, quote=False))
+
+    def result(self):
+        self.close()
+        return "".join(self.out) + "".join(f"</{tag}>" for tag in reversed(self.open))
+
+
+def sanitize(value):
+    """Inline HTML with only ``ALLOWED_TAGS`` kept; everything else is escaped or dropped."""
+    if not isinstance(value, str):
+        value = "" if value is None else str(value)
+    parser = _Sanitizer()
+    parser.feed(value)
+    return parser.result()
+
+
+def safe_url(value):
+    value = (value or "").strip() if isinstance(value, str) else ""
+    return value if urlparse(value).scheme.lower() in {"http", "https"} or value.startswith("/") else ""
+
+
+def _text(value):
+    return re.sub(r"\s+", " ", strip_tags(value)).strip() if isinstance(value, str) else ""
+
+
+def _list_items(items):
+    for item in items or []:
+        # Editor.js nested lists use {"content": ..., "items": [...]}
+        yield item.get("content", "") if isinstance(item, dict) else item
+
+
+def render_block(block):
+    """(html, [text chunks]) for one block."""
+    if not isinstance(block, dict):
+        return "", []
+    kind = block.get("type", "paragraph")
+    data = block.get("data") if isinstance(block.get("data"), dict) else block
+
+    if kind in ("paragraph", "text"):
+        text = data.get("text", "")
+        return f"<p>{sanitize(text)}</p>", [_text(text)]
+    if kind in ("heading", "header"):
+        level = data.get("level", 2)
+        level = level if level in (1, 2, 3, 4, 5, 6) else 2
+        text = data.get("text", "")
+        return f"<h{level}>{sanitize(text)}</h{level}>", [_text(text)]
+    if kind == "list":
+        items = list(_list_items(data.get("items")))
+        tag = "ol" if data.get("style") == "ordered" or data.get("ordered") else "ul"
+        html = "".join(f"<li>{sanitize(item)}</li>" for item in items)
+        return f"<{tag}>{html}</{tag}>", [_text(item) for item in items]
+    if kind == "quote":
+        text, caption = data.get("text", ""), data.get("caption", "")
+        cite = f"<cite>{sanitize(caption)}</cite>" if caption else ""
+        return f"<blockquote><p>{sanitize(text)}</p>{cite}</blockquote>", [_text(text), _text(caption)]
+    if kind == "image":
+        file = data.get("file")
+        url = safe_url(data.get("url") or data.get("src") or (file.get("url") if isinstance(file, dict) else None))
+        caption = data.get("caption", "")
+        alt = _text(data.get("alt") or caption)
+        if not url:
+            return "", [_text(caption)]
+        figcaption = f"<figcaption>{sanitize(caption)}</figcaption>" if caption else ""
+        img = f'<img src="{escape(url)}" alt="{escape(alt)}" loading="lazy">'
+        return f"<figure>{img}{figcaption}</figure>", [_text(caption)]
+    if kind == "code":
+        code = data.get("code", data.get("text", ""))
+        return f"<pre><code>{escape(code if isinstance(code, str) else '')}</code></pre>", [_text(code)]
+    if kind in ("delimiter", "divider"):
+        return "<hr>", []
+
+    # Unknown block: keep its readable text, never its markup
+    chunks = []
+
+    def walk(value, key=None):
+        if key in NON_TEXT_KEYS:
+            return
+        if isinstance(value, str):
+            text = _text(value)
+            if text and not text.startswith(("http://", "https://")):
+                chunks.append(text)
+        elif isinstance(value, dict):
+            for k, v in value.items():
+                walk(v, k)
+        elif isinstance(value, (list, tuple)):
+            for v in value:
+                walk(v)
+
+    walk(data)
+    return "".join(f"<p>{escape(chunk, quote=False)}</p>" for chunk in chunks), chunks
+
+
+def render_text(blocks):
+    """Plaintext of a block list, one chunk per line."""
+    return render(blocks)["text"]
+
+
+def render(blocks):
+    html, chunks = [], []
+    for block in blocks if isinstance(blocks, list) else []:
+        block_html, block_chunks = render_block(block)
+        html.append(block_html)
+        chunks.extend(chunk for chunk in block_chunks if chunk)
+    text = "\n".join(chunks)
+    words = len(text.split())
+    return {
+        "html": "".join(html),
+        "text": text,
+        "word_count": words,
+        "reading_time": math.ceil(words / WORDS_PER_MINUTE) if words else 0,
+    }
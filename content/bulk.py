@@ -0,0 +1,138 @@
+"""
+List-accepting bulk endpoints: ``POST``/``PATCH`` ``/api/<resource>/bulk/``.
+
+Every item is validated first, with related objects fetched in one query per
+relation; if any item fails, nothing is written and the response lists the
+errors by index. Otherwise all rows go in with one ``bulk_create`` (slugs
+allocated in batch by ``ContentQuerySet``) or ``bulk_update`` inside a single
+transaction, followed by the cache, search and export bookkeeping the
+per-row signals would have done.
+"""
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .serializers import PrefetchedPrimaryKeyRelatedField
+from .signals import bulk_saved
+
+
+def as_pk(value):
+    """Integer primary key from JSON/form input, or None."""
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class BulkMixin:
+    bulk_batch_size = 500
+
+    @action(detail=False, methods=["post", "patch"], url_path="bulk")
+    def bulk(self, request):
+        items = self.bulk_items(request)
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"detail": "Expected a non-empty list of items."})
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise ValidationError({"detail": f"At most {settings.BULK_MAX_ITEMS} items per request."})
+        if request.method == "POST":
+            return self.bulk_create(items)
+        return self.bulk_update(items)
+
+    def bulk_items(self, request):
+        return request.data
+
+    def bulk_context(self, items):
+        """Serializer context with every referenced related object fetched up front."""
+        context = self.get_serializer_context()
+        related = {}
+        for name, field in self.get_serializer_class()().fields.items():
+            if not isinstance(field, PrefetchedPrimaryKeyRelatedField) or field.read_only:
+                continue
+            pks = {as_pk(item.get(name)) for item in items if isinstance(item, dict)} - {None}
+            model = field.get_queryset().model
+            related.setdefault(model, {}).update(field.get_queryset().in_bulk(pks))
+        context["related_objects"] = related
+        return context
+
+    def validate_items(self, items, instances=None):
+        context = self.bulk_context(items)
+        serializer_class = self.get_serializer_class()
+        serializers, errors = [], []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({"index": index, "errors": {"non_field_errors": ["Expected an object."]}})
+                continue
+            if instances is None:
+                serializer = serializer_class(data=item, context=context)
+            else:
+                instance = instances.get(as_pk(item.get("id")))
+                if instance is None:
+                    errors.append({"index": index, "errors": {"id": ["Not found."]}})
+                    continue
+                serializer = serializer_class(instance, data=item, partial=True, context=context)
+            if serializer.is_valid():
+                serializers.append(serializer)
+            else:
+                errors.append({"index": index, "errors": serializer.errors})
+        return serializers, context, errors
+
+    @staticmethod
+    def errors_response(errors):
+        return Response({"detail": "No items were saved.", "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    def bulk_create(self, items):
+        serializers, context, errors = self.validate_items(items)
+        if errors:
+            return self.errors_response(errors)
+        model = self.get_queryset().model
+        objs = [model(**serializer.validated_data) for serializer in serializers]
+        retries = getattr(model, "SLUG_RETRIES", 1)
+        for attempt in range(retries):
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create(objs, batch_size=self.bulk_batch_size)
+                    bulk_saved(model, objs)
+                break
+            except IntegrityError:
+                # A concurrent writer took one of the allocated slugs; allocate again
+                if attempt == retries - 1 or not hasattr(model, "SLUG_RETRIES"):
+                    raise
+                for obj in objs:
+                    obj.pk, obj.slug, obj._state.adding = None, "", True
+        data = self.get_serializer_class()(objs, many=True, context=context).data
+        return Response({"count": len(objs), "results": data}, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, items):
+        ids = [item.get("id") for item in items if isinstance(item, dict)]
+        queryset = self.get_queryset()
+        instances = queryset.in_bulk({as_pk(pk) for pk in ids} - {None})
+        serializers, context, errors = self.validate_items(items, instances)
+        if errors:
+            return self.errors_response(errors)
+
+        model = queryset.model
+        fields = {"updated_at"}
+        now = timezone.now()
+        objs = []
+        for serializer in serializers:
+            obj = serializer.instance
+            for attr, value in serializer.validated_data.items():
+                setattr(obj, attr, value)
+                fields.add(attr)
+            # bulk_update does not run auto_now or save()
+            obj.updated_at = now
+            if hasattr(obj, "denormalize"):
+                obj.denormalize()
+            objs.append(obj)
+        fields.update(getattr(model, "RENDERED_FIELDS", ()))
+        with transaction.atomic():
+            model.objects.bulk_update(objs, sorted(fields), batch_size=self.bulk_batch_size)
+            bulk_saved(model, objs)
+        data = self.get_serializer_class()(objs, many=True, context=context).data
+        return Response({"count": len(objs), "results": data})
@@ -0,0 +1,139 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _version_key(model):
+    return f"api:version:{model._meta.label_lower}"
+
+
+def get_version(model):
+    """
+    Current version counter for a model. Seeded from the clock so a counter
+    that was evicted never reuses a number an older cached response was
+    stored under.
+    """
+    cache = get_cache()
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key, time.time_ns())
+    return version
+
+
+def bump_version(model):
+    cache = get_cache()
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def response_cache_key(request, prefix, models):
+    versions = ".".join(str(get_version(m)) for m in models)
+    staff = int(bool(request.user and request.user.is_staff))
+    query = "&".join(sorted(f"{k}={v}" for k, values in request.query_params.lists() for v in values))
+    digest = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+    return f"api:response:{prefix}:{versions}:{staff}:{digest}"
+
+
+class CachedResponseMixin:
+    """
+    Serve rendered list/retrieve responses from the cache. Keys embed the
+    version counters of ``cache_models`` (bumped in content.signals), so any
+    save/delete of a dependency invalidates every cached page at once.
+    ``cache_timeout`` lets a view expire entries sooner than
+    ``API_CACHE_TIMEOUT``.
+    """
+    cache_models = ()
+    cache_prefix = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.response_cache_key(request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+        cached = get_cache().get(key)
+        if cached is not None:
+            return self.response_from_cache(request, cached)
+        response = handler(request, *args, **kwargs)
+        return self.store_on_render(key, response, self.cache_timeout() if response.status_code == 200 else 0)
+
+    # Async twins for content.async_reads. The API cache is in-process or on
+    # local disk (settings.CACHES), so it is read and written synchronously.
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(super().alist, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(super().aretrieve, request, *args, **kwargs)
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        key = self.response_cache_key(request)
+        if key is None:
+            return await handler(request, *args, **kwargs)
+        cached = get_cache().get(key)
+        if cached is not None:
+            return self.response_from_cache(request, cached)
+        response = await handler(request, *args, **kwargs)
+        return self.store_on_render(key, response, await self.acache_timeout() if response.status_code == 200 else 0)
+
+    def response_cache_key(self, request):
+        """Cache key for this request, or None when it must not be cached."""
+        # Only cache plain JSON; the browsable API embeds per-user forms
+        if request.accepted_renderer.format != "json" or not settings.API_CACHE_TIMEOUT:
+            return None
+        return response_cache_key(request, self.cache_prefix or self.basename, self.cache_models)
+
+    @staticmethod
+    def response_from_cache(request, cached):
+        content, headers = cached
+        not_modified = get_conditional_response(
+            request,
+            etag=headers.get("ETag"),
+            last_modified=parse_http_date_safe(headers.get("Last-Modified", "")),
+        )
+        if not_modified is not None:
+            for name in ("ETag", "Last-Modified"):
+                if name in headers:
+                    not_modified[name] = headers[name]
+            return not_modified
+        headers = dict(headers)
+        response = HttpResponse(content, content_type=headers.pop("Content-Type"))
+        for name, value in headers.items():
+            response[name] = value
+        response["X-Cache"] = "HIT"
+        return response
+
+    def cache_timeout(self):
+        """Seconds a response of this view is cached for."""
+        return settings.API_CACHE_TIMEOUT
+
+    async def acache_timeout(self):
+        return settings.API_CACHE_TIMEOUT
+
+    @staticmethod
+    def store_on_render(key, response, timeout):
+        if response.status_code == 200 and timeout:
+            def store(rendered):
+                headers = {name: value for name, value in rendered.items() if name not in ("Vary", "Allow")}
+                get_cache().set(key, (rendered.content, headers), timeout)
+            response.add_post_render_callback(store)
+            response["X-Cache"] = "MISS"
+        return response
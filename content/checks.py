@@ -0,0 +1,42 @@
+"""
+System checks for settings the content app relies on. Registered from
+ContentConfig.ready.
+"""
+from django.conf import settings
+from django.core import checks
+
+PER_PROCESS_CACHES = ("django.core.cache.backends.locmem.LocMemCache",)
+# Caches that cannot carry state from one request to a later one in another worker
+UNSHARED_CACHES = (*PER_PROCESS_CACHES, "django.core.cache.backends.dummy.DummyCache")
+
+
+def api_cache_backend():
+    return settings.CACHES[settings.API_CACHE_ALIAS]["BACKEND"]
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_jwt_auth_cache(app_configs, **kwargs):
+    # Generation bumps only reach the process that made them
+    if settings.JWT_AUTH_CACHE_TIMEOUT and api_cache_backend() in PER_PROCESS_CACHES:
+        return [checks.Warning(
+            "JWT_AUTH_CACHE_TIMEOUT is set but the API cache is per process.",
+            hint=("Other workers keep accepting a deactivated or demoted user's cached token for up to "
+                  "JWT_AUTH_CACHE_TIMEOUT seconds. Set CACHE_BACKEND to a shared cache (e.g. Redis or "
+                  "Memcached) or JWT_AUTH_CACHE_TIMEOUT=0."),
+            id="content.W001",
+        )]
+    return []
+
+
+@checks.register(checks.Tags.caches, checks.Tags.database)
+def check_replica_pin_cache(app_configs, **kwargs):
+    # content.routers keeps read-your-writes pins in the API cache
+    if settings.DATABASE_REPLICAS and api_cache_backend() in UNSHARED_CACHES:
+        return [checks.Error(
+            "DATABASE_REPLICA_URLS is set but the API cache is not shared between workers.",
+            hint=("Writes pin their models' reads to the primary through the API cache; without a shared "
+                  "cache other workers read lagging replicas right after a save. Set CACHE_BACKEND to a "
+                  "shared cache (e.g. Redis, Memcached or FileBasedCache with CACHE_LOCATION)."),
+            id="content.E001",
+        )]
+    return []
@@ -0,0 +1,110 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .published import feed_item_field
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Emit strong ETag/Last-Modified validators on list and retrieve, and answer
+    If-None-Match/If-Modified-Since with 304 before anything is serialized.
+
+    Lists are validated by the count and max ``updated_at`` of the filtered
+    queryset; detail responses by the object's pk and ``updated_at``. Both
+    also take the ``updated_at`` of ``validator_relations``, the related
+    objects serialized inline (content.signals touches blogs whose author
+    is renamed, so the author needs no stamp of its own).
+    """
+    validator_relations = ()
+
+    def list_validators(self, queryset):
+        return self.stats_validators(queryset.order_by().aggregate(**self.list_stats(queryset)))
+
+    async def alist_validators(self, queryset):
+        return self.stats_validators(await queryset.order_by().aaggregate(**self.list_stats(queryset)))
+
+    def list_stats(self, queryset):
+        # Published feed rows (content.published) reach the relations through their item
+        item_field = feed_item_field(queryset.model)
+        prefix = f"{item_field}__" if item_field else ""
+        stats = {"last": Max("updated_at"), "count": Count("pk")}
+        for name in self.validator_relations:
+            stats[f"last_{name}"] = Max(f"{prefix}{name}__updated_at")
+        return stats
+
+    def stats_validators(self, stats):
+        last = max(filter(None, [stats["last"], *(stats[f"last_{name}"] for name in self.validator_relations)]),
+                   default=None)
+        last = last.timestamp() if last else None
+        etag = make_etag(self.basename, "list", self._representation(), stats["count"], last)
+        return etag, int(last) if last is not None else None
+
+    def object_validators(self, instance):
+        related = [getattr(instance, name) for name in self.validator_relations]
+        last = max([instance.updated_at] + [obj.updated_at for obj in related if obj is not None]).timestamp()
+        etag = make_etag(self.basename, instance.pk, self._representation(), last)
+        return etag, int(last)
+
+    def _representation(self):
+        staff = bool(self.request.user and self.request.user.is_staff)
+        return f"{self.request.accepted_renderer.format}:{int(staff)}"
+
+    def list(self, request, *args, **kwargs):
+        # Filtered (and search-ranked) once, for the validators and the page
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified = self.list_validators(queryset)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+        return set_validators(self.list_response(queryset), etag, last_modified)
+
+    def list_response(self, queryset):
+        """ListModelMixin.list for an already filtered queryset."""
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.object_validators(instance)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), etag, last_modified)
+
+    # Async twins for content.async_reads; the chain ends in AsyncReadMixin
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        etag, last_modified = await self.alist_validators(queryset)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+        return set_validators(await self.alist_response(queryset), etag, last_modified)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        etag, last_modified = self.object_validators(instance)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), etag, last_modified)
@@ -0,0 +1,168 @@
+"""
+Text extraction for research documents.
+
+``extract()`` reads ``Research.file`` once in chunks to record its size and
+SHA-256, then walks the PDF a page at a time with pypdf, which seeks to the
+objects each page needs rather than loading the file. Every page's text
+becomes a ``SearchEntry`` (page 1..n) written in batches as it is produced,
+so content.search can rank items by what their documents say and return
+page-level hits without opening the file at request time.
+
+Extraction is keyed by content: ``extracted_hash`` is the ``content_hash``
+the pages were taken from, so re-uploading the same bytes is a no-op. It
+runs after an upload commits (content.signals), in the process that saved
+the file since a job worker may not see that process's storage; with
+``RESEARCH_EXTRACT_ASYNC`` it is queued as the ``extract_research_text``
+job instead. ``manage.py extract_research_text`` covers existing files.
+
+Files that are not PDFs, or when pypdf is not installed, still get their
+size and hash; they just have no pages.
+"""
+import hashlib
+import logging
+import tempfile
+from contextlib import contextmanager
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .media import HASH_CHUNK_SIZE
+
+try:
+    import pypdf
+except ImportError:  # optional: only size and hash are recorded without it
+    pypdf = None
+
+logger = logging.getLogger(__name__)
+
+PAGE_BATCH_SIZE = 50
+# Scanned pages can decode to megabytes of noise; the index only needs words
+MAX_PAGE_CHARS = 100_000
+
+
+@contextmanager
+def local_copy(fieldfile):
+    """
+    Yield ``(file, sha256, size)`` for ``fieldfile``: a seekable local file
+    to parse, read once to hash it. Storages without a local file are
+    copied to a temporary file in chunks on the way.
+    """
+    digest, size = hashlib.sha256(), 0
+    try:
+        fh = open(fieldfile.path, "rb")
+    except (NotImplementedError, FileNotFoundError):
+        # No local path, or one that is only nominal (e.g. InMemoryStorage)
+        fh = None
+    if fh is not None:
+        with fh:
+            for chunk in iter(lambda: fh.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                size += len(chunk)
+            fh.seek(0)
+            yield fh, digest.hexdigest(), size
+        return
+
+    with tempfile.TemporaryFile() as copy:
+        fieldfile.open("rb")
+        try:
+            for chunk in fieldfile.chunks(HASH_CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+                copy.write(chunk)
+        finally:
+            fieldfile.close()
+        copy.seek(0)
+        yield copy, digest.hexdigest(), size
+
+
+def is_pdf(fh):
+    head = fh.read(1024)
+    fh.seek(0)
+    return b"%PDF-" in head
+
+
+def page_texts(fh):
+    """Yield the text of each page of the PDF in ``fh``; unreadable pages yield ""."""
+    reader = pypdf.PdfReader(fh)
+    if reader.is_encrypted:
+        # Many reports are "encrypted" with an empty password just to set permissions
+        reader.decrypt("")
+    for number, page in enumerate(reader.pages, start=1):
+        try:
+            text = page.extract_text() or ""
+        except Exception as e:
+            logger.warning("Could not extract page %s: %s", number, e)
+            text = ""
+        yield " ".join(text[:MAX_PAGE_CHARS].replace("\x00", "").split())
+
+
+def store_pages(research, texts):
+    """Upsert one page entry per text in batches; drop pages past the end. Returns the page count."""
+    from .models import SearchEntry
+
+    kind = research._meta.model_name
+    count, batch = 0, []
+
+    def flush():
+        SearchEntry.objects.bulk_create(
+            batch, update_conflicts=True, unique_fields=["kind", "object_id", "page"], update_fields=["text", "title"],
+        )
+        batch.clear()
+
+    for count, text in enumerate(texts, start=1):
+        batch.append(SearchEntry(kind=kind, object_id=research.pk, page=count, title="", text=text))
+        if len(batch) >= PAGE_BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+    SearchEntry.objects.filter(kind=kind, object_id=research.pk, page__gt=count).delete()
+    return count
+
+
+def clear_pages(research):
+    from .models import SearchEntry
+
+    SearchEntry.objects.filter(kind=research._meta.model_name, object_id=research.pk, page__gt=0).delete()
+
+
+def extract(research):
+    """
+    Hash, measure and index the pages of ``research.file``, then store the
+    stats on the row. Returns them as a dict.
+    """
+    from .signals import bulk_saved  # content.signals queues this module's job
+
+    if not research.file:
+        clear_pages(research)
+        stats = {"page_count": None, "file_size": None, "content_hash": "", "extracted_hash": ""}
+    else:
+        with local_copy(research.file) as (fh, content_hash, size):
+            page_count = None
+            if pypdf is not None and is_pdf(fh):
+                try:
+                    page_count = store_pages(research, page_texts(fh))
+                except pypdf.errors.PdfReadError as e:
+                    logger.warning("Could not read the PDF of research %s: %s", research.pk, e)
+            if page_count is None:
+                clear_pages(research)
+        stats = {"page_count": page_count, "file_size": size, "content_hash": content_hash,
+                 "extracted_hash": content_hash}
+
+    # Only if the file is still the one that was read; a newer upload has
+    # its own extraction queued. No save(), so post_save queues nothing.
+    current = Q(file=research.file.name) if research.file else Q(file="") | Q(file__isnull=True)
+    now = timezone.now()
+    updated = type(research).objects.filter(current, pk=research.pk).update(updated_at=now, **stats)
+    if updated:
+        for name, value in stats.items():
+            setattr(research, name, value)
+        research.updated_at = now
+        bulk_saved(type(research), [research])
+    return stats
+
+
+def needs_extraction(research):
+    """Whether the pages indexed for ``research`` are not those of its current file."""
+    if not research.file:
+        return bool(research.extracted_hash)
+    return not research.extracted_hash or research.extracted_hash != research.content_hash
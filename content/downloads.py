@@ -0,0 +1,152 @@
+"""
+Streaming file delivery with HTTP Range support.
+
+Full responses go through ``FileResponse`` so the WSGI server can hand the
+open file to ``sendfile()``; single byte ranges are streamed from a seek in
+fixed-size chunks. Either way a document is never read whole into memory.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework import renderers
+
+from .conditional import make_etag
+from .renderers import FastJSONRenderer
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class PassthroughRenderer(renderers.BaseRenderer):
+    """
+    Lets a view return raw file responses whatever the client Accepts. It
+    cannot encode error bodies: views using it render those with
+    ``FileDownloadMixin``.
+    """
+    media_type = "*/*"
+    format = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class FileDownloadMixin:
+    """Renders errors of ``download_actions`` as JSON instead of through ``PassthroughRenderer``."""
+    download_actions = ("download",)
+
+    def handle_exception(self, exc):
+        if getattr(self, "action", None) in self.download_actions:
+            self.request.accepted_renderer = FastJSONRenderer()
+            self.request.accepted_media_type = FastJSONRenderer.media_type
+        return super().handle_exception(exc)
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single-range ``Range`` header, None to send
+    the whole file (absent, malformed or multi-range), or False if the range
+    cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def iter_range(fh, start, length, chunk_size=CHUNK_SIZE):
+    try:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def open_file(storage, name):
+    try:
+        return storage.open(name, "rb")
+    except OSError:
+        raise Http404("The file of this item is missing.")
+
+
+def serve_file(request, field_file, public=True, max_age=None):
+    """
+    Respond with ``field_file`` honouring If-None-Match, If-Range and Range.
+    Non-public files (e.g. drafts served to staff) are marked private.
+    """
+    name = field_file.name
+    if name.startswith(("http://", "https://")):
+        # Already migrated to a remote store, which serves ranges itself
+        return HttpResponseRedirect(name)
+
+    storage = field_file.storage
+    try:
+        size = storage.size(name)
+        modified = storage.get_modified_time(name).timestamp()
+    except OSError:
+        # The row outlived its file (ephemeral disk, deduplicated media)
+        raise Http404("The file of this item is missing.")
+    etag = make_etag(name, size, modified)
+    max_age = settings.DOWNLOAD_CACHE_MAX_AGE if max_age is None else max_age
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(modified))
+    if not_modified is not None:
+        return _with_validators(not_modified, etag, modified, public, max_age)
+
+    byte_range = parse_range(request.META.get("HTTP_RANGE"), size)
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range and if_range != etag:
+        byte_range = None
+
+    filename = os.path.basename(name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    elif byte_range is None:
+        response = FileResponse(open_file(storage, name), content_type=content_type, filename=filename)
+        response["Content-Length"] = size
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            iter_range(open_file(storage, name), start, length), status=206, content_type=content_type,
+        )
+        response["Content-Length"] = length
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Disposition"] = f'inline; filename="{filename}"'
+    response["Accept-Ranges"] = "bytes"
+    return _with_validators(response, etag, modified, public, max_age)
+
+
+def _with_validators(response, etag, modified, public, max_age):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(modified)
+    if public:
+        patch_cache_control(response, public=True, max_age=max_age)
+    else:
+        patch_cache_control(response, private=True, max_age=0)
+    return response
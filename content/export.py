@@ -0,0 +1,182 @@
+"""
+Pre-rendered static JSON copies of the public API.
+
+``build()`` writes the published blog and research list pages and one detail
+document per object under ``STATIC_EXPORT_ROOT``::
+
+    blogs/index.json, blogs/page-2.json, ...   (same shape as /api/blogs/?page=N)
+    blogs/<slug>.json                           (same shape as /api/blogs/<id>/)
+    research/...
+
+each with ``.gz`` and (when the ``brotli`` package is installed) ``.br``
+siblings, so WhiteNoise or any static host can serve them pre-compressed.
+A manifest records every exported object's ``updated_at`` (and its featured
+image's), so later builds only re-render what changed and remove what was
+unpublished or deleted. RSS/Atom feeds and sitemaps of the same content
+are brought up to date alongside (content.syndication).
+"""
+import gzip
+import json
+import math
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Blog, Research
+from .renderers import FastJSONRenderer
+from .serializers import BlogListSerializer, BlogSerializer, ResearchListSerializer, ResearchSerializer
+from .syndication import STATE as SYNDICATION_STATE, SyndicationBuilder
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are written without it
+    brotli = None
+
+MANIFEST = "manifest.json"
+
+
+class ExportTarget:
+    def __init__(self, name, model, serializer_class, list_serializer_class, select_related, deferred, ordering):
+        self.name = name
+        self.model = model
+        self.serializer_class = serializer_class
+        self.list_serializer_class = list_serializer_class
+        self.select_related = select_related
+        self.deferred = deferred
+        self.ordering = ordering
+
+    def published(self):
+        # What the public API lists: the published feed (content.published)
+        return self.model.objects.filter(published_entry__isnull=False)
+
+    def stamps(self):
+        """{pk: [slug, stamp]} for every published object (JSON-friendly for the manifest)."""
+        rows = self.published().values_list("pk", "slug", "updated_at", "featured_image__updated_at")
+        return {
+            str(pk): [slug, max(filter(None, [updated, image_updated])).isoformat()]
+            for pk, slug, updated, image_updated in rows.iterator(chunk_size=2000)
+        }
+
+
+TARGETS = [
+    ExportTarget("blogs", Blog, BlogSerializer, BlogListSerializer, ("author", "featured_image"),
+                 ("body", "body_html", "body_text"), ("-published_at", "-created_at", "-id")),
+    ExportTarget("research", Research, ResearchSerializer, ResearchListSerializer, ("featured_image",),
+                 ("description",), ("-created_at", "-id")),
+]
+
+
+def compress(data):
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    return variants
+
+
+def write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A unique temporary name, so concurrent builds never write into each other's file
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as tmp:
+        tmp.write(data)
+    try:
+        os.chmod(tmp.name, 0o644)  # mkstemp creates 0600 files; keep exports readable by a front server
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+
+def remove(path):
+    for name in (path, path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")):
+        name.unlink(missing_ok=True)
+
+
+class StaticExporter:
+    def __init__(self, root=None, page_size=None):
+        self.root = Path(root or settings.STATIC_EXPORT_ROOT)
+        self.page_size = page_size or settings.REST_FRAMEWORK["PAGE_SIZE"]
+        self.url = settings.STATIC_EXPORT_URL
+        self.renderer = FastJSONRenderer()
+        self.written = self.removed = 0
+
+    def write(self, relative, data):
+        self.write_bytes(relative, self.renderer.render(data))
+
+    def write_bytes(self, relative, content):
+        path = self.root / relative
+        write_atomic(path, content)
+        for suffix, compressed in compress(content).items():
+            write_atomic(path.with_name(path.name + suffix), compressed)
+        self.written += 1
+
+    def discard(self, relative):
+        remove(self.root / relative)
+        self.removed += 1
+
+    def load_manifest(self):
+        try:
+            return json.loads((self.root / MANIFEST).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def build(self, full=False):
+        """Export changed objects (everything with ``full``); returns counts."""
+        manifest = self.load_manifest()
+        if manifest.get("page_size") != self.page_size:
+            full = True
+        started = timezone.now()
+        for target in TARGETS:
+            manifest[target.name] = self.build_target(target, manifest.get(target.name, {}), full)
+        # Feeds and sitemaps of the same content
+        syndication = SyndicationBuilder(self).build(full)
+        write_atomic(self.root / SYNDICATION_STATE, json.dumps(syndication).encode())
+        manifest.update(page_size=self.page_size, built_at=started.isoformat())
+        # Written last: an interrupted build is simply redone next time
+        write_atomic(self.root / MANIFEST, json.dumps(manifest, indent=1).encode())
+        return {"written": self.written, "removed": self.removed}
+
+    def build_target(self, target, previous, full):
+        current = target.stamps()
+        changed = [pk for pk, entry in current.items() if full or previous.get(pk) != entry]
+        slugs = {slug for slug, _ in current.values()}
+        gone = [slug for slug, _ in previous.values() if slug not in slugs]
+
+        for slug in gone:
+            remove(self.root / target.name / f"{slug}.json")
+            self.removed += 1
+        queryset = target.published().select_related(*target.select_related)
+        for start in range(0, len(changed), 200):
+            for obj in queryset.filter(pk__in=changed[start:start + 200]):
+                self.write(f"{target.name}/{obj.slug}.json", target.serializer_class(obj).data)
+
+        if changed or gone or not (self.root / target.name / "index.json").exists():
+            self.build_pages(target, len(current), queryset.defer(*target.deferred).order_by(*target.ordering))
+        return current
+
+    def page_name(self, target, number):
+        return f"{target.name}/index.json" if number == 1 else f"{target.name}/page-{number}.json"
+
+    def build_pages(self, target, count, queryset):
+        pages = max(1, math.ceil(count / self.page_size))
+        for number in range(1, pages + 1):
+            offset = (number - 1) * self.page_size
+            objects = queryset[offset:offset + self.page_size]
+            self.write(self.page_name(target, number), {
+                "count": count,
+                "next": self.url + self.page_name(target, number + 1) if number < pages else None,
+                "previous": self.url + self.page_name(target, number - 1) if number > 1 else None,
+                "results": target.list_serializer_class(objects, many=True).data,
+            })
+        # Drop pages left over from when there were more objects
+        number = pages + 1
+        while (self.root / self.page_name(target, number)).exists():
+            remove(self.root / self.page_name(target, number))
+            self.removed += 1
+            number += 1
+
+
+def build(full=False, root=None):
+    return StaticExporter(root=root).build(full=full)
@@ -0,0 +1,129 @@
+"""
+Responsive derivatives for ImageAsset.
+
+A derivative backend turns an asset into its intrinsic size plus a list of
+resized variants ``{"width", "format", "url"}`` that ImageAssetSerializer
+exposes as ``srcset`` strings. ``PillowDerivativeBackend`` resizes and
+re-encodes locally (EXIF stripped) into the default storage;
+``CloudinaryDerivativeBackend`` only records Cloudinary transformation URLs.
+"""
+import io
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps, features
+
+# Preferred order: smallest encodings first
+FORMATS = ("avif", "webp", "jpeg")
+PILLOW_FORMATS = {"avif": "AVIF", "webp": "WEBP", "jpeg": "JPEG"}
+
+
+def available_formats():
+    return [fmt for fmt in FORMATS if fmt == "jpeg" or features.check(fmt)]
+
+
+def target_widths(original_width):
+    """Configured widths narrower than the original, plus the original itself."""
+    widths = [w for w in settings.IMAGE_DERIVATIVE_WIDTHS if not original_width or w < original_width]
+    if original_width:
+        widths.append(original_width)
+    return widths
+
+
+def read_size(source):
+    source.seek(0)
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        size = image.size
+    source.seek(0)
+    return size
+
+
+class PillowDerivativeBackend:
+    quality = 80
+
+    def generate(self, asset, source):
+        if source is None:
+            raise ValueError("Pillow derivatives need the original image bytes")
+        source.seek(0)
+        with Image.open(source) as original:
+            # Apply the EXIF orientation, then drop EXIF entirely by never passing it to save()
+            image = ImageOps.exif_transpose(original)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+            width, height = image.size
+            prefix = f"derivatives/{asset.content_hash or asset.pk}"
+            variants = []
+            for target in target_widths(width):
+                resized = image if target == width else image.resize(
+                    (target, max(1, round(height * target / width))), Image.LANCZOS
+                )
+                for fmt in available_formats():
+                    frame = resized.convert("RGB") if fmt == "jpeg" else resized
+                    buffer = io.BytesIO()
+                    frame.save(buffer, PILLOW_FORMATS[fmt], quality=self.quality, optimize=fmt == "jpeg")
+                    name = default_storage.save(f"{prefix}/{target}.{fmt}", ContentFile(buffer.getvalue()))
+                    variants.append({
+                        "width": target, "format": fmt,
+                        "url": default_storage.url(name), "bytes": buffer.tell(),
+                    })
+        source.seek(0)
+        return width, height, variants
+
+
+class CloudinaryDerivativeBackend:
+    """Cloudinary resizes on first request; we only need the intrinsic size and URLs."""
+
+    def generate(self, asset, source):
+        resource = asset.file
+        metadata = getattr(resource, "metadata", None) or {}
+        width, height = metadata.get("width"), metadata.get("height")
+        if not width and source is not None:
+            width, height = read_size(source)
+        variants = [
+            {
+                "width": target, "format": fmt,
+                "url": resource.build_url(
+                    width=target, crop="limit", fetch_format=fmt, quality="auto", secure=True
+                ),
+            }
+            for target in target_widths(width)
+            for fmt in FORMATS
+        ]
+        return width, height, variants
+
+
+def get_backend():
+    return import_string(settings.IMAGE_DERIVATIVE_BACKEND)()
+
+
+def generate_derivatives(asset, source=None):
+    """Compute and store width/height/derivatives for ``asset`` without a second save()."""
+    from .signals import bulk_saved  # content.models calls this from ImageAsset.save
+
+    if not asset.file:
+        return
+    width, height, variants = get_backend().generate(asset, source)
+    now = timezone.now()
+    asset.width, asset.height, asset.derivatives, asset.updated_at = width, height, variants, now
+    type(asset).objects.filter(pk=asset.pk).update(width=width, height=height, derivatives=variants, updated_at=now)
+    bulk_saved(type(asset), [asset])
+
+
+def srcsets(variants):
+    """``{format: "url 320w, url 640w"}`` from a derivatives list."""
+    by_format = {}
+    for variant in sorted(variants or [], key=lambda v: v["width"]):
+        by_format.setdefault(variant["format"], []).append(f'{variant["url"]} {variant["width"]}w')
+    return {fmt: ", ".join(entries) for fmt, entries in by_format.items()}
+
+
+def local_source(resource, media_root):
+    """Open the local original for a not-yet-uploaded CloudinaryField value, if present."""
+    name = f"{resource.public_id}.{resource.format}" if resource.format else resource.public_id
+    path = Path(media_root) / name
+    return path.open("rb") if path.is_file() else None
@@ -0,0 +1,157 @@
+"""
+A small database-backed job queue.
+
+``enqueue()`` inserts a ``Job`` row; the ``run_jobs`` management command
+claims due jobs one at a time with a conditional UPDATE (safe with several
+workers on SQLite or Postgres), runs the registered task and records the
+result. Failures are retried with exponential backoff up to
+``max_attempts``; jobs whose worker died are requeued after
+``JOB_LOCK_TIMEOUT`` seconds.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+import cloudinary.uploader
+from django.conf import settings
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import UploadedFile
+from django.db.models import F
+from django.utils import timezone
+
+from .documents import extract as extract_document
+from .export import build as build_static_export
+from .images import generate_derivatives
+from .models import ImageAsset, Job, Research
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+def task(name):
+    def register(fn):
+        TASKS[name] = fn
+        return fn
+    return register
+
+
+def enqueue(kind, max_attempts=None, **payload):
+    if kind not in TASKS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = Job(kind=kind, payload=payload)
+    if max_attempts is not None:
+        job.max_attempts = max_attempts
+    job.save()
+    return job
+
+
+def enqueue_many(kind, payloads):
+    """Insert one job per payload dict in a single query."""
+    if kind not in TASKS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return Job.objects.bulk_create([Job(kind=kind, payload=payload) for payload in payloads])
+
+
+def backoff(attempts):
+    """Seconds to wait before retry number ``attempts`` (1-based)."""
+    return min(settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1), settings.JOB_RETRY_BACKOFF_MAX)
+
+
+def requeue_stale():
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    return Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff).update(
+        status=Job.QUEUED, locked_by="", locked_at=None, updated_at=timezone.now(),
+    )
+
+
+def claim_next(worker_id):
+    """Claim the next due job for ``worker_id``, or return None if there is none."""
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+        .order_by("run_after", "pk")
+        .values_list("pk", flat=True)[:10]
+    )
+    for pk in candidates:
+        # Only one worker's UPDATE can match while the row is still queued
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker_id, locked_at=now,
+            attempts=F("attempts") + 1, updated_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job):
+    fn = TASKS.get(job.kind)
+    try:
+        if fn is None:
+            raise LookupError(f"No task registered for {job.kind!r}")
+        result = fn(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=backoff(job.attempts))
+        else:
+            job.status = Job.FAILED
+        logger.warning("Job %s (%s) attempt %s failed", job.pk, job.kind, job.attempts, exc_info=True)
+    else:
+        job.status = Job.SUCCEEDED
+        job.result = result
+        job.last_error = ""
+    job.locked_by, job.locked_at = "", None
+    job.save(update_fields=["status", "result", "last_error", "run_after", "locked_by", "locked_at", "updated_at"])
+    return job
+
+
+def run_pending(worker_id, limit=None):
+    """Run due jobs until the queue is empty (or ``limit`` jobs ran). Returns the count."""
+    requeue_stale()
+    count = 0
+    while limit is None or count < limit:
+        job = claim_next(worker_id)
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+
+@task("process_image_upload")
+def process_image_upload(asset_id, staged_name, original_name, content_type=None):
+    """Push a staged upload to the remote store, generate derivatives and swap in the URL."""
+    storage = storages["staging"]
+    asset = ImageAsset.objects.filter(pk=asset_id).first()
+    if asset is None:
+        # Deleted while queued: nothing to upload, only the staged copy to drop
+        if storage.exists(staged_name):
+            storage.delete(staged_name)
+        return None
+    field = ImageAsset._meta.get_field("file")
+    with storage.open(staged_name, "rb") as fh:
+        upload = UploadedFile(file=fh, name=original_name, content_type=content_type, size=storage.size(staged_name))
+        # Upload outside Model.save() so a network failure leaves no half-saved row
+        asset.file = cloudinary.uploader.upload_resource(
+            upload, type=field.type, resource_type=field.resource_type, **field.options
+        )
+        asset.save()
+        generate_derivatives(asset, upload)
+    storage.delete(staged_name)
+    return {"asset": asset.pk, "file": asset.file.url}
+
+
+@task("export_static")
+def export_static(full=False):
+    return build_static_export(full=full)
+
+
+@task("extract_research_text")
+def extract_research_text(research_id):
+    """Record size/hash and index the pages of a research document (content.documents)."""
+    research = Research.objects.filter(pk=research_id).first()
+    if research is None:
+        return None  # Deleted since; its entries went with it
+    return extract_document(research)
@@ -0,0 +1,102 @@
+"""
+Shared pieces of the ``benchmark_*`` commands: synthetic content, runs
+that roll their rows back, and timing. Each command keeps only its own
+scenarios and reporting.
+"""
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from content.models import Blog, ImageAsset, Research
+from content.signals import bulk_saved
+
+WORDS = (
+    "zanzibar malaria health social protection financing digital transformation research policy "
+    "community climate education fisheries tourism women youth data survey budget household "
+    "island district council programme evaluation baseline outcome coverage access services"
+).split()
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is always rolled back."""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def sentence_maker(rng, topic_share=1.0, filler_size=3000):
+    """
+    ``sentence(k)``: k words drawn from WORDS. With ``topic_share`` below 1
+    the rest come from a large filler vocabulary, so topic words are
+    selective the way real search terms are.
+    """
+    filler = [f"word{i}" for i in range(filler_size)]
+
+    def sentence(k):
+        return " ".join(
+            rng.choice(WORDS) if rng.random() < topic_share else rng.choice(filler) for _ in range(k)
+        ).capitalize()
+    return sentence
+
+
+def blog_body(rng, sentence, n):
+    """A body of 6-14 blocks, mostly paragraphs, as the editor produces them."""
+    body = []
+    for _ in range(rng.randint(6, 14)):
+        kind = rng.choices(["paragraph", "heading", "list", "quote", "image"], [10, 2, 2, 1, 1])[0]
+        if kind == "paragraph":
+            body.append({"type": "paragraph", "text": f"{sentence(40)} <b>{sentence(3)}</b>. {sentence(30)}."})
+        elif kind == "heading":
+            body.append({"type": "heading", "level": 2, "text": sentence(5)})
+        elif kind == "list":
+            body.append({"type": "list", "style": "unordered", "items": [sentence(8) for _ in range(rng.randint(3, 6))]})
+        elif kind == "quote":
+            body.append({"type": "quote", "text": sentence(20), "caption": sentence(2)})
+        else:
+            body.append({"type": "image", "url": f"https://example.org/img/{n}.jpg", "caption": sentence(6)})
+    return body
+
+
+def seed_content(blogs=0, research=0, images=0, topic_share=1.0, seed=0):
+    """Bulk-create published synthetic content; returns the counts."""
+    rng = random.Random(seed)
+    sentence = sentence_maker(rng, topic_share)
+    now = timezone.now()
+    assets = ImageAsset.objects.bulk_create(
+        ImageAsset(alt_text=sentence(4), width=1600, height=900) for _ in range(images)
+    )
+    posts = Blog.objects.bulk_create([
+        Blog(title=sentence(7), summary=sentence(30), body=blog_body(rng, sentence, n), status=Blog.PUBLISHED,
+             published_at=now - timedelta(hours=n), featured_image=rng.choice(assets) if assets else None)
+        for n in range(blogs)
+    ], batch_size=500)
+    reports = Research.objects.bulk_create([
+        Research(title=sentence(8), description=" ".join(sentence(25) for _ in range(8)),
+                 status=Research.PUBLISHED, featured_image=rng.choice(assets) if assets else None)
+        for _ in range(research)
+    ], batch_size=500)
+    # bulk_create skips the signals: index, fill the published feed and invalidate like saves would
+    for model, objs in ((ImageAsset, assets), (Blog, posts), (Research, reports)):
+        bulk_saved(model, objs)
+    return {"blogs": blogs, "research": research, "images": images}
+
+
+def measure(fn, repeat):
+    """Mean seconds per call of ``fn`` over ``repeat`` calls after one warm-up, and its last result."""
+    result = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
@@ -0,0 +1,208 @@
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import quote_plus, urlsplit
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from content.management.benchmarking import rolled_back, seed_content
+from content.models import Blog, Research
+
+SEARCH_TERMS = ["malaria", "social protection", "financing", "zanzibar health", "household survey"]
+
+
+class Command(BaseCommand):
+    help = 'Seed content and measure throughput, latency and queries of the content API; writes JSON results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blogs', type=int, default=500, help='Synthetic published blogs to create')
+        parser.add_argument('--research', type=int, default=200, help='Synthetic published research items to create')
+        parser.add_argument('--images', type=int, default=100, help='Synthetic image assets to create')
+        parser.add_argument('--requests', type=int, default=100, help='Requests per scenario')
+        parser.add_argument('--deep-page', type=int, default=0,
+                            help='Page number for the deep pagination scenarios (default: the last page)')
+        parser.add_argument('--base-url',
+                            help='Benchmark a running server (e.g. http://127.0.0.1:8000) instead of the test client')
+        parser.add_argument('--concurrency', type=int, default=1, help='Parallel clients (with --base-url)')
+        parser.add_argument('--with-cache', action='store_true', help='Keep the API response cache enabled')
+        parser.add_argument('--keep', action='store_true',
+                            help='Commit the seeded data (implied by --base-url) instead of rolling it back')
+        parser.add_argument('--output', default='benchmark_results.json', help='JSON file for the results')
+        parser.add_argument('--compare', help='Previous JSON results to print deltas against')
+
+    def handle(self, *args, **options):
+        self.options = options
+        if options['concurrency'] > 1 and not options['base_url']:
+            raise CommandError('--concurrency needs --base-url; the test client runs in-process')
+        keep = options['keep'] or bool(options['base_url'])
+        cache_timeout = settings.API_CACHE_TIMEOUT if options['with_cache'] else 0
+        with override_settings(API_CACHE_TIMEOUT=cache_timeout, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            if keep:
+                # A separate server only sees committed rows
+                with transaction.atomic():
+                    seeded = self.seed(options['blogs'], options['research'], options['images'])
+                results = self.run()
+            else:
+                with rolled_back():
+                    seeded = self.seed(options['blogs'], options['research'], options['images'])
+                    results = self.run()
+
+        report = {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'commit': self.git_commit(),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'target': options['base_url'] or 'test-client',
+                'concurrency': options['concurrency'],
+                'requests_per_scenario': options['requests'],
+                'response_cache': bool(cache_timeout),
+                'seeded': seeded,
+            },
+            'scenarios': results,
+        }
+        with open(options['output'], 'w') as fh:
+            json.dump(report, fh, indent=2)
+        self.print_report(results, self.load_previous(options['compare']))
+        self.stdout.write(self.style.SUCCESS(f"✅ Results written to {options['output']}"))
+
+    # Seeding
+
+    def seed(self, n_blogs, n_research, n_images):
+        seeded = seed_content(blogs=n_blogs, research=n_research, images=n_images)
+        self.stdout.write(f'Seeded {n_blogs} blogs, {n_research} research items and {n_images} images')
+        return seeded
+
+    # Scenarios
+
+    def scenarios(self, resource, model, ordering):
+        n = self.options['requests']
+        published = model.objects.filter(status='published')
+        pks = list(published.values_list('pk', flat=True)[:n]) or [0]
+        pages = max(1, math.ceil(published.count() / settings.REST_FRAMEWORK['PAGE_SIZE']))
+        deep = min(self.options['deep_page'] or pages, pages)
+        base = f'/api/{resource}/'
+        yield 'list', [base] * n
+        yield 'detail', [f'{base}{pks[i % len(pks)]}/' for i in range(n)]
+        yield 'search', [f'{base}?search={quote_plus(SEARCH_TERMS[i % len(SEARCH_TERMS)])}' for i in range(n)]
+        yield 'ordering', [f'{base}?ordering={ordering}'] * n
+        yield 'deep_page', [f'{base}?page={deep}'] * n
+        yield 'deep_cursor', [self.deep_cursor(base, deep)] * n
+
+    def deep_cursor(self, base, depth):
+        """Follow keyset ``next`` links ``depth - 1`` times to reach the same depth as ?page=."""
+        url = f'{base}?cursor='
+        for _ in range(depth - 1):
+            status, body, _ = self.fetch(url)
+            next_url = json.loads(body).get('next') if status == 200 else None
+            if not next_url:
+                break
+            parts = urlsplit(next_url)
+            url = f'{parts.path}?{parts.query}'
+        return url
+
+    def run(self):
+        results = {}
+        for resource, model, ordering in [('blogs', Blog, 'created_at'), ('research', Research, 'updated_at')]:
+            for name, urls in self.scenarios(resource, model, ordering):
+                self.fetch(urls[0])  # warm-up
+                results[f'{resource}.{name}'] = self.measure(urls)
+        return results
+
+    def measure(self, urls):
+        start = time.perf_counter()
+        if self.options['base_url'] and self.options['concurrency'] > 1:
+            with ThreadPoolExecutor(self.options['concurrency']) as pool:
+                samples = list(pool.map(self.timed_fetch, urls))
+        else:
+            samples = [self.timed_fetch(url) for url in urls]
+        elapsed = time.perf_counter() - start
+        latencies = sorted(s['ms'] for s in samples)
+        queries = [s['queries'] for s in samples if s['queries'] is not None]
+        return {
+            'requests': len(samples),
+            'errors': sum(s['status'] >= 400 for s in samples),
+            'throughput_rps': round(len(samples) / elapsed, 1),
+            'latency_ms': {
+                'p50': round(self.quantile(latencies, 0.5), 2),
+                'p99': round(self.quantile(latencies, 0.99), 2),
+                'mean': round(statistics.fmean(latencies), 2),
+                'max': round(latencies[-1], 2),
+            },
+            'queries': {'mean': round(statistics.fmean(queries), 2), 'max': max(queries)} if queries else None,
+            'bytes': round(statistics.fmean(s['bytes'] for s in samples)),
+        }
+
+    @staticmethod
+    def quantile(values, fraction):
+        # Nearest-rank on an already sorted list
+        return values[min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))]
+
+    def timed_fetch(self, url):
+        start = time.perf_counter()
+        status, body, queries = self.fetch(url)
+        return {'ms': (time.perf_counter() - start) * 1000, 'status': status, 'bytes': len(body), 'queries': queries}
+
+    def fetch(self, url):
+        if self.options['base_url']:
+            request = Request(self.options['base_url'].rstrip('/') + url, headers={'Accept': 'application/json'})
+            try:
+                with urlopen(request, timeout=30) as response:
+                    body = response.read()
+                    return response.status, body, self.server_timing_queries(response.headers.get('Server-Timing'))
+            except HTTPError as error:
+                return error.code, error.read(), None
+        if not hasattr(self, 'client'):
+            self.client = Client()
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, HTTP_ACCEPT='application/json')
+        return response.status_code, response.content, len(captured)
+
+    @staticmethod
+    def server_timing_queries(header):
+        # 'db;dur=1.2;desc="3 queries"' from zrcp_backend.instrumentation, when SERVER_TIMING is on
+        for part in (header or '').split(','):
+            if part.strip().startswith('db;') and 'desc="' in part:
+                return int(part.split('desc="')[1].split()[0])
+        return None
+
+    # Reporting
+
+    @staticmethod
+    def git_commit():
+        try:
+            return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=settings.BASE_DIR, timeout=5).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    @staticmethod
+    def load_previous(path):
+        if not path:
+            return {}
+        with open(path) as fh:
+            return json.load(fh).get('scenarios', {})
+
+    def print_report(self, results, previous):
+        self.stdout.write(f'{"scenario":<22} {"req/s":>8} {"p50 ms":>8} {"p99 ms":>8} {"queries":>8} {"bytes":>8}')
+        for name, r in results.items():
+            queries = r['queries']['mean'] if r['queries'] else '-'
+            line = (f'{name:<22} {r["throughput_rps"]:>8} {r["latency_ms"]["p50"]:>8} '
+                    f'{r["latency_ms"]["p99"]:>8} {queries:>8} {r["bytes"]:>8}')
+            before = previous.get(name)
+            if before:
+                change = (r['latency_ms']['p50'] - before['latency_ms']['p50']) / (before['latency_ms']['p50'] or 1)
+                line += f'  p50 {change:+.0%}'
+            if r['errors']:
+                line += self.style.ERROR(f'  ❌ {r["errors"]} errors')
+            self.stdout.write(line)
@@ -0,0 +1,65 @@
+import gzip
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from rest_framework.renderers import JSONRenderer
+from content.management.benchmarking import measure, rolled_back, seed_content
+from content.models import Blog
+from content.renderers import FastJSONRenderer
+from content.serializers import BlogListSerializer, BlogSerializer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+class Command(BaseCommand):
+    help = 'Compare render time and bytes on the wire for /api/blogs/ with and without the fast renderer/compression'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=50,
+                            help='Create this many synthetic published blogs first (rolled back afterwards)')
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--page-size', type=int, default=settings.REST_FRAMEWORK['PAGE_SIZE'])
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            if options['seed']:
+                seed_content(blogs=options['seed'])
+                self.stdout.write(f"Seeded {options['seed']} blogs")
+            self.run(options['repeat'], options['page_size'])
+
+    def run(self, repeat, page_size):
+        blogs = list(Blog.objects.filter(status=Blog.PUBLISHED).select_related('author', 'featured_image')[:page_size])
+        pages = {
+            'list page': BlogListSerializer(blogs, many=True).data,
+            'list page with body': BlogSerializer(blogs, many=True).data,
+        }
+        for label, data in pages.items():
+            stdlib_time, stdlib_body = measure(lambda: JSONRenderer().render(data), repeat)
+            fast_time, fast_body = measure(lambda: FastJSONRenderer().render(data), repeat)
+            self.stdout.write(
+                f'{label:<20} render: json {stdlib_time * 1000:7.3f} ms  fast {fast_time * 1000:7.3f} ms '
+                f'({stdlib_time / fast_time:4.1f}x)'
+            )
+            gzip_time, gzipped = measure(
+                lambda: gzip.compress(fast_body, compresslevel=settings.COMPRESSION_GZIP_LEVEL), repeat)
+            sizes = f'identity {len(fast_body):>8} B  gzip {len(gzipped):>7} B ({gzip_time * 1000:.3f} ms)'
+            if brotli is not None:
+                br_time, compressed = measure(
+                    lambda: brotli.compress(fast_body, quality=settings.COMPRESSION_BROTLI_QUALITY), repeat)
+                sizes += f'  br {len(compressed):>7} B ({br_time * 1000:.3f} ms)'
+            self.stdout.write(f'{"":<20} wire:   {sizes}')
+
+        # End to end through the middleware stack, response cache off
+        client = Client()
+        with override_settings(API_CACHE_TIMEOUT=0, ALLOWED_HOSTS=['testserver']):
+            for label, backend, encoding in [('before', 'json', 'identity'), ('after', 'orjson', 'br, gzip')]:
+                with override_settings(API_JSON_BACKEND=backend):
+                    elapsed, response = measure(
+                        lambda: client.get('/api/blogs/', HTTP_ACCEPT_ENCODING=encoding), max(1, repeat // 10))
+                self.stdout.write(
+                    f'GET /api/blogs/ {label:<7} {elapsed * 1000:7.2f} ms  {len(response.content):>7} B  '
+                    f'({response.get("Content-Encoding", "identity")})'
+                )
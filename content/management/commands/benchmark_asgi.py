@@ -0,0 +1,167 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from content.models import Blog, Research
+
+from .benchmark_api import Command as ApiBenchmark
+
+# gunicorn config for --db-latency: every query in the workers first waits, like a round trip to a remote database
+LATENCY_CONFIG = """
+import os
+import time
+
+
+def post_worker_init(worker):
+    from django.db.backends.signals import connection_created
+
+    delay = float(os.environ['BENCHMARK_DB_LATENCY_MS']) / 1000
+
+    def remote(execute, sql, params, many, context):
+        time.sleep(delay)
+        return execute(sql, params, many, context)
+
+    def add(connection, **kwargs):
+        if remote not in connection.execute_wrappers:
+            connection.execute_wrappers.append(remote)
+
+    connection_created.connect(add, weak=False)
+"""
+
+SERVERS = {
+    # gunicorn's default sync workers, as deployed in render.yaml
+    'wsgi': (['zrcp_backend.wsgi:application'], {'ASYNC_READS': 'False'}),
+    # uvicorn workers with the async read path (zrcp_backend/asgi.py)
+    'asgi': (['zrcp_backend.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+             {'ASYNC_READS': 'True', 'CONN_MAX_AGE': '0'}),
+}
+
+
+class Command(ApiBenchmark):
+    help = ('Seed content, then load the read endpoints through gunicorn sync workers and through uvicorn '
+            'workers at rising concurrency; writes JSON results. Seeded rows are committed: use a scratch database')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blogs', type=int, default=500, help='Synthetic published blogs to create')
+        parser.add_argument('--research', type=int, default=200, help='Synthetic published research items to create')
+        parser.add_argument('--images', type=int, default=100, help='Synthetic image assets to create')
+        parser.add_argument('--no-seed', action='store_true', help='Benchmark the rows already in the database')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario and concurrency level')
+        parser.add_argument('--concurrency', default='1,8,32', help='Comma-separated numbers of parallel clients')
+        parser.add_argument('--scenarios', default='list,detail,search', help='Comma-separated scenario names')
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes per server')
+        parser.add_argument('--port', type=int, default=8765, help='Local port the servers bind to')
+        parser.add_argument('--servers', default='wsgi,asgi', help=f'Which of {", ".join(SERVERS)} to run')
+        parser.add_argument('--db-latency', type=float, default=0,
+                            help='Milliseconds added to every query in the servers, to model a remote database')
+        parser.add_argument('--with-cache', action='store_true', help='Keep the API response cache enabled')
+        parser.add_argument('--output', default='benchmark_results_asgi.json', help='JSON file for the results')
+
+    def handle(self, *args, **options):
+        levels = [int(level) for level in options['concurrency'].split(',')]
+        names = options['scenarios'].split(',')
+        servers = options['servers'].split(',')
+        unknown = set(servers) - set(SERVERS)
+        if unknown:
+            raise CommandError(f'Unknown server(s): {", ".join(sorted(unknown))}')
+        self.options = dict(options, deep_page=0, base_url=f'http://127.0.0.1:{options["port"]}')
+
+        seeded = None
+        if not options['no_seed']:
+            with transaction.atomic():
+                seeded = self.seed(options['blogs'], options['research'], options['images'])
+
+        results = {}
+        for server in servers:
+            with self.server(server):
+                for level in levels:
+                    self.options['concurrency'] = level
+                    for resource, model, ordering in [('blogs', Blog, 'created_at'), ('research', Research, 'updated_at')]:
+                        for name, urls in self.scenarios(resource, model, ordering):
+                            if name not in names:
+                                continue
+                            self.fetch(urls[0])  # warm-up
+                            results.setdefault(server, {})[f'{resource}.{name}@{level}'] = self.measure(urls)
+
+        report = {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'commit': self.git_commit(),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'workers': options['workers'],
+                'db_latency_ms': options['db_latency'],
+                'requests_per_scenario': options['requests'],
+                'response_cache': options['with_cache'],
+                'seeded': seeded,
+            },
+            'servers': results,
+        }
+        with open(options['output'], 'w') as fh:
+            json.dump(report, fh, indent=2)
+        self.print_comparison(results, servers)
+        self.stdout.write(self.style.SUCCESS(f"✅ Results written to {options['output']}"))
+
+    @contextmanager
+    def server(self, name):
+        target, env = SERVERS[name]
+        env = dict(os.environ, SERVER_TIMING='True', **env)
+        if not self.options['with_cache']:
+            env['API_CACHE_TIMEOUT'] = '0'
+        args = [sys.executable, '-m', 'gunicorn', *target, '--workers', str(self.options['workers']),
+                '--bind', f'127.0.0.1:{self.options["port"]}', '--log-level', 'warning']
+        config = None
+        if self.options['db_latency']:
+            env['BENCHMARK_DB_LATENCY_MS'] = str(self.options['db_latency'])
+            with tempfile.NamedTemporaryFile('w', suffix='.py', delete=False) as config:
+                config.write(LATENCY_CONFIG)
+            args += ['--config', config.name]
+        process = subprocess.Popen(args, env=env)
+        try:
+            self.wait_until_up(process)
+            self.stdout.write(f'Started {name} server ({self.options["workers"]} worker(s))')
+            yield
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            if config is not None:
+                os.unlink(config.name)
+
+    def wait_until_up(self, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'Server exited with status {process.returncode}')
+            try:
+                with urlopen(f'{self.options["base_url"]}/api/', timeout=2):
+                    return
+            except (URLError, ConnectionError):
+                time.sleep(0.2)
+        raise CommandError(f'Server did not answer within {timeout}s')
+
+    def print_comparison(self, results, servers):
+        header = f'{"scenario":<26}' + ''.join(f' {s + " req/s":>11} {s + " p99":>9}' for s in servers)
+        if len(servers) == 2:
+            header += f' {"ratio":>7}'
+        self.stdout.write(header)
+        for scenario in results[servers[0]]:
+            rows = [results[s].get(scenario) for s in servers]
+            line = f'{scenario:<26}' + ''.join(
+                f' {r["throughput_rps"]:>11} {r["latency_ms"]["p99"]:>9}' if r else f' {"-":>11} {"-":>9}' for r in rows
+            )
+            if len(servers) == 2 and all(rows):
+                line += f' {rows[1]["throughput_rps"] / (rows[0]["throughput_rps"] or 1):>6.2f}x'
+            errors = sum(r['errors'] for r in rows if r)
+            if errors:
+                line += self.style.ERROR(f'  ❌ {errors} errors')
+            self.stdout.write(line)
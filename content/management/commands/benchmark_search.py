@@ -0,0 +1,49 @@
+from functools import reduce
+from operator import or_
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from content.management.benchmarking import measure, rolled_back, seed_content
+from content.models import Blog, Research
+from content.search import search
+
+
+class Command(BaseCommand):
+    help = 'Compare full-text search against the icontains SearchFilter it replaced'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Create this many synthetic blogs/research first (rolled back afterwards)')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--terms', default='malaria,social protection,financing,zanzibar health')
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            if options['seed']:
+                # Mostly filler vocabulary with occasional topic words, so terms are selective
+                seed_content(blogs=options['seed'], research=options['seed'], topic_share=0.03)
+                self.stdout.write(f"Seeded {options['seed']} blogs and {options['seed']} research items")
+            self.run(options['terms'].split(','), options['repeat'])
+
+    def run(self, terms, repeat):
+        legacy_fields = {Blog: ["title", "summary", "slug"], Research: ["title", "description", "slug"]}
+        for model, fields in legacy_fields.items():
+            base = model.objects.filter(status="published")
+            for term in terms:
+                legacy = lambda: base.filter(reduce(or_, (Q(**{f"{f}__icontains": term}) for f in fields)))
+                if search(base, term) is None:
+                    self.stdout.write(self.style.WARNING('No full-text backend for this database'))
+                    return
+                legacy_time, legacy_hits = measure(lambda: self.first_page(legacy()), repeat)
+                fts_time, fts_hits = measure(lambda: self.first_page(search(base, term)), repeat)
+                self.stdout.write(
+                    f'{model.__name__:<8} {term!r:<24} icontains {legacy_time * 1000:8.2f} ms ({legacy_hits} hits)  '
+                    f'full-text {fts_time * 1000:8.2f} ms ({fts_hits} hits)'
+                )
+
+    @staticmethod
+    def first_page(queryset):
+        # What a paginated list request costs: COUNT plus the first page
+        count = queryset.count()
+        list(queryset.values_list("pk", flat=True)[:10])
+        return count
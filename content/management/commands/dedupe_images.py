@@ -0,0 +1,112 @@
+import hashlib
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from content.media import HASH_CHUNK_SIZE, hash_path
+from content.models import Blog, Research, ContentImage, ImageAsset
+from content.signals import touch
+
+# FKs that point at ImageAsset and must follow a merge
+IMAGE_ASSET_REFERENCES = [(Blog, 'featured_image'), (Research, 'featured_image')]
+
+
+class Command(BaseCommand):
+    help = 'Hash stored images and merge ImageAssets with identical content'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--media-root', default=settings.MEDIA_ROOT or settings.BASE_DIR,
+                            help='Directory local file names are relative to')
+        parser.add_argument('--fetch-remote', action='store_true',
+                            help='Download files that only exist on Cloudinary to hash them')
+        parser.add_argument('--dry-run', action='store_true', help='Report duplicates without changing anything')
+
+    def handle(self, *args, **options):
+        self.media_root = Path(options['media_root'])
+        self.fetch_remote = options['fetch_remote']
+        self.dry_run = options['dry_run']
+        self.unsaved_hashes = defaultdict(dict)  # dry-run only: model -> {pk: digest}
+
+        self.backfill_hashes(ImageAsset, 'file')
+        self.backfill_hashes(ContentImage, 'image')
+        merged = self.merge_image_assets()
+        self.report_duplicates(ContentImage)
+
+        verb = 'Would merge' if self.dry_run else 'Merged'
+        self.stdout.write(self.style.SUCCESS(f'✅ {verb} {merged} duplicate image assets'))
+
+    def backfill_hashes(self, model, field_name):
+        rows = (model.objects.filter(content_hash='')
+                .exclude(**{f'{field_name}__isnull': True}).exclude(**{field_name: ''}))
+        for pk, value in rows.values_list('pk', field_name).iterator(chunk_size=200):
+            try:
+                digest = self.hash_value(value)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'  ❌ Could not hash {model.__name__} {pk}: {e}'))
+                continue
+            if not digest:
+                continue
+            if self.dry_run:
+                self.unsaved_hashes[model][pk] = digest
+            else:
+                model.objects.filter(pk=pk).update(content_hash=digest)
+
+    def hash_value(self, resource):
+        if not resource:
+            return None
+        if not resource.version:
+            # Not yet on Cloudinary: the file is on local disk
+            name = f'{resource.public_id}.{resource.format}' if resource.format else resource.public_id
+            path = self.media_root / name
+            return hash_path(path) if path.is_file() else None
+        if not self.fetch_remote:
+            return None
+        import requests
+        digest = hashlib.sha256()
+        with requests.get(resource.url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(HASH_CHUNK_SIZE):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def duplicate_groups(self, model):
+        groups = defaultdict(list)
+        rows = model.objects.exclude(content_hash='').values_list('content_hash', 'pk')
+        for digest, pk in rows.iterator(chunk_size=1000):
+            groups[digest].append(pk)
+        for pk, digest in self.unsaved_hashes[model].items():
+            groups[digest].append(pk)
+        return {digest: sorted(pks) for digest, pks in groups.items() if len(pks) > 1}
+
+    def merge_image_assets(self):
+        merged = 0
+        for digest, pks in self.duplicate_groups(ImageAsset).items():
+            # Keep the oldest asset; repoint everything at it
+            keep, duplicates = pks[0], pks[1:]
+            self.stdout.write(f'  🔁 {digest[:12]}: keeping ImageAsset {keep}, merging {duplicates}')
+            merged += len(duplicates)
+            if self.dry_run:
+                continue
+            with transaction.atomic():
+                # touch() stamps the rows and runs the save bookkeeping (caches, search, feed, export)
+                for model, field_name in IMAGE_ASSET_REFERENCES:
+                    rows = list(model.objects.filter(**{f'{field_name}__in': duplicates}))
+                    for row in rows:
+                        setattr(row, f'{field_name}_id', keep)
+                    touch(model, rows, [field_name])
+                canonical = ImageAsset.objects.get(pk=keep)
+                if not canonical.alt_text:
+                    alt_text = (ImageAsset.objects.filter(pk__in=duplicates).exclude(alt_text='')
+                                .values_list('alt_text', flat=True).first())
+                    if alt_text:
+                        canonical.alt_text = alt_text
+                        touch(ImageAsset, [canonical], ['alt_text'])
+                ImageAsset.objects.filter(pk__in=duplicates).delete()
+        return merged
+
+    def report_duplicates(self, model):
+        # Inline images are referenced from body blocks, not FKs, so only report them
+        for digest, pks in self.duplicate_groups(model).items():
+            self.stdout.write(f'  ℹ️  {model.__name__} {pks} share content {digest[:12]}')
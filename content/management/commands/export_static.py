@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from content.export import build
+
+
+class Command(BaseCommand):
+    help = 'Write published blogs and research as pre-compressed static JSON (changed objects only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Re-render everything, not just changes')
+        parser.add_argument('--root', help='Output directory (default: STATIC_EXPORT_ROOT)')
+
+    def handle(self, *args, **options):
+        result = build(full=options['full'], root=options['root'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Wrote {result['written']} documents, removed {result['removed']}"
+        ))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+from content.documents import extract, pypdf
+from content.jobs import enqueue_many
+from content.models import Research
+
+
+class Command(BaseCommand):
+    help = 'Record size and hash of research files and index the text of every PDF page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-extract every file, not only new or changed ones')
+        parser.add_argument('--queue', action='store_true', help='Enqueue jobs for run_jobs instead of extracting here')
+
+    def handle(self, *args, **options):
+        if pypdf is None:
+            self.stdout.write(self.style.WARNING('⚠️ pypdf is not installed: only size and hash will be recorded'))
+        research = Research.objects.order_by('pk')
+        if not options['all']:
+            has_file = ~Q(file='') & Q(file__isnull=False)
+            research = research.filter(
+                (has_file & (Q(extracted_hash='') | ~Q(extracted_hash=F('content_hash'))))
+                | (~has_file & ~Q(extracted_hash=''))
+            )
+
+        if options['queue']:
+            jobs = enqueue_many('extract_research_text', [{'research_id': pk} for pk in research.values_list('pk', flat=True)])
+            self.stdout.write(self.style.SUCCESS(f'✅ Queued {len(jobs)} extraction jobs'))
+            return
+
+        done = failed = 0
+        for item in research.iterator(chunk_size=100):
+            try:
+                stats = extract(item)
+                done += 1
+                self.stdout.write(f'  ✅ Research {item.pk}: {stats["page_count"] or 0} pages, {stats["file_size"] or 0} bytes')
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'  ❌ Research {item.pk}: {str(e)}'))
+        self.stdout.write(self.style.SUCCESS(f'✅ Extracted {done} research files ({failed} failed)'))
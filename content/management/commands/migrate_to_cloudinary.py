@@ -1,72 +1,250 @@
+import json
 import os
-from django.core.management.base import BaseCommand
-from django.conf import settings
-from content.models import Blog, Research, ContentImage, ImageAsset
-import cloudinary
-import cloudinary.uploader
+import shutil
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
-class Command(BaseCommand):
-    help = 'Migrate local media files to Cloudinary'
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from cloudinary import CloudinaryResource
+from cloudinary.models import CloudinaryField
+from content.models import Research, ContentImage, ImageAsset
+from content.signals import bulk_saved
 
-    def handle(self, *args, **options):
-        # Configure Cloudinary
+# (model, field, Cloudinary resource_type). ImageAsset covers every Blog and
+# Research featured_image, so those are migrated once per asset, not per post.
+TARGETS = [
+    (ImageAsset, 'file', 'image'),
+    (ContentImage, 'image', 'image'),
+    (Research, 'file', 'auto'),
+]
+
+RESULT_KEYS = ('public_id', 'version', 'format', 'resource_type', 'type', 'secure_url')
+
+
+class CloudinaryUploader:
+    def __init__(self, **options):
+        import cloudinary
         cloudinary.config(
             cloud_name=settings.CLOUDINARY_STORAGE['CLOUD_NAME'],
             api_key=settings.CLOUDINARY_STORAGE['API_KEY'],
             api_secret=settings.CLOUDINARY_STORAGE['API_SECRET']
         )
 
-        self.migrate_related_image(Blog, 'featured_image')
-        self.migrate_related_image(Research, 'featured_image')
-        self.migrate_direct_file(Research, 'file')
-        self.migrate_direct_file(ContentImage, 'image')
+    def upload(self, path, public_id, resource_type):
+        import cloudinary.uploader
+        return cloudinary.uploader.upload(path, public_id=public_id, resource_type=resource_type, overwrite=True)
+
+
+class LocalUploader:
+    """Copies files into ``local_dir`` and answers like Cloudinary. For rehearsals and tests."""
+
+    def __init__(self, local_dir=None, **options):
+        if not local_dir:
+            raise CommandError('--local-dir is required with the local uploader')
+        self.root = Path(local_dir)
+
+    def upload(self, path, public_id, resource_type):
+        fmt = Path(path).suffix.lstrip('.').lower()
+        dest = self.root / f'{public_id}.{fmt}'
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, dest)
+        return {
+            'public_id': public_id,
+            'version': int(time.time()),
+            'format': fmt,
+            'resource_type': 'image' if resource_type == 'image' else 'raw',
+            'type': 'upload',
+            'secure_url': dest.resolve().as_uri(),
+        }
+
+
+UPLOADERS = {'cloudinary': CloudinaryUploader, 'local': LocalUploader}
+
+
+class Journal:
+    """
+    Append-only JSON-lines record of finished uploads. A rerun applies
+    journaled results without uploading again, so an interrupted migration
+    resumes where it stopped.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+
+    def load(self):
+        done = {}
+        if self.path.exists():
+            with self.path.open() as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a crash
+                    done[entry['key']] = entry['result']
+        return done
+
+    def record(self, key, result):
+        with self.lock, self.path.open('a') as fh:
+            fh.write(json.dumps({'key': key, 'result': result}) + '\n')
+            fh.flush()
+            os.fsync(fh.fileno())
 
+
+class Command(BaseCommand):
+    help = 'Migrate local media files to Cloudinary'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent uploads')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Rows fetched per database round trip')
+        parser.add_argument('--journal', default=os.path.join(settings.BASE_DIR, '.cloudinary_migration.jsonl'))
+        parser.add_argument('--media-root', default=settings.MEDIA_ROOT or settings.BASE_DIR,
+                            help='Directory local file names are relative to')
+        parser.add_argument('--uploader', default='cloudinary',
+                            help='cloudinary, local, or a dotted path to an uploader class')
+        parser.add_argument('--local-dir', help='Destination for --uploader local')
+        parser.add_argument('--dry-run', action='store_true', help='List what would be uploaded and exit')
+
+    def handle(self, *args, **options):
+        self.media_root = Path(options['media_root'])
+        self.chunk_size = options['chunk_size']
+        self.changed = defaultdict(list)
+        # Counted in a first pass so the task list itself is only ever streamed
+        count = total_bytes = 0
+        for task in self.collect_tasks():
+            count += 1
+            total_bytes += task['size']
+        self.stdout.write(f'🔎 {count} local files ({total_bytes / 1e6:.1f} MB) to migrate')
+
+        if options['dry_run']:
+            for task in self.collect_tasks():
+                self.stdout.write(f"  {task['key']}: {task['path']} -> {task['public_id']}")
+            return
+
+        journal = Journal(options['journal'])
+        done = journal.load()
+        resumed = [0, 0]
+
+        def pending():
+            for task in self.collect_tasks():
+                if task['key'] in done:
+                    self.apply(task, done[task['key']])
+                    resumed[0] += 1
+                    resumed[1] += task['size']
+                else:
+                    yield task
+
+        uploader_class = UPLOADERS.get(options['uploader']) or import_string(options['uploader'])
+        uploader = uploader_class(local_dir=options['local_dir'])
+        errors = self.run(pending(), uploader, journal, options['workers'], count, total_bytes, resumed)
+        self.flush()
+
+        if resumed[0]:
+            self.stdout.write(f'↩️  Applied {resumed[0]} uploads from journal {journal.path}')
+        if errors:
+            self.stdout.write(self.style.ERROR(f'❌ {errors} uploads failed; rerun to retry them'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ Successfully migrated files to Cloudinary'))
+
+    def collect_tasks(self):
+        """Rows whose file still lives on local disk, streamed in chunks."""
+        for model, field_name, resource_type in TARGETS:
+            field = model._meta.get_field(field_name)
+            rows = model.objects.exclude(**{f'{field_name}__isnull': True}).exclude(**{field_name: ''})
+            for pk, value in rows.values_list('pk', field_name).iterator(chunk_size=self.chunk_size):
+                name = self.local_name(field, value)
+                if not name:
+                    continue
+                path = self.media_root / name
+                if not path.is_file():
+                    continue
+                yield {
+                    'key': f'{model._meta.label}.{field_name}:{pk}',
+                    'model': model,
+                    'field': field,
+                    'pk': pk,
+                    'path': str(path),
+                    'size': path.stat().st_size,
+                    'public_id': f'{model.__name__.lower()}/{os.path.splitext(name)[0]}',
+                    'resource_type': resource_type,
+                }
+
+    @staticmethod
+    def local_name(field, value):
+        if isinstance(field, CloudinaryField):
+            resource = field.to_python(value)
+            # Values already on Cloudinary carry a version
+            if resource is None or resource.version:
+                return None
+            return f'{resource.public_id}.{resource.format}' if resource.format else resource.public_id
+        value = str(value)
+        return None if value.startswith(('http://', 'https://')) else value
+
+    def run(self, tasks, uploader, journal, workers, total, total_bytes, resumed):
+        """Upload ``tasks`` (an iterator); ``resumed`` counts rows applied from the journal meanwhile."""
+        started = time.monotonic()
+        sent_bytes = completed = errors = 0
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                # Keep a bounded number of uploads queued so memory stays flat
+                while len(in_flight) < workers * 2:
+                    task = next(tasks, None)
+                    if task is None:
+                        break
+                    future = pool.submit(uploader.upload, task['path'], task['public_id'], task['resource_type'])
+                    in_flight[future] = task
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = in_flight.pop(future)
+                    completed += 1
+                    try:
+                        result = {key: future.result().get(key) for key in RESULT_KEYS}
+                    except Exception as e:
+                        errors += 1
+                        self.stdout.write(self.style.ERROR(f"  ❌ Error migrating {task['path']}: {str(e)}"))
+                        continue
+                    # Journal first: a crash before the row update is replayed on resume
+                    journal.record(task['key'], result)
+                    self.apply(task, result)
+                    sent_bytes += task['size']
+                    self.report(task, result, completed, total - resumed[0], sent_bytes,
+                                total_bytes - resumed[1], started)
+        return errors
+
+    def apply(self, task, result):
+        if isinstance(task['field'], CloudinaryField):
+            value = CloudinaryResource(metadata=result)
+        else:
+            value = result['secure_url']
+        # The upload result already is the stored value: no download/re-save round trip
+        model = task['model']
+        model.objects.filter(pk=task['pk']).update(**{task['field'].name: value, 'updated_at': timezone.now()})
+        self.changed[model].append(task['pk'])
+        if len(self.changed[model]) >= self.chunk_size:
+            self.flush(model)
+
+    def flush(self, model=None):
+        """Run the post-save bookkeeping (caches, search, feed, export) for rows updated so far."""
+        for model in [model] if model else list(self.changed):
+            pks = self.changed.pop(model, [])
+            if pks:
+                bulk_saved(model, list(model.objects.filter(pk__in=pks)))
+
+    def report(self, task, result, completed, total, sent_bytes, total_bytes, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        rate = sent_bytes / elapsed
+        eta = max(total_bytes - sent_bytes, 0) / rate if rate else 0
         self.stdout.write(
-            self.style.SUCCESS('✅ Successfully migrated files to Cloudinary')
+            f"  ✅ [{completed}/{total}] {task['path']} -> {result['secure_url']} "
+            f"({completed / elapsed:.1f} files/s, {rate / 1e6:.2f} MB/s, ETA {eta:.0f}s)"
         )
-
-    def migrate_related_image(self, model, field_name):
-        """Handles ForeignKey to ImageAsset"""
-        self.stdout.write(f'🔄 Migrating {model.__name__}.{field_name} (ImageAsset)...')
-
-        for instance in model.objects.select_related(field_name).all():
-            image_asset = getattr(instance, field_name)
-            if image_asset and image_asset.file and image_asset.file.name and not image_asset.file.url.startswith('http'):
-                try:
-                    result = cloudinary.uploader.upload(
-                        image_asset.file.path,
-                        public_id=f"{model.__name__.lower()}/{image_asset.file.name}",
-                        resource_type="image"
-                    )
-                    # image_asset.file = result['secure_url']
-                    from django.core.files.base import ContentFile
-                    import requests
-
-                    response = requests.get(result['secure_url'])
-                    image_asset.file.save(image_asset.file.name, ContentFile(response.content), save=True)
-                    image_asset.save()
-
-                    self.stdout.write(f'  ✅ Migrated: {image_asset.file.name} -> {result["secure_url"]}')
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(f'  ❌ Error migrating {image_asset.file.name}: {str(e)}'))
-
-    def migrate_direct_file(self, model, field_name):
-        """Handles direct FileField or ImageField"""
-        self.stdout.write(f'🔄 Migrating {model.__name__}.{field_name} (FileField)...')
-
-        for instance in model.objects.all():
-            file_field = getattr(instance, field_name)
-            if file_field and file_field.name and not file_field.url.startswith('http'):
-                try:
-                    result = cloudinary.uploader.upload(
-                        file_field.path,
-                        public_id=f"{model.__name__.lower()}/{file_field.name}",
-                        resource_type="auto"
-                    )
-                    setattr(instance, field_name, result['secure_url'])
-                    instance.save()
-
-                    self.stdout.write(f'  ✅ Migrated: {file_field.name} -> {result["secure_url"]}')
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(f'  ❌ Error migrating {file_field.name}: {str(e)}'))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from content.published import next_scheduled, publish_due, rebuild_feed
+
+
+class Command(BaseCommand):
+    help = 'Publish scheduled blogs when their published_at passes (keeps the published feed current)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Publish what is due and exit instead of looping')
+        parser.add_argument('--interval', type=float, default=60.0,
+                            help='Longest sleep between checks, in seconds; shorter when a post is due sooner')
+        parser.add_argument('--rebuild', action='store_true', help='Recompute the whole published feed first (e.g. after loaddata)')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            self.stdout.write(self.style.SUCCESS(f'✅ Published feed rebuilt with {rebuild_feed()} items'))
+        self.stdout.write('🗓️ Scheduler started')
+        try:
+            while True:
+                for blog in publish_due():
+                    self.stdout.write(f'  ✅ Published blog {blog.pk}: {blog.title}')
+                if options['once']:
+                    break
+                time.sleep(self.sleep_seconds(options['interval']))
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write('👋 Scheduler stopped')
+
+    @staticmethod
+    def sleep_seconds(interval):
+        upcoming = next_scheduled()
+        if upcoming is None:
+            return interval
+        # Wake just after the next post is due rather than up to a full interval late
+        return min(interval, max((upcoming - timezone.now()).total_seconds() + 0.5, 0.5))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from content.models import Blog, Research
+from content.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for blogs and research'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = rebuild_index([Blog, Research], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Indexed {total} documents'))
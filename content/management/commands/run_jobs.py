@@ -0,0 +1,37 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from content.jobs import run_pending
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (image uploads, derivatives, ...)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit instead of polling')
+        parser.add_argument('--poll', type=float, default=2.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--max-jobs', type=int, default=None, help='Exit after running this many jobs')
+        parser.add_argument('--worker-id', default=f'{socket.gethostname()}:{os.getpid()}')
+
+    def handle(self, *args, **options):
+        worker_id = options['worker_id']
+        remaining = options['max_jobs']
+        self.stdout.write(f'👷 Worker {worker_id} started')
+        try:
+            while True:
+                ran = run_pending(worker_id, limit=remaining)
+                if ran:
+                    self.stdout.write(f'  ✅ Ran {ran} jobs')
+                if remaining is not None:
+                    remaining -= ran
+                    if remaining <= 0:
+                        break
+                if options['once']:
+                    break
+                if not ran:
+                    time.sleep(options['poll'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'👋 Worker {worker_id} stopped')
@@ -0,0 +1,34 @@
+import hashlib
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(fileobj, chunk_size=HASH_CHUNK_SIZE):
+    """
+    SHA-256 hex digest of a file, read in chunks so large uploads are never
+    held in memory. The file is rewound afterwards so it can still be stored.
+    """
+    digest = hashlib.sha256()
+    if hasattr(fileobj, "seek"):
+        fileobj.seek(0)
+    if hasattr(fileobj, "chunks"):
+        chunks = fileobj.chunks(chunk_size)
+    else:
+        chunks = iter(lambda: fileobj.read(chunk_size), b"")
+    for chunk in chunks:
+        digest.update(chunk)
+    if hasattr(fileobj, "seek"):
+        fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def hash_path(path, chunk_size=HASH_CHUNK_SIZE):
+    with open(path, "rb") as fh:
+        return hash_file(fh, chunk_size)
+
+
+def upload_hash(upload):
+    """hash_file() for an uploaded file, memoized on the object so views and models share it."""
+    if not hasattr(upload, "_content_hash"):
+        upload._content_hash = hash_file(upload)
+    return upload._content_hash
@@ -0,0 +1,203 @@
+import gzip
+import os
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .export import MANIFEST as EXPORT_MANIFEST
+from .routers import replica_reads
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only without it
+    brotli = None
+
+ACCEPT_ENCODING_RE = _lazy_re_compile(r"\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*")
+
+
+class AsyncCapableWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware that can also sit in an async middleware chain.
+    WhiteNoise 6.6 is sync-only, which under ASGI would make every request
+    hold a thread for its whole duration.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class StaticExportMiddleware:
+    """
+    Serve the ``export_static`` output under ``STATIC_EXPORT_URL`` before any
+    view or database work. WhiteNoise indexes the export root once; every
+    build ends by rewriting the export manifest, so a manifest with a new
+    mtime means a new build generation and a fresh index. In DEBUG files
+    are looked up per request instead (WhiteNoise's autorefresh).
+    Feeds and sitemaps (content.syndication) are also served from the root,
+    where crawlers look for them.
+    """
+    sync_capable = True
+    async_capable = True
+    root_paths = ("/sitemap.xml", "/feeds/", "/sitemaps/")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_EXPORT_URL
+        self.manifest = os.path.join(settings.STATIC_EXPORT_ROOT, EXPORT_MANIFEST)
+        self.files = self.generation = None
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.static_response(request)
+        return response if response is not None else self.get_response(request)
+
+    async def __acall__(self, request):
+        response = self.static_response(request)
+        return response if response is not None else await self.get_response(request)
+
+    def current_files(self):
+        try:
+            generation = os.stat(self.manifest).st_mtime_ns
+        except OSError:
+            generation = None
+        if self.files is None or generation != self.generation:
+            self.files = WhiteNoise(
+                None, root=settings.STATIC_EXPORT_ROOT, prefix=self.prefix,
+                autorefresh=settings.DEBUG, max_age=settings.STATIC_EXPORT_MAX_AGE,
+            )
+            self.generation = generation
+        return self.files
+
+    def static_response(self, request):
+        path = request.path_info
+        if path.startswith(self.root_paths):
+            path = self.prefix + path[1:]
+        if path.startswith(self.prefix):
+            files = self.current_files()
+            static_file = files.find_file(path) if files.autorefresh else files.files.get(path)
+            if static_file is not None:
+                return WhiteNoiseMiddleware.serve(static_file, request)
+        return None
+
+
+class ReplicaReadMiddleware:
+    """
+    Let the reads of GET/HEAD/OPTIONS requests go to a read replica
+    (content.routers); other requests stay on the primary throughout.
+    """
+    sync_capable = True
+    async_capable = True
+    read_methods = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.method not in self.read_methods:
+            return self.get_response(request)
+        with replica_reads():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.method not in self.read_methods:
+            return await self.get_response(request)
+        with replica_reads():
+            return await self.get_response(request)
+
+
+def accepted_encoding(header, available):
+    """The client's preferred encoding among ``available`` (in server order), or None."""
+    weights = {}
+    for part in (header or "").split(","):
+        match = ACCEPT_ENCODING_RE.fullmatch(part)
+        if match:
+            try:
+                weights[match[1].lower()] = float(match[2]) if match[2] else 1.0
+            except ValueError:
+                continue
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Brotli- or gzip-encode API responses of ``COMPRESSION_CONTENT_TYPES``
+    once they reach ``COMPRESSION_MIN_SIZE`` bytes, per the request's
+    Accept-Encoding. Below the threshold the framing costs more than it saves.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+        self.content_types = tuple(settings.COMPRESSION_CONTENT_TYPES)
+        self.encoders = {}
+        if brotli is not None:
+            self.encoders["br"] = lambda data: brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+        self.encoders["gzip"] = lambda data: gzip.compress(data, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        content_type = response.get("Content-Type", "").split(";")[0].strip()
+        if response.streaming or response.has_header("Content-Encoding") or content_type not in self.content_types:
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if len(response.content) < self.min_size:
+            return response
+        encoding = accepted_encoding(request.META.get("HTTP_ACCEPT_ENCODING"), self.encoders)
+        if encoding is None:
+            return response
+        compressed = self.encoders[encoding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # The bytes changed, so a strong validator no longer applies (RFC 9110 8.8.1)
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0002_alter_contentimage_image_alter_imageasset_file'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['status', '-published_at', '-created_at', '-id'], name='blog_status_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='research',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='research_status_keyset_idx'),
+        ),
+    ]
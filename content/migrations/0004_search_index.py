@@ -0,0 +1,109 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:55
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+# Frozen here as of this migration; content.search may change how it indexes
+SEARCH_TABLE = "content_searchentry"
+FTS_TABLE = "content_searchentry_fts"
+NON_TEXT_KEYS = {"type", "id", "url", "src", "href", "image", "image_id", "style", "level", "align", "width", "height"}
+
+SQLITE_FORWARD = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    f"title, text, content='{SEARCH_TABLE}', content_rowid='id', tokenize='porter unicode61')",
+    f"CREATE TRIGGER {SEARCH_TABLE}_ai AFTER INSERT ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, text) VALUES (new.id, new.title, new.text); END",
+    f"CREATE TRIGGER {SEARCH_TABLE}_ad AFTER DELETE ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text) VALUES ('delete', old.id, old.title, old.text); END",
+    f"CREATE TRIGGER {SEARCH_TABLE}_au AFTER UPDATE ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text) VALUES ('delete', old.id, old.title, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, text) VALUES (new.id, new.title, new.text); END",
+]
+SQLITE_REVERSE = [
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+POSTGRES_FORWARD = [
+    f"ALTER TABLE {SEARCH_TABLE} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(text, '')), 'B')) STORED",
+    f"CREATE INDEX {SEARCH_TABLE}_vector_gin ON {SEARCH_TABLE} USING gin (search_vector)",
+]
+POSTGRES_REVERSE = [
+    f"DROP INDEX IF EXISTS {SEARCH_TABLE}_vector_gin",
+    f"ALTER TABLE {SEARCH_TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+def body_text(blocks):
+    chunks = []
+
+    def walk(value, key=None):
+        if key in NON_TEXT_KEYS:
+            return
+        if isinstance(value, str):
+            text = strip_tags(value).strip()
+            if text and not text.startswith(("http://", "https://")):
+                chunks.append(text)
+        elif isinstance(value, dict):
+            for k, v in value.items():
+                walk(v, k)
+        elif isinstance(value, (list, tuple)):
+            for v in value:
+                walk(v)
+
+    walk(blocks or [])
+    return "\n".join(chunks)
+
+
+def index_existing(apps, schema_editor):
+    SearchEntry = apps.get_model("content", "SearchEntry")
+    Blog, Research = apps.get_model("content", "Blog"), apps.get_model("content", "Research")
+    entries = [
+        SearchEntry(kind="blog", object_id=blog.pk, title=blog.title,
+                    text="\n".join(filter(None, [blog.summary, body_text(blog.body)])))
+        for blog in Blog.objects.all()
+    ]
+    entries += [
+        SearchEntry(kind="research", object_id=research.pk, title=research.title, text=research.description or "")
+        for research in Research.objects.all()
+    ]
+    SearchEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.TextField(blank=True)),
+                ('text', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='searchentry_kind_object_uniq')],
+            },
+        ),
+        migrations.RunPython(
+            run_for_vendor({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            run_for_vendor({"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE}),
+        ),
+        migrations.RunPython(index_existing, migrations.RunPython.noop),
+    ]
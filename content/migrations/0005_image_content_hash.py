@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentimage',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='imageasset',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_image_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageasset',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='imageasset',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='imageasset',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
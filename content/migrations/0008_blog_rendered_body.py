@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0007_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='body_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='body_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Minutes'),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
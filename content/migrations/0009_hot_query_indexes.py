@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0008_blog_rendered_body'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['status', 'updated_at'], name='blog_status_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='blog_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['-published_at', '-created_at', '-id'], name='blog_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='research',
+            index=models.Index(fields=['status', 'updated_at'], name='research_status_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='research',
+            index=models.Index(fields=['-created_at', '-id'], name='research_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:37
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# SQLite rebuilds content_searchentry for the new column and constraint,
+# which drops the triggers keeping the FTS5 table in sync; the rows keep
+# their ids, so the index itself stays valid.
+search_index = import_module("content.migrations.0004_search_index")
+SQLITE_TRIGGERS = [sql for sql in search_index.SQLITE_FORWARD if sql.startswith("CREATE TRIGGER")]
+
+
+def restore_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in search_index.SQLITE_REVERSE:
+            if sql.startswith("DROP TRIGGER"):
+                schema_editor.execute(sql)
+        for sql in SQLITE_TRIGGERS:
+            schema_editor.execute(sql)
+
+
+def delete_pages(apps, schema_editor):
+    # The old (kind, object_id) constraint allows one entry per item
+    SearchEntry = apps.get_model("content", "SearchEntry")
+    SearchEntry.objects.filter(page__gt=0).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0009_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_triggers),
+        migrations.RemoveConstraint(
+            model_name='searchentry',
+            name='searchentry_kind_object_uniq',
+        ),
+        migrations.AddField(
+            model_name='research',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='research',
+            name='extracted_hash',
+            field=models.CharField(blank=True, default='', editable=False, help_text='content_hash of the file whose text is indexed', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='research',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, help_text='Bytes', null=True),
+        ),
+        migrations.AddField(
+            model_name='research',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='searchentry',
+            name='page',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='searchentry',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id', 'page'), name='searchentry_kind_object_page_uniq'),
+        ),
+        migrations.RunPython(restore_triggers, delete_pages),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import Truncator
+
+
+def fill_feed(apps, schema_editor):
+    now = timezone.now()
+    Blog, Research = apps.get_model("content", "Blog"), apps.get_model("content", "Research")
+    PublishedBlog = apps.get_model("content", "PublishedBlog")
+    PublishedResearch = apps.get_model("content", "PublishedResearch")
+    PublishedBlog.objects.bulk_create([
+        PublishedBlog(item=blog, slug=blog.slug, title=blog.title, summary=Truncator(blog.summary).chars(500),
+                      published_at=blog.published_at, created_at=blog.created_at, updated_at=blog.updated_at)
+        for blog in Blog.objects.filter(Q(published_at__isnull=True) | Q(published_at__lte=now), status="published")
+    ], batch_size=500)
+    PublishedResearch.objects.bulk_create([
+        PublishedResearch(item=research, slug=research.slug, title=research.title,
+                          summary=Truncator(research.description).chars(500),
+                          created_at=research.created_at, updated_at=research.updated_at)
+        for research in Research.objects.filter(status="published")
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0010_research_document_pages'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublishedBlog',
+            fields=[
+                ('slug', models.SlugField(max_length=250)),
+                ('title', models.CharField(max_length=220)),
+                ('summary', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='published_entry', serialize=False, to='content.blog')),
+                ('published_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-published_at', '-created_at', '-item'], name='feed_blog_keyset_idx'), models.Index(fields=['-created_at', '-item'], name='feed_blog_created_idx'), models.Index(fields=['updated_at', 'item'], name='feed_blog_updated_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PublishedResearch',
+            fields=[
+                ('slug', models.SlugField(max_length=250)),
+                ('title', models.CharField(max_length=220)),
+                ('summary', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='published_entry', serialize=False, to='content.research')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-created_at', '-item'], name='feed_research_keyset_idx'), models.Index(fields=['updated_at', 'item'], name='feed_research_updated_idx')],
+            },
+        ),
+        migrations.RunPython(fill_feed, migrations.RunPython.noop),
+    ]
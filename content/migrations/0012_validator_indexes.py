@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0011_published_feed'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='blog',
+            name='blog_status_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='research',
+            name='research_status_updated_idx',
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['status', 'updated_at', 'featured_image'], name='blog_status_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='research',
+            index=models.Index(fields=['status', 'updated_at', 'featured_image'], name='research_status_updated_idx'),
+        ),
+    ]
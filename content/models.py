@@ -1,10 +1,18 @@
+import logging
 import uuid
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
 from django.utils.text import slugify
 from cloudinary.models import CloudinaryField  # Import CloudinaryField
+from .media import upload_hash
+from .images import generate_derivatives
+from .blocks import render as render_blocks
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 def upload_to(instance, filename):
@@ -36,34 +44,141 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
-class ImageAsset(TimeStampedModel):
+class ContentHashedModel(models.Model):
+    """
+    Stores the SHA-256 of the file in ``hashed_field`` whenever a new upload is
+    assigned, so identical content can be found and reused.
+    """
+    content_hash = models.CharField(max_length=64, blank=True, default="", db_index=True)
+
+    hashed_field = None
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        upload = getattr(self, self.hashed_field)
+        if isinstance(upload, UploadedFile):
+            self.content_hash = upload_hash(upload)
+        super().save(*args, **kwargs)
+
+
+class ImageAsset(ContentHashedModel, TimeStampedModel):
     """Reusable image (for blog inline images or research banners)."""
     # Replace ImageField with CloudinaryField
     file = CloudinaryField('image', blank=True, null=True)
     alt_text = models.CharField(max_length=255, blank=True, default="")
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    # Resized variants, see content.images
+    derivatives = models.JSONField(default=list, blank=True)
+
+    hashed_field = "file"
+
+    def save(self, *args, **kwargs):
+        upload = self.file if isinstance(self.file, UploadedFile) else None
+        super().save(*args, **kwargs)
+        if upload is not None:
+            try:
+                generate_derivatives(self, upload)
+            except (OSError, ValueError) as e:
+                # The original is stored either way; derivatives can be backfilled
+                logger.warning("Could not generate derivatives for ImageAsset %s: %s", self.pk, e)
 
     def __str__(self):
         return self.alt_text or (str(self.file) if self.file else "No image")
 
 
+class ContentQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.denormalize()
+        self.model.allocate_slugs(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class ContentBase(TimeStampedModel):
     """Abstract base for content with title and slug."""
     title = models.CharField(max_length=220)
     slug = models.SlugField(max_length=250, unique=True, blank=True)
 
+    objects = ContentQuerySet.as_manager()
+
+    SLUG_RETRIES = 5
+
     class Meta:
         abstract = True
 
+    def denormalize(self):
+        """Refresh columns derived from other fields; called before every save and bulk_create."""
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base = slugify(self.title)[:200]
-            candidate = base
-            i = 1
-            while self.__class__.objects.filter(slug=candidate).exclude(pk=self.pk).exists():
-                i += 1
-                candidate = f"{base}-{i}"
-            self.slug = candidate
-        super().save(*args, **kwargs)
+        self.denormalize()
+        if self.slug:
+            return super().save(*args, **kwargs)
+        # Another writer can take the same slug between allocation and insert;
+        # the unique constraint catches it and we allocate again.
+        for attempt in range(self.SLUG_RETRIES):
+            self.allocate_slugs([self])
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                taken = self.__class__.objects.filter(slug=self.slug).exclude(pk=self.pk).exists()
+                if not taken or attempt == self.SLUG_RETRIES - 1:
+                    raise
+                self.slug = ""
+
+    @classmethod
+    def allocate_slugs(cls, instances):
+        """
+        Fill in ``slug`` for every instance without one, as ``base`` or
+        ``base-N`` with N the smallest free suffix from 2 (a taken
+        ``base-2025`` does not push new posts to ``base-2026``). Existing
+        slugs for all bases are fetched in one query per chunk of bases, so
+        the cost no longer grows with the number of posts sharing a title.
+        """
+        pending = [obj for obj in instances if not obj.slug]
+        if not pending:
+            return
+        bases = [slugify(obj.title)[:200] for obj in pending]
+        exclude = [obj.pk for obj in pending if obj.pk is not None]
+        used = cls._slugs_in_use(set(bases), exclude) | {obj.slug for obj in instances if obj.slug}
+
+        state = {}  # base -> (base itself taken, numeric suffixes in use)
+        for base in set(bases):
+            prefix = f"{base}-"
+            suffixes = set()
+            for slug in used:
+                suffix = slug[len(prefix):]
+                if slug.startswith(prefix) and suffix.isdigit():
+                    suffixes.add(int(suffix))
+            state[base] = (base in used, suffixes)
+
+        for obj, base in zip(pending, bases):
+            taken, suffixes = state[base]
+            if not taken:
+                obj.slug = base
+                state[base] = (True, suffixes)
+                continue
+            n = 2
+            while n in suffixes:
+                n += 1
+            suffixes.add(n)
+            obj.slug = f"{base}-{n}"
+
+    @classmethod
+    def _slugs_in_use(cls, bases, exclude=(), chunk_size=100):
+        bases = sorted(bases)
+        used = set()
+        for i in range(0, len(bases), chunk_size):
+            chunk = bases[i:i + chunk_size]
+            query = Q(slug__in=chunk)
+            for base in chunk:
+                query |= Q(slug__startswith=f"{base}-")
+            used.update(cls.objects.filter(query).exclude(pk__in=exclude).values_list("slug", flat=True))
+        return used
 
 
 class Blog(ContentBase):
@@ -83,15 +198,43 @@ class Blog(ContentBase):
     body = models.JSONField(default=list, blank=True)
     status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=DRAFT)
     published_at = models.DateTimeField(null=True, blank=True)
+    # Compiled from ``body`` on save, see content.blocks
+    body_html = models.TextField(blank=True, default="", editable=False)
+    body_text = models.TextField(blank=True, default="", editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False, help_text="Minutes")
+
+    RENDERED_FIELDS = ("body_html", "body_text", "word_count", "reading_time")
 
     class Meta:
         ordering = ["-published_at", "-created_at"]
+        indexes = [
+            # Backs the public list and keyset pagination (see content.pagination.KeysetPagination)
+            models.Index(fields=["status", "-published_at", "-created_at", "-id"], name="blog_status_keyset_idx"),
+            # List validators (content.conditional): MAX(updated_at) with the featured image's
+            models.Index(fields=["status", "updated_at", "featured_image"], name="blog_status_updated_idx"),
+            # ?ordering=created_at / -created_at
+            models.Index(fields=["status", "-created_at", "-id"], name="blog_status_created_idx"),
+            # Staff API list and admin changelist, which see every status
+            models.Index(fields=["-published_at", "-created_at", "-id"], name="blog_recent_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    def denormalize(self):
+        rendered = render_blocks(self.body)
+        self.body_html, self.body_text = rendered["html"], rendered["text"]
+        self.word_count, self.reading_time = rendered["word_count"], rendered["reading_time"]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "body" in update_fields:
+            kwargs["update_fields"] = {*update_fields, *self.RENDERED_FIELDS}
+        super().save(*args, **kwargs)
+
 
-class Research(ContentBase):
+class Research(ContentHashedModel, ContentBase):
     DRAFT = "draft"
     IN_REVIEW = "in_review"
     PUBLISHED = "published"
@@ -108,18 +251,138 @@ class Research(ContentBase):
     status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=DRAFT)
     # For file field, keep FileField or use CloudinaryField if uploading all files to Cloudinary (images/audio/docs)
     file = models.FileField(upload_to=upload_to, blank=True, null=True)
+    # Filled in by content.documents once the file has been read
+    page_count = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True, editable=False, help_text="Bytes")
+    extracted_hash = models.CharField(max_length=64, blank=True, default="", editable=False,
+                                      help_text="content_hash of the file whose text is indexed")
+
+    hashed_field = "file"
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "-created_at", "-id"], name="research_status_keyset_idx"),
+            # List validators (with the featured image's updated_at) and public ?ordering=updated_at
+            models.Index(fields=["status", "updated_at", "featured_image"], name="research_status_updated_idx"),
+            # Staff API list and admin changelist
+            models.Index(fields=["-created_at", "-id"], name="research_recent_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
 
-class ContentImage(TimeStampedModel):
+class ContentImage(ContentHashedModel, TimeStampedModel):
     """Inline image used in content blocks."""
     image = CloudinaryField('image', blank=True, null=True)
     alt_text = models.CharField(max_length=255, blank=True, default="")
 
+    hashed_field = "image"
+
     def __str__(self):
         return self.alt_text or (str(self.image) if self.image else "No image")
+
+
+class SearchEntry(models.Model):
+    """
+    Denormalized searchable text for one Blog or Research row, maintained by
+    content.signals. The database-specific full-text index over it is created
+    in migration 0004 (see content.search). Research documents add one row
+    per page of their file (``page`` 1..n, see content.documents) next to the
+    ``page`` 0 row for the item itself.
+    """
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    page = models.PositiveIntegerField(default=0)
+    title = models.TextField(blank=True)
+    text = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id", "page"], name="searchentry_kind_object_page_uniq"),
+        ]
+
+    def __str__(self):
+        if self.page:
+            return f"{self.kind}:{self.object_id}:p{self.page}"
+        return f"{self.kind}:{self.object_id}"
+
+
+class PublishedEntry(models.Model):
+    """
+    One row per publicly visible item, kept in step by content.published:
+    the ordering keys and list columns of published items only, so public
+    lists page through this small table and join the item by primary key.
+    """
+    slug = models.SlugField(max_length=250)
+    title = models.CharField(max_length=220)
+    summary = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    # For readers of the feed itself; the API serializes the joined item
+    LIST_FIELDS = ("slug", "title", "summary")
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return self.title
+
+
+class PublishedBlog(PublishedEntry):
+    item = models.OneToOneField(Blog, on_delete=models.CASCADE, primary_key=True, related_name="published_entry")
+    published_at = models.DateTimeField(null=True, blank=True)
+
+    search_kind = "blog"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-published_at", "-created_at", "-item"], name="feed_blog_keyset_idx"),
+            models.Index(fields=["-created_at", "-item"], name="feed_blog_created_idx"),
+            # Covers MAX(updated_at)/COUNT list validators
+            models.Index(fields=["updated_at", "item"], name="feed_blog_updated_idx"),
+        ]
+
+
+class PublishedResearch(PublishedEntry):
+    item = models.OneToOneField(Research, on_delete=models.CASCADE, primary_key=True, related_name="published_entry")
+
+    search_kind = "research"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-item"], name="feed_research_keyset_idx"),
+            models.Index(fields=["updated_at", "item"], name="feed_research_updated_idx"),
+        ]
+
+
+class Job(TimeStampedModel):
+    """A unit of background work, run by the ``run_jobs`` worker (see content.jobs)."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (RUNNING, "Running"), (SUCCEEDED, "Succeeded"), (FAILED, "Failed")]
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    result = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="job_status_run_after_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
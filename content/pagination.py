@@ -0,0 +1,205 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError as APIValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over ``view.keyset_ordering``.
+
+    Cursors are opaque base64 tokens holding the ordering values of the row at
+    the page boundary, so each page is a ``WHERE (keys) < (cursor) LIMIT n``
+    that an index on the ordering columns answers without OFFSET or COUNT.
+    Nullable keys keep the backend's native NULL placement (smallest on SQLite,
+    largest on Postgres) so plain ``DESC`` indexes still match the ORDER BY.
+    """
+    cursor_query_param = "cursor"
+    page_query_param = "page"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_rows(list(self.page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self.set_rows([row async for row in self.page_queryset(queryset, request, view)])
+
+    def page_queryset(self, queryset, request, view):
+        """The page's query, one row longer than the page to tell whether more follow."""
+        self.request = request
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.page_query_param)
+        self.keys = self.get_keys(queryset.model, view.keyset_ordering)
+
+        self.position, self.reverse = self.decode_cursor(request)
+        keys = [(name, not desc, nullable) for name, desc, nullable in self.keys] if self.reverse else self.keys
+
+        queryset = queryset.order_by(*[f"-{name}" if desc else name for name, desc, _ in keys])
+        if self.position is not None:
+            nulls_largest = connections[queryset.db].vendor in ("postgresql", "oracle")
+            queryset = queryset.filter(self.after(keys, self.position, nulls_largest))
+        return queryset[:self.page_size + 1]
+
+    def set_rows(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = self.position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+        self.rows = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not (self.has_next and self.rows):
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.rows[-1], False))
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.rows):
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.rows[0], True))
+
+    def get_keys(self, model, ordering):
+        self.fields, keys = [], []
+        for item in ordering:
+            name = item.lstrip("-")
+            field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+            self.fields.append(field)
+            keys.append((field.attname, item.startswith("-"), field.null))
+        return keys
+
+    @staticmethod
+    def after(keys, position, nulls_largest):
+        """Q for rows strictly after ``position`` in the (possibly reversed) key order."""
+        clauses = []
+        for i, (name, desc, nullable) in enumerate(keys):
+            value = position[i]
+            nulls_last = desc != nulls_largest
+            if value is None:
+                if nulls_last:
+                    continue
+                clause = Q(**{f"{name}__isnull": False})
+            else:
+                clause = Q(**{f"{name}__{'lt' if desc else 'gt'}": value})
+                if nullable and nulls_last:
+                    clause |= Q(**{f"{name}__isnull": True})
+            for prev_name, prev_value in zip([k[0] for k in keys[:i]], position[:i]):
+                if prev_value is None:
+                    clause &= Q(**{f"{prev_name}__isnull": True})
+                else:
+                    clause &= Q(**{prev_name: prev_value})
+            clauses.append(clause)
+        return reduce(or_, clauses) if clauses else Q(pk__in=[])
+
+    def encode_cursor(self, row, reverse):
+        values = []
+        for name, _, _ in self.keys:
+            value = getattr(row, name)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        payload = json.dumps({"p": values, "r": int(reverse)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            values, reverse = payload["p"], bool(payload.get("r"))
+            if len(values) != len(self.keys):
+                raise ValueError
+            position = [
+                None if value is None else field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+
+class ContentPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; passing ``?cursor=`` (empty for the
+    first page) switches to keyset pagination over ``view.keyset_ordering``.
+    Cursors only follow that fixed order, so ``?ordering=`` and ``?search=``
+    (relevance order) are rejected alongside them.
+    """
+    cursor_query_param = "cursor"
+    keyset_conflicts = (api_settings.ORDERING_PARAM, api_settings.SEARCH_PARAM)
+    keyset_conflict_message = "?cursor= pages in a fixed order and cannot be combined with ?{param}=; use ?page= instead."
+
+    def use_keyset(self, request, view):
+        if self.cursor_query_param not in request.query_params or not getattr(view, "keyset_ordering", None):
+            return False
+        for param in self.keyset_conflicts:
+            if param in request.query_params:
+                raise APIValidationError({self.cursor_query_param: [self.keyset_conflict_message.format(param=param)]})
+        return True
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request, view):
+            self.keyset = KeysetPagination(self.get_page_size(request))
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` through the async ORM: ``acount()`` and async iteration of the page."""
+        self.keyset = None
+        if self.use_keyset(request, view):
+            self.keyset = KeysetPagination(self.get_page_size(request))
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached_property; filling it in keeps page() from counting synchronously
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,164 @@
+"""
+The published feed and scheduled publishing.
+
+``PublishedBlog``/``PublishedResearch`` hold one row per publicly visible
+item: its ordering keys and list columns, primary key shared with the item.
+``sync_feed`` adds or removes an item's row whenever it is saved (from
+content.signals), so public lists page through rows that are all visible
+and join each item by primary key; drafts and in-review items are never
+read. Counts and ``Last-Modified`` come from the feed too.
+
+A blog is visible once published and its ``published_at`` has passed; a
+future ``published_at`` schedules it. ``publish_due`` moves scheduled posts
+into the feed when their time comes, as a save would (cache versions,
+search, static export); the ``publish_scheduled`` command runs it in a
+loop. Research has no publication date and is visible as soon as it is
+published.
+
+Writes that skip ``save()`` must keep the feed in step themselves:
+``bulk_create``/``bulk_update`` callers pass their rows to
+``content.signals.bulk_saved`` (or ``touch``). Raw saves from ``loaddata``
+run no feed or search receivers; follow them with ``publish_scheduled
+--rebuild --once`` and ``rebuild_search_index``.
+"""
+import math
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from .models import Blog, PublishedBlog, PublishedEntry, PublishedResearch, Research
+
+FEEDS = {Blog: PublishedBlog, Research: PublishedResearch}
+SUMMARY_CHARS = 500
+
+
+def is_visible(instance, now):
+    if instance.status != "published":
+        return False
+    published_at = getattr(instance, "published_at", None)
+    return published_at is None or published_at <= now
+
+
+def feed_entry(feed, instance):
+    summary = instance.summary if isinstance(instance, Blog) else instance.description
+    entry = feed(
+        item=instance, slug=instance.slug, title=instance.title, summary=Truncator(summary).chars(SUMMARY_CHARS),
+        created_at=instance.created_at, updated_at=instance.updated_at,
+    )
+    if isinstance(instance, Blog):
+        entry.published_at = instance.published_at
+    return entry
+
+
+def sync_feed(model, instances, now=None):
+    """Add, refresh or drop the feed rows of saved ``instances`` of ``model``."""
+    feed = FEEDS[model]
+    now = now or timezone.now()
+    visible, hidden = [], []
+    for obj in instances:
+        (visible if is_visible(obj, now) else hidden).append(obj)
+    if hidden:
+        feed.objects.filter(pk__in=[obj.pk for obj in hidden]).delete()
+    if visible:
+        fields = [f.name for f in feed._meta.concrete_fields if not f.primary_key]
+        feed.objects.bulk_create(
+            [feed_entry(feed, obj) for obj in visible],
+            update_conflicts=True, unique_fields=["item"], update_fields=fields, batch_size=500,
+        )
+
+
+def rebuild_feed(models=(Blog, Research), chunk_size=500):
+    """Recompute the feed from scratch; returns the number of visible items."""
+    total = 0
+    for model in models:
+        feed = FEEDS[model]
+        with transaction.atomic():
+            feed.objects.all().delete()
+            now, batch = timezone.now(), []
+            for instance in model.objects.filter(status="published").iterator(chunk_size=chunk_size):
+                if is_visible(instance, now):
+                    batch.append(feed_entry(feed, instance))
+                if len(batch) >= chunk_size:
+                    total += len(feed.objects.bulk_create(batch))
+                    batch = []
+            total += len(feed.objects.bulk_create(batch))
+    return total
+
+
+def due_blogs(now):
+    return Blog.objects.filter(status=Blog.PUBLISHED, published_at__lte=now, published_entry__isnull=True)
+
+
+def publish_due(now=None):
+    """Put scheduled blogs whose ``published_at`` has passed into the feed; returns them."""
+    from .signals import bulk_saved  # content.signals keeps the feed in step through this module
+
+    now = now or timezone.now()
+    due = list(due_blogs(now))
+    if due:
+        with transaction.atomic():
+            bulk_saved(Blog, due)
+    return due
+
+
+def scheduled_dates(now):
+    return (
+        Blog.objects.filter(status=Blog.PUBLISHED, published_at__gt=now)
+        .order_by("published_at").values_list("published_at", flat=True)
+    )
+
+
+def next_scheduled(now=None):
+    """The earliest future ``published_at`` of a published blog, or None."""
+    return scheduled_dates(now or timezone.now()).first()
+
+
+async def anext_scheduled(now=None):
+    return await scheduled_dates(now or timezone.now()).afirst()
+
+
+def until_scheduled(timeout, upcoming, now=None):
+    """
+    ``timeout`` cut short so a cached response expires once the blog due
+    at ``upcoming`` goes public. The scheduler's version bump may land in
+    another process's cache, so expiry is what guarantees the public lists
+    change on time.
+    """
+    if upcoming is None:
+        return timeout
+    seconds = math.ceil((upcoming - (now or timezone.now())).total_seconds())
+    return max(1, min(timeout, seconds))
+
+
+def feed_item_field(model):
+    """Name of the feed row's link to its item, or None for anything but a feed model."""
+    return "item" if issubclass(model, PublishedEntry) else None
+
+
+class PublishedFeedMixin:
+    """
+    Public lists read the published feed. ``public_queryset`` turns the
+    item queryset into feed rows joined to their items (same select_related)
+    for ``list``, and restricts it to items in the feed otherwise; pages of
+    feed rows are handed to the serializer as items.
+    """
+
+    def public_queryset(self, queryset):
+        if self.action != "list":
+            return queryset.filter(published_entry__isnull=False)
+        select_related = queryset.query.select_related
+        related = ["item"] + [f"item__{name}" for name in select_related] if isinstance(select_related, dict) else ["item"]
+        return FEEDS[queryset.model].objects.select_related(*related).defer(*PublishedEntry.LIST_FIELDS)
+
+    def paginate_queryset(self, queryset):
+        return self.feed_items(super().paginate_queryset(queryset))
+
+    async def apaginate_queryset(self, queryset):
+        return self.feed_items(await super().apaginate_queryset(queryset))
+
+    @staticmethod
+    def feed_items(rows):
+        if rows and isinstance(rows[0], PublishedEntry):
+            return [row.item for row in rows]
+        return rows
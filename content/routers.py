@@ -0,0 +1,74 @@
+"""
+Read replicas.
+
+With ``DATABASE_REPLICA_URLS`` set, settings adds a ``replicaN`` alias per
+URL and lists them in ``DATABASE_REPLICAS``. ``ReplicaReadMiddleware`` picks
+one replica for each GET/HEAD/OPTIONS request and ``ReplicaRouter`` sends
+that request's reads there. Writes, reads inside a transaction, other
+requests, management commands and the job worker all use ``default``.
+
+Read-your-writes: each write to a model pins that model's reads to the
+primary for ``DATABASE_REPLICA_STICKY_SECONDS``, for every client. A staff
+member who just saved sees the edit on the next request, and no public
+request in that window can cache a lagging replica's rows under the version
+the save just bumped (content.cache). Pins live in the API cache, which
+must be shared between workers: the content.E001 system check refuses
+replicas with a per-process or dummy cache.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .cache import get_cache
+
+_replica = ContextVar("replica", default=None)
+
+
+@contextmanager
+def replica_reads():
+    """Route reads in this block to one randomly chosen replica (if any are configured)."""
+    replicas = settings.DATABASE_REPLICAS
+    token = _replica.set(random.choice(replicas) if replicas else None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def _pin_key(model):
+    return f"db:primary:{model._meta.label_lower}"
+
+
+def pin_to_primary(model):
+    seconds = settings.DATABASE_REPLICA_STICKY_SECONDS
+    if seconds:
+        get_cache().set(_pin_key(model), True, seconds)
+
+
+def pinned_to_primary(model):
+    return get_cache().get(_pin_key(model)) is not None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replica = _replica.get()
+        if replica is None or replica not in settings.DATABASE_REPLICAS:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block or pinned_to_primary(model):
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        if settings.DATABASE_REPLICAS:
+            pin_to_primary(model)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db in settings.DATABASE_REPLICAS else None
@@ -0,0 +1,305 @@
+"""
+Full-text search over blogs and research.
+
+Searchable text (title, summary/description and the text inside ``Blog.body``
+blocks) is copied into ``SearchEntry`` rows on save. The database indexes
+those rows natively: an FTS5 external-content table on SQLite, a generated
+``tsvector`` column with a GIN index on Postgres (both created in migration
+0004). Other backends fall back to DRF's icontains ``SearchFilter``.
+
+Research documents also have one entry per page of their file
+(content.documents). Item searches rank an item by its best entry, so text
+inside the PDF finds the item; ``page_hits`` returns the pages themselves
+with a highlighted snippet.
+"""
+import html
+import re
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.db.models import IntegerField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+from .blocks import render_text
+
+SEARCH_TABLE = "content_searchentry"
+FTS_TABLE = "content_searchentry_fts"
+MAX_RESULTS = 1000
+# Marks matched words in snippets; replaced by <mark> once the text is escaped
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\x02", "\x03"
+
+PageHit = namedtuple("PageHit", ["object_id", "page", "snippet"])
+
+
+def document_for(instance):
+    """(kind, title, text) indexed for a Blog or Research instance."""
+    kind = instance._meta.model_name
+    if kind == "blog":
+        # Historical models (migrations) have no body_text column yet
+        body_text = getattr(instance, "body_text", None) or render_text(instance.body)
+        parts = [instance.summary, body_text]
+    else:
+        parts = [instance.description]
+    # The slug is one of the search_fields; index its words so ?search= finds it
+    parts.append(instance.slug.replace("-", " "))
+    return kind, instance.title, "\n".join(filter(None, parts))
+
+
+class SQLiteBackend:
+    rank_weights = (10.0, 1.0)  # title, text
+
+    @staticmethod
+    def to_query(term):
+        # Quote every token so user input can never be FTS5 syntax; prefix-match the last
+        tokens = re.findall(r"\w+", term)
+        if not tokens:
+            return None
+        quoted = [f'"{t}"' for t in tokens]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+
+    def ranked_ids(self, kind, query, within, limit):
+        # bm25() only works in the MATCH query itself, so rank the entries
+        # first; MATERIALIZED (SQLite 3.35+) stops the planner merging the two
+        within_sql, within_params = within
+        weights = ", ".join(str(w) for w in self.rank_weights)
+        return (
+            f"WITH hits AS MATERIALIZED (SELECT e.object_id, bm25({FTS_TABLE}, {weights}) AS rank "
+            f"FROM {FTS_TABLE} JOIN {SEARCH_TABLE} e ON e.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND e.kind = %s) "
+            f"SELECT object_id FROM hits WHERE object_id IN ({within_sql}) "
+            f"GROUP BY object_id ORDER BY min(rank) LIMIT %s",
+            (query, kind, *within_params, limit),
+        )
+
+    def page_hits(self, kind, query, within, limit):
+        within_sql, within_params = within
+        weights = ", ".join(str(w) for w in self.rank_weights)
+        return (
+            f"SELECT e.object_id, e.page, snippet({FTS_TABLE}, 1, %s, %s, '…', 24) "
+            f"FROM {FTS_TABLE} JOIN {SEARCH_TABLE} e ON e.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND e.kind = %s AND e.page > 0 AND e.object_id IN ({within_sql}) "
+            f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s",
+            (HIGHLIGHT_START, HIGHLIGHT_STOP, query, kind, *within_params, limit),
+        )
+
+    @staticmethod
+    def position(ids, pk_column):
+        return f"instr(%s, ',' || {pk_column} || ',')", ("," + ",".join(map(str, ids)) + ",",)
+
+
+class PostgresBackend:
+    config = "english"
+
+    @staticmethod
+    def to_query(term):
+        return term.strip() or None
+
+    def ranked_ids(self, kind, query, within, limit):
+        within_sql, within_params = within
+        return (
+            f"SELECT object_id FROM {SEARCH_TABLE} "
+            f"WHERE kind = %s AND search_vector @@ websearch_to_tsquery('{self.config}', %s) "
+            f"AND object_id IN ({within_sql}) GROUP BY object_id "
+            f"ORDER BY max(ts_rank(search_vector, websearch_to_tsquery('{self.config}', %s))) DESC LIMIT %s",
+            (kind, query, *within_params, query, limit),
+        )
+
+    def page_hits(self, kind, query, within, limit):
+        # ts_headline re-parses the text, so only for the pages that made the cut
+        within_sql, within_params = within
+        options = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MinWords=15, MaxWords=35"
+        return (
+            f"SELECT object_id, page, ts_headline('{self.config}', text, websearch_to_tsquery('{self.config}', %s), %s) "
+            f"FROM (SELECT object_id, page, text, "
+            f"ts_rank(search_vector, websearch_to_tsquery('{self.config}', %s)) AS rank FROM {SEARCH_TABLE} "
+            f"WHERE kind = %s AND page > 0 AND search_vector @@ websearch_to_tsquery('{self.config}', %s) "
+            f"AND object_id IN ({within_sql}) ORDER BY rank DESC LIMIT %s) hits ORDER BY rank DESC",
+            (query, options, query, kind, query, *within_params, limit),
+        )
+
+    @staticmethod
+    def position(ids, pk_column):
+        return f"array_position(%s::bigint[], {pk_column})", (list(ids),)
+
+
+BACKENDS = {"sqlite": SQLiteBackend, "postgresql": PostgresBackend}
+
+
+def search_kind(model):
+    # Published feed models (content.published) search their items' entries
+    return getattr(model, "search_kind", model._meta.model_name)
+
+
+def get_backend(using="default"):
+    backend = BACKENDS.get(connections[using].vendor)
+    return backend() if backend else None
+
+
+def search(queryset, term, order=True):
+    """
+    Restrict ``queryset`` to the best ``MAX_RESULTS`` rows matching ``term``,
+    annotated with ``search_rank`` (1 = best) and, if ``order``, sorted by it.
+    Returns None when the database has no full-text backend.
+    """
+    backend = get_backend(queryset.db)
+    if backend is None:
+        return None
+    query = backend.to_query(term)
+    if query is None:
+        return queryset.none()
+    return restrict(queryset, ranked_ids(queryset, backend, query), backend, order)
+
+
+async def asearch(queryset, term, order=True):
+    """``search`` for async views. Raw cursors have no async API, so the ranking query goes through a thread."""
+    backend = get_backend(queryset.db)
+    if backend is None:
+        return None
+    query = backend.to_query(term)
+    if query is None:
+        return queryset.none()
+    ids = await sync_to_async(ranked_ids)(queryset, backend, query)
+    return restrict(queryset, ids, backend, order)
+
+
+def ranked_ids(queryset, backend, query):
+    # One indexed lookup computes the ranking; the main query then only
+    # touches matching rows by primary key. The cap applies to rows of
+    # ``queryset`` (e.g. published only), so others cannot crowd them out.
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(*backend.ranked_ids(search_kind(queryset.model), query, within(queryset), MAX_RESULTS))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def within(queryset):
+    """(sql, params) selecting the primary keys of ``queryset``."""
+    return queryset.order_by().values("pk").query.get_compiler(using=queryset.db).as_sql()
+
+
+def restrict(queryset, ids, backend, order):
+    if not ids:
+        return queryset.none()
+    queryset = queryset.filter(pk__in=ids)
+    if order:
+        # Position in the ranked id list, so lower is better
+        model = queryset.model
+        pk_column = f'"{model._meta.db_table}"."{model._meta.pk.column}"'
+        rank = RawSQL(*backend.position(ids, pk_column), output_field=IntegerField())
+        queryset = queryset.annotate(search_rank=rank).order_by("search_rank")
+    return queryset
+
+
+def page_hits(queryset, term, limit=MAX_RESULTS):
+    """
+    The best ``limit`` document pages of the items in ``queryset`` matching
+    ``term``, as ``PageHit``s whose ``snippet`` is escaped HTML with the
+    matched words in ``<mark>``. None when the database has no full-text
+    backend.
+    """
+    backend = get_backend(queryset.db)
+    if backend is None:
+        return None
+    query = backend.to_query(term)
+    if query is None:
+        return []
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(*backend.page_hits(search_kind(queryset.model), query, within(queryset), limit))
+        return [PageHit(object_id, page, highlight(snippet)) for object_id, page, snippet in cursor.fetchall()]
+
+
+def highlight(snippet):
+    snippet = html.escape(" ".join(snippet.split()))
+    return snippet.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+
+
+def index_instance(instance):
+    from .models import SearchEntry
+
+    kind, title, text = document_for(instance)
+    SearchEntry.objects.update_or_create(
+        kind=kind, object_id=instance.pk, page=0, defaults={"title": title, "text": text}
+    )
+
+
+def index_instances(instances):
+    """Reindex many saved instances of one model with a delete and a bulk insert."""
+    from .models import SearchEntry
+
+    instances = list(instances)
+    if not instances:
+        return
+    kind = instances[0]._meta.model_name
+    SearchEntry.objects.filter(kind=kind, object_id__in=[obj.pk for obj in instances], page=0).delete()
+    SearchEntry.objects.bulk_create(
+        [SearchEntry(kind=kind, object_id=obj.pk, title=title, text=text)
+         for obj in instances for _, title, text in [document_for(obj)]],
+        batch_size=500,
+    )
+
+
+def unindex_instance(instance):
+    """Drop the item's entry and any document pages."""
+    from .models import SearchEntry
+
+    SearchEntry.objects.filter(kind=instance._meta.model_name, object_id=instance.pk).delete()
+
+
+def rebuild_index(models, chunk_size=500):
+    """Rebuild the item entries; document pages only change when their file is extracted again."""
+    from .models import SearchEntry
+
+    total = 0
+    for model in models:
+        kind = model._meta.model_name
+        SearchEntry.objects.filter(kind=kind, page=0).delete()
+        batch = []
+        for instance in model.objects.iterator(chunk_size=chunk_size):
+            _, title, text = document_for(instance)
+            batch.append(SearchEntry(kind=kind, object_id=instance.pk, title=title, text=text))
+            if len(batch) >= chunk_size:
+                SearchEntry.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        SearchEntry.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` backed by the full-text index, ranked by relevance unless the
+    client passes an explicit ``?ordering=``. List it after OrderingFilter.
+    Falls back to icontains over ``search_fields`` without a backend.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        term = self.search_term(request)
+        if not term:
+            return queryset
+        results = search(queryset, term, order=api_settings.ORDERING_PARAM not in request.query_params)
+        if results is None:
+            return super().filter_queryset(request, queryset, view)
+        return results
+
+    async def afilter_queryset(self, request, queryset, view):
+        term = self.search_term(request)
+        if not term:
+            return queryset
+        results = await asearch(queryset, term, order=api_settings.ORDERING_PARAM not in request.query_params)
+        if results is None:
+            # icontains only builds the queryset; nothing runs yet
+            return super().filter_queryset(request, queryset, view)
+        return results
+
+    def construct_search(self, field_name, queryset):
+        # Feed rows fall back to icontains over their item's columns
+        if hasattr(queryset.model, "search_kind"):
+            field_name = f"item__{field_name}"
+        return super().construct_search(field_name, queryset)
+
+    def search_term(self, request):
+        return request.query_params.get(self.search_param, "").replace("\x00", "").strip()
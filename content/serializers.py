@@ -1,26 +1,92 @@
 from rest_framework import serializers
-from .models import Blog, Research, ImageAsset
+from .models import Blog, Research, ImageAsset, Job
 from django.utils import timezone
+from .images import srcsets
+
+
+def requested_fields(request):
+    """Field names from a ``?fields=a,b`` sparse fieldset, or None."""
+    if request is None or request.method != "GET":
+        return None
+    raw = request.query_params.get("fields")
+    if not raw:
+        return None
+    return {name.strip() for name in raw.split(",") if name.strip()}
+
+
+def included_fields(request):
+    """Opt-in field names from ``?include=a,b``."""
+    if request is None or request.method != "GET":
+        return set()
+    raw = request.query_params.get("include", "")
+    return {name.strip() for name in raw.split(",") if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Drop every field not named in the request's ``?fields=`` parameter.
+    ``optional_fields`` are left out unless named in ``?fields=`` or ``?include=``.
+    """
+    optional_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        requested = requested_fields(request)
+        wanted = (requested or set()) | included_fields(request)
+        for name in set(self.optional_fields) - wanted:
+            self.fields.pop(name, None)
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Looks primary keys up in ``context["related_objects"][model]`` when a bulk
+    endpoint has fetched them all at once, instead of one query per item.
+    """
+
+    def to_internal_value(self, data):
+        prefetched = self.context.get("related_objects", {}).get(self.get_queryset().model)
+        if prefetched is None or isinstance(data, bool):
+            return super().to_internal_value(data)
+        try:
+            return prefetched[int(data)]
+        except (KeyError, TypeError, ValueError):
+            # Not prefetched: let the normal lookup produce the right error
+            return super().to_internal_value(data)
+
+
+class CloudinaryFileField(serializers.FileField):
+    """Accepts an uploaded file; renders the stored resource's full URL."""
+
+    def to_representation(self, value):
+        if value:
+            # value is a CloudinaryResource object with url attribute
+            return value.url
+        return None
+
 
 class ImageAssetSerializer(serializers.ModelSerializer):
     # Return the full Cloudinary URL for the file
-    file = serializers.SerializerMethodField()
+    file = CloudinaryFileField(required=False, allow_null=True)
+    srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = ImageAsset
-        fields = ["id", "file", "alt_text"]
+        fields = ["id", "file", "alt_text", "width", "height", "srcset"]
+        read_only_fields = ["width", "height"]
 
-    def get_file(self, obj):
-        if obj.file:
-            # obj.file is a CloudinaryResource object with url attribute
-            return obj.file.url
-        return None
+    def get_srcset(self, obj):
+        return srcsets(obj.derivatives)
 
 
-class BlogSerializer(serializers.ModelSerializer):
+class BlogSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
     author_name = serializers.CharField(source="author.get_full_name", read_only=True)
     featured_image = ImageAssetSerializer(read_only=True)
-    featured_image_id = serializers.PrimaryKeyRelatedField(
+    featured_image_id = PrefetchedPrimaryKeyRelatedField(
         queryset=ImageAsset.objects.all(), source="featured_image", write_only=True, required=False, allow_null=True
     )
 
@@ -29,18 +95,22 @@ class BlogSerializer(serializers.ModelSerializer):
         fields = [
             "id", "title", "slug", "author", "author_name",
             "featured_image", "featured_image_id",
-            "summary", "body",
+            "summary", "body", "body_html", "body_text", "word_count", "reading_time",
             "status", "published_at",
             "created_at", "updated_at",
         ]
         read_only_fields = ["slug", "created_at", "updated_at"]
 
+    # Compiled copies of ``body``; sent only with ?include=body_html,body_text
+    optional_fields = ("body_html", "body_text")
+
     def validate_body(self, value):
         if not isinstance(value, list):
             raise serializers.ValidationError("Body must be a list of blocks.")
         return value
 
     def validate(self, attrs):
+        # A future published_at schedules the post: it goes public then (content.published)
         status = attrs.get("status", getattr(self.instance, "status", Blog.DRAFT))
         published_at = attrs.get("published_at", getattr(self.instance, "published_at", None))
         if status == Blog.PUBLISHED and not published_at:
@@ -48,9 +118,10 @@ class BlogSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class ResearchSerializer(serializers.ModelSerializer):
+class ResearchSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
     featured_image = ImageAssetSerializer(read_only=True)
-    featured_image_id = serializers.PrimaryKeyRelatedField(
+    featured_image_id = PrefetchedPrimaryKeyRelatedField(
         queryset=ImageAsset.objects.all(), source="featured_image", write_only=True, required=False, allow_null=True
     )
     # Serialize file field URLs properly if this is a CloudinaryField
@@ -61,10 +132,10 @@ class ResearchSerializer(serializers.ModelSerializer):
         fields = [
             "id", "title", "slug",
             "featured_image", "featured_image_id",
-            "description", "status", "file",
+            "description", "status", "file", "page_count", "file_size",
             "created_at", "updated_at",
         ]
-        read_only_fields = ["slug", "created_at", "updated_at"]
+        read_only_fields = ["slug", "page_count", "file_size", "created_at", "updated_at"]
 
     def get_file(self, obj):
         if obj.file:
@@ -74,3 +145,27 @@ class ResearchSerializer(serializers.ModelSerializer):
             except Exception:
                 return obj.file.name  # fallback to file name/path
         return None
+
+
+class BlogListSerializer(BlogSerializer):
+    """Listing representation: everything but the ``body`` blocks."""
+
+    class Meta(BlogSerializer.Meta):
+        fields = [f for f in BlogSerializer.Meta.fields if f != "body"]
+
+
+class ResearchListSerializer(ResearchSerializer):
+    """Listing representation without the long ``description``."""
+
+    class Meta(ResearchSerializer.Meta):
+        fields = [f for f in ResearchSerializer.Meta.fields if f != "description"]
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id", "kind", "status", "attempts", "max_attempts",
+            "run_after", "last_error", "result", "created_at", "updated_at",
+        ]
+        read_only_fields = fields
@@ -0,0 +1,135 @@
+import logging
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .authentication import bump_user_generation
+from .cache import bump_version
+from .documents import extract, needs_extraction
+from .jobs import enqueue
+from .published import sync_feed
+from .search import index_instance, index_instances, unindex_instance
+from .models import Blog, ImageAsset, Job, Research
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+@receiver(post_save, sender=Research)
+@receiver(post_delete, sender=Research)
+@receiver(post_save, sender=ImageAsset)
+@receiver(post_delete, sender=ImageAsset)
+def bump_content_version(sender, **kwargs):
+    bump_version(sender)
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_save, sender=Research)
+def update_search_entry(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_instance(instance)
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_save, sender=Research)
+def update_published_feed(sender, instance, raw=False, **kwargs):
+    # Deleted items leave the feed by cascade
+    if not raw:
+        sync_feed(sender, [instance])
+
+
+@receiver(post_delete, sender=Blog)
+@receiver(post_delete, sender=Research)
+def delete_search_entry(sender, instance, **kwargs):
+    unindex_instance(instance)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_auth(sender, instance, **kwargs):
+    # Drops every cached token of this user (content.authentication)
+    bump_user_generation(getattr(instance, jwt_settings.USER_ID_FIELD))
+
+
+@receiver(post_save, sender=get_user_model())
+def touch_authored_blogs(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    # Blogs render their author's name, so a possible rename changes them too
+    if created or raw or (update_fields is not None and not {"first_name", "last_name"} & set(update_fields)):
+        return
+    touch(Blog, list(Blog.objects.filter(author=instance)))
+
+
+def queue_static_export():
+    # One pending export covers any number of saves
+    if not Job.objects.filter(kind="export_static", status=Job.QUEUED).exists():
+        enqueue("export_static")
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+@receiver(post_save, sender=Research)
+@receiver(post_delete, sender=Research)
+@receiver(post_save, sender=ImageAsset)
+@receiver(post_delete, sender=ImageAsset)
+def schedule_static_export(sender, raw=False, **kwargs):
+    if settings.STATIC_EXPORT_ON_SAVE and not raw:
+        transaction.on_commit(queue_static_export)
+
+
+def queue_text_extraction(research_id):
+    queued = Job.objects.filter(kind="extract_research_text", status=Job.QUEUED, payload__research_id=research_id)
+    if not queued.exists():
+        enqueue("extract_research_text", research_id=research_id)
+
+
+def extract_text_now(research_id):
+    research = Research.objects.filter(pk=research_id).first()
+    if research is None:
+        return
+    try:
+        extract(research)
+    except Exception:
+        # Leave it to the job's retries rather than failing the request that saved the file
+        logger.warning("Extracting research %s failed; queued a job", research_id, exc_info=True)
+        queue_text_extraction(research_id)
+
+
+@receiver(post_save, sender=Research)
+def schedule_text_extraction(sender, instance, raw=False, **kwargs):
+    # New or removed file; re-saving the same upload keeps its pages
+    if not raw and needs_extraction(instance):
+        run = queue_text_extraction if settings.RESEARCH_EXTRACT_ASYNC else extract_text_now
+        transaction.on_commit(partial(run, instance.pk))
+
+
+def bulk_saved(model, instances):
+    """What the post_save receivers above do, for rows written by bulk_create/bulk_update."""
+    bump_version(model)
+    if model in (Blog, Research):
+        index_instances(instances)
+        sync_feed(model, instances)
+    if settings.STATIC_EXPORT_ON_SAVE:
+        transaction.on_commit(queue_static_export)
+
+
+def touch(model, instances, fields=()):
+    """
+    Save ``fields`` of ``instances`` with a fresh ``updated_at`` in one
+    bulk_update, then ``bulk_saved``: for rows whose representation changed
+    without a save(), so validators, caches, the feed and the export follow.
+    """
+    if not instances:
+        return
+    now = timezone.now()
+    for instance in instances:
+        instance.updated_at = now
+    model.objects.bulk_update(instances, [*fields, "updated_at"], batch_size=500)
+    bulk_saved(model, instances)
@@ -0,0 +1,249 @@
+"""
+RSS/Atom feeds and sitemaps of published blogs and research, written with
+the static API export (content.export) under ``STATIC_EXPORT_ROOT``::
+
+    feeds/blogs.rss, feeds/blogs.atom, feeds/research.rss, feeds/research.atom
+    sitemap.xml                   (sitemap index)
+    sitemaps/blogs-1.xml, ...     (entries by primary key, SITEMAP_CHUNK per file)
+
+StaticExportMiddleware serves them pre-compressed, with ETag/Last-Modified,
+under ``STATIC_EXPORT_URL`` and at ``/feeds/``, ``/sitemaps/`` and
+``/sitemap.xml``. Everything is read from the published feed tables
+(content.published), never from the items. ``syndication.json`` keeps each
+entry's ``updated_at`` with its rendered ``<url>``, ``<item>`` and
+``<entry>``: a build renders only entries that changed and rewrites only the
+documents and sitemap chunks they appear in, so untouched files keep their
+validators and crawlers get 304s.
+"""
+import json
+from datetime import datetime
+from io import StringIO
+
+from django.conf import settings
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+from xml.sax.saxutils import escape
+
+from .models import PublishedBlog, PublishedResearch
+
+STATE = "syndication.json"
+SITEMAP_CHUNK = 50000  # URLs per sitemap file, the protocol's limit
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+class FragmentFeedMixin:
+    """Writes items rendered earlier verbatim, dated by the newest of them."""
+
+    def __init__(self, *args, fragments=(), latest=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fragments = fragments
+        self.latest = latest
+
+    def write_items(self, handler):
+        for fragment in self.fragments:
+            # Already-escaped XML; ignorableWhitespace writes it as is
+            handler.ignorableWhitespace(fragment)
+
+    def latest_post_date(self):
+        return self.latest or super().latest_post_date()
+
+
+class RssFeed(FragmentFeedMixin, Rss201rev2Feed):
+    item_element = "item"
+
+
+class AtomFeed(FragmentFeedMixin, Atom1Feed):
+    item_element = "entry"
+
+
+GENERATORS = {"rss": RssFeed, "atom": AtomFeed}
+
+
+class Channel:
+    def __init__(self, name, feed, title, description, ordering, date_field):
+        self.name = name
+        self.feed = feed
+        self.title = title
+        self.description = description
+        self.ordering = ordering
+        self.date_field = date_field
+
+    def item_url(self, slug):
+        return settings.SITE_URL.rstrip("/") + settings.SITE_ITEM_PATHS[self.name].format(slug=slug)
+
+    def feed_url(self, extension):
+        return f"{settings.SYNDICATION_URL.rstrip('/')}/feeds/{self.name}.{extension}"
+
+    def item(self, row):
+        """feedgenerator ``add_item`` arguments for a feed row."""
+        link = self.item_url(row.slug)
+        return {
+            "title": row.title, "link": link, "description": row.summary,
+            "unique_id": link, "unique_id_is_permalink": True,
+            "pubdate": getattr(row, self.date_field) or row.created_at, "updateddate": row.updated_at,
+        }
+
+
+CHANNELS = [
+    Channel("blogs", PublishedBlog, "Blog", "Latest blog posts",
+            ("-published_at", "-created_at", "-pk"), "published_at"),
+    Channel("research", PublishedResearch, "Research", "Latest research publications",
+            ("-created_at", "-pk"), "created_at"),
+]
+
+
+def render_item(generator, item):
+    """One ``<item>``/``<entry>`` as an XML string."""
+    feed = generator(title="", link="", description="")
+    feed.add_item(**item)
+    out = StringIO()
+    handler = SimplerXMLGenerator(out, "utf-8", short_empty_elements=True)
+    handler.startElement(generator.item_element, feed.item_attributes(feed.items[0]))
+    feed.add_item_elements(handler, feed.items[0])
+    handler.endElement(generator.item_element)
+    return out.getvalue()
+
+
+def render_url(loc, lastmod):
+    return f"<url><loc>{escape(loc)}</loc><lastmod>{lastmod}</lastmod></url>"
+
+
+def chunk_of(pk):
+    return (int(pk) - 1) // SITEMAP_CHUNK + 1
+
+
+class SyndicationBuilder:
+    """Brings the feeds and sitemaps up to date; writes through a StaticExporter."""
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+        self.root = exporter.root
+
+    def load_state(self):
+        try:
+            return json.loads((self.root / STATE).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def settings_key():
+        # Entries embed these, so changing any re-renders everything
+        return [settings.SITE_NAME, settings.SITE_URL, settings.SITE_ITEM_PATHS,
+                settings.SYNDICATION_URL, settings.SYNDICATION_FEED_SIZE]
+
+    def exists(self, relative):
+        return (self.root / relative).exists()
+
+    def build(self, full=False):
+        """Update what changed (everything with ``full``); returns the state to keep for the next build."""
+        state = self.load_state()
+        if state.get("settings") != self.settings_key():
+            full = True
+        index_stale = full or not self.exists("sitemap.xml")
+        for channel in CHANNELS:
+            previous = state.get(channel.name, {})
+            state[channel.name] = self.build_channel(channel, previous, full)
+            index_stale = index_stale or state[channel.name]["chunks"] != previous.get("chunks")
+        if index_stale:
+            self.write_index(state)
+        state["settings"] = self.settings_key()
+        return state
+
+    def build_channel(self, channel, previous, full):
+        current = {
+            str(pk): stamp.isoformat()
+            for pk, stamp in channel.feed.objects.values_list("pk", "updated_at").iterator(chunk_size=2000)
+        }
+        previous_urls = previous.get("urls", {})
+        changed = [pk for pk, stamp in current.items() if full or previous_urls.get(pk, [None])[0] != stamp]
+        gone = [pk for pk in previous_urls if pk not in current]
+
+        rows = self.fetch(channel, changed)
+        unchanged = current.keys() - set(changed)
+        urls = {pk: previous_urls[pk] for pk in unchanged}
+        urls.update(
+            (pk, [current[pk], render_url(channel.item_url(row.slug), current[pk])]) for pk, row in rows.items()
+        )
+        chunks = {str(chunk_of(pk)) for pk in changed + gone}
+        previous_chunks = previous.get("chunks", {})
+        chunks.update(n for n in previous_chunks if not self.exists(f"sitemaps/{channel.name}-{n}.xml"))
+        if full:
+            chunks.update(previous_chunks)
+        return {
+            "urls": urls,
+            "chunks": self.write_chunks(channel, urls, chunks, previous_chunks),
+            **self.write_feeds(channel, previous, rows, current),
+        }
+
+    def fetch(self, channel, pks, batch_size=500):
+        rows = {}
+        for start in range(0, len(pks), batch_size):
+            rows.update((str(row.pk), row) for row in channel.feed.objects.filter(pk__in=pks[start:start + batch_size]))
+        return rows
+
+    def write_chunks(self, channel, urls, touched, previous_chunks):
+        """Rewrite the touched sitemap chunks; returns {chunk: lastmod} of all non-empty ones."""
+        chunks = dict(previous_chunks)
+        members = {}
+        if touched:
+            for pk in urls:
+                if str(chunk_of(pk)) in touched:
+                    members.setdefault(str(chunk_of(pk)), []).append(pk)
+        for number in sorted(touched, key=int):
+            relative = f"sitemaps/{channel.name}-{number}.xml"
+            pks = sorted(members.get(number, ()), key=int)
+            if not pks:
+                if self.exists(relative):
+                    self.exporter.discard(relative)
+                chunks.pop(number, None)
+                continue
+            body = "".join(urls[pk][1] for pk in pks)
+            self.exporter.write_bytes(relative, (
+                f'<?xml version="1.0" encoding="utf-8"?>\n<urlset xmlns="{SITEMAP_NS}">{body}</urlset>\n'
+            ).encode())
+            chunks[number] = max(urls[pk][0] for pk in pks)
+        return chunks
+
+    def write_feeds(self, channel, previous, rows, current):
+        """Rewrite the RSS and Atom documents if their newest entries changed."""
+        window = [
+            str(pk) for pk in
+            channel.feed.objects.order_by(*channel.ordering).values_list("pk", flat=True)[:settings.SYNDICATION_FEED_SIZE]
+        ]
+        previous_items = previous.get("items", {})
+        stale = [pk for pk in window if pk in rows or previous_items.get(pk, [None])[0] != current.get(pk)]
+        # Entries that moved into the window without changing were not fetched
+        rows = {**rows, **self.fetch(channel, [pk for pk in stale if pk not in rows])}
+        items = {pk: previous_items[pk] for pk in window if pk not in stale}
+        for pk in stale:
+            if pk in rows:
+                item = channel.item(rows[pk])
+                items[pk] = [current[pk]] + [render_item(GENERATORS[kind], item) for kind in GENERATORS]
+        window = [pk for pk in window if pk in items]
+
+        missing = any(not self.exists(f"feeds/{channel.name}.{kind}") for kind in GENERATORS)
+        if stale or missing or window != previous.get("window"):
+            latest = max((datetime.fromisoformat(items[pk][0]) for pk in window), default=None)
+            for position, (kind, generator) in enumerate(GENERATORS.items(), start=1):
+                feed = generator(
+                    title=f"{settings.SITE_NAME} {channel.title}", link=settings.SITE_URL,
+                    description=channel.description, language=settings.LANGUAGE_CODE,
+                    author_name=settings.SITE_NAME, feed_url=channel.feed_url(kind),
+                    fragments=[items[pk][position] for pk in window], latest=latest,
+                )
+                out = StringIO()
+                feed.write(out, "utf-8")
+                self.exporter.write_bytes(f"feeds/{channel.name}.{kind}", out.getvalue().encode())
+        return {"window": window, "items": items}
+
+    def write_index(self, state):
+        base = settings.SYNDICATION_URL.rstrip("/")
+        entries = "".join(
+            f"<sitemap><loc>{escape(f'{base}/sitemaps/{channel.name}-{number}.xml')}</loc>"
+            f"<lastmod>{lastmod}</lastmod></sitemap>"
+            for channel in CHANNELS
+            for number, lastmod in sorted(state[channel.name]["chunks"].items(), key=lambda chunk: int(chunk[0]))
+        )
+        self.exporter.write_bytes("sitemap.xml", (
+            f'<?xml version="1.0" encoding="utf-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">{entries}</sitemapindex>\n'
+        ).encode())
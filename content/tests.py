@@ -1,3 +1,1329 @@
-from django.test import TestCase
+import gzip
+import json
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections, router as db_router
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, resolve
+from django.utils import timezone
+from PIL import Image as PILImage
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import BaseSerializer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .api_urls import router
+from .async_reads import async_read_urls
+from .authentication import CachedJWTAuthentication
+from .blocks import render as render_blocks
+from .cache import get_cache
+from .checks import check_jwt_auth_cache, check_replica_pin_cache
+from .export import build as build_static_export
+from .images import available_formats
+from .jobs import enqueue, run_pending
+from .management.benchmarking import seed_content
+from .media import hash_file
+from .middleware import ReplicaReadMiddleware
+from .published import publish_due
+from .renderers import FastJSONRenderer
+from .models import Blog, ImageAsset, Job, PublishedBlog, PublishedResearch, Research
+from .routers import replica_reads
+from .serializers import BlogSerializer
+from .views import BlogViewSet
+from zrcp_backend.instrumentation import TimedDataMixin, registry
+
+User = get_user_model()
+
+
+def jpeg_bytes(width=1200, height=800, color=(200, 10, 10)):
+    out = BytesIO()
+    PILImage.new("RGB", (width, height), color).save(out, "JPEG")
+    return out.getvalue()
+
+
+# The API with ASYNC_READS on, for AsyncReadTests
+urlpatterns = [path("api/", include(async_read_urls(router.urls)))]
+
+
+class CachedResponseTests(TestCase):
+    """Rendered responses come from the cache until a save bumps the model's version."""
+
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.posts = [Blog.objects.create(title=f"Post {i}", status=Blog.PUBLISHED) for i in range(3)]
+
+    def test_hits_skip_the_database_until_a_save(self):
+        first = self.client.get("/api/blogs/")
+        self.assertEqual(first["X-Cache"], "MISS")
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get("/api/blogs/")
+        self.assertEqual((second["X-Cache"], len(ctx)), ("HIT", 0))
+        self.assertEqual(second.content, first.content)
+
+        Blog.objects.create(title="New", status=Blog.PUBLISHED)
+        third = self.client.get("/api/blogs/")
+        self.assertEqual((third["X-Cache"], third.json()["count"]), ("MISS", 4))
+
+    def test_detail_is_cached(self):
+        url = f"/api/blogs/{self.posts[0].pk}/"
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class ConditionalGetTests(TestCase):
+    """Lists and details answer a matching If-None-Match/If-Modified-Since with 304, until they change."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create(username="author", first_name="Asha")
+        self.image = ImageAsset.objects.create(file="zrcp/sample", alt_text="image")
+        self.post = Blog.objects.create(title="Post", status=Blog.PUBLISHED, author=self.author,
+                                        featured_image=self.image)
+        self.urls = ["/api/blogs/", f"/api/blogs/{self.post.pk}/", "/api/research/"]
+
+    def assertNotModified(self, url, response, expected=304):
+        etag = self.client.get(url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(etag.status_code, expected, url)
+        if "Last-Modified" in response:
+            since = self.client.get(url, headers={"If-Modified-Since": response["Last-Modified"]})
+            self.assertEqual(since.status_code, expected, url)
+
+    def test_unchanged_resources_are_not_modified(self):
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertTrue(response["ETag"].startswith('"'), url)
+            self.assertNotModified(url, response)
+
+    @override_settings(API_CACHE_TIMEOUT=300)
+    def test_cached_responses_keep_validators(self):
+        get_cache().clear()
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+            self.assertNotModified(url, response)
+
+    def test_featured_image_changes_the_validators(self):
+        responses = {url: self.client.get(url) for url in self.urls[:2]}
+        # A second later, so Last-Modified moves too
+        ImageAsset.objects.filter(pk=self.image.pk).update(updated_at=timezone.now() + timezone.timedelta(seconds=1))
+        for url, response in responses.items():
+            self.assertNotModified(url, response, expected=200)
+
+    def test_author_rename_changes_the_validators(self):
+        responses = {url: self.client.get(url) for url in self.urls[:2]}
+        self.author.first_name = "Amina"
+        self.author.save()
+        for url, response in responses.items():
+            self.assertNotEqual(self.client.get(url)["ETag"], response["ETag"], url)
+        self.assertEqual(self.client.get(self.urls[1]).json()["author_name"], "Amina")
+
+    def test_search_is_ranked_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get("/api/blogs/?search=post").json()["count"], 1)
+        self.assertEqual(sum("content_searchentry" in q["sql"] for q in ctx.captured_queries), 1)
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class KeysetPaginationTests(TestCase):
+    """?cursor= walks every row once in keyset order, forwards and back, NULL keys included."""
+
+    def setUp(self):
+        self.client = APIClient()
+        now = timezone.now()
+        for i in range(23):
+            # Drafts without published_at give the staff list NULL keys; ties on the rest
+            published_at = None if i % 5 == 0 else now - timezone.timedelta(days=i % 3)
+            Blog.objects.create(title=f"Post {i}", status=Blog.PUBLISHED if published_at else Blog.DRAFT,
+                                published_at=published_at)
+        for i in range(7):
+            Research.objects.create(title=f"Report {i}", status=Research.PUBLISHED)
+
+    def assertWalks(self, url, expected):
+        page = self.client.get(url).json()
+        pages = [page]
+        while page["next"]:
+            page = self.client.get(page["next"]).json()
+            pages.append(page)
+        self.assertEqual([row["id"] for page in pages for row in page["results"]], expected)
+        self.assertNotIn("count", pages[0])
+
+        backwards = []
+        while page["previous"]:
+            page = self.client.get(page["previous"]).json()
+            backwards = [row["id"] for row in page["results"]] + backwards
+        self.assertEqual(backwards, expected[:len(expected) - len(pages[-1]["results"])])
+
+    def test_walks_public_and_staff_lists(self):
+        ordering = ("-published_at", "-created_at", "-id")
+        self.assertWalks("/api/blogs/?cursor=", list(
+            Blog.objects.filter(status=Blog.PUBLISHED).order_by(*ordering).values_list("id", flat=True)
+        ))
+        self.assertWalks("/api/research/?cursor=", list(
+            Research.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        ))
+        self.client.force_authenticate(User.objects.create(username="staff", is_staff=True))
+        self.assertWalks("/api/blogs/?cursor=", list(Blog.objects.order_by(*ordering).values_list("id", flat=True)))
+
+    def test_bad_cursor_and_conflicting_parameters(self):
+        self.assertEqual(self.client.get("/api/blogs/?cursor=garbage").status_code, 404)
+        for query in ("ordering=created_at", "search=post"):
+            response = self.client.get(f"/api/blogs/?cursor=&{query}")
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn("cursor", response.json())
+        self.assertIn("count", self.client.get("/api/blogs/?ordering=created_at").json())
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class SlimReadTests(TestCase):
+    """Lists leave heavy fields out; ?fields= narrows both the payload and the columns read."""
+
+    def setUp(self):
+        self.client = APIClient()
+        author = User.objects.create(username="author", first_name="Asha", last_name="Ali")
+        self.post = Blog.objects.create(title="Post", status=Blog.PUBLISHED, author=author,
+                                        body=[{"type": "paragraph", "text": "x" * 50}])
+        Research.objects.create(title="Report", status=Research.PUBLISHED, description="long")
+
+    def page_query(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get(url).json()
+        return data, next(q["sql"] for q in ctx.captured_queries if "LIMIT" in q["sql"])
+
+    def test_lists_skip_heavy_columns(self):
+        data, sql = self.page_query("/api/blogs/")
+        self.assertNotIn("body", data["results"][0])
+        self.assertEqual(data["results"][0]["author_name"], "Asha Ali")
+        self.assertNotIn('"body"', sql)
+        self.assertNotIn("description", self.client.get("/api/research/").json()["results"][0])
+        self.assertIn("body", self.client.get(f"/api/blogs/{self.post.pk}/").json())
+
+    def test_sparse_fieldsets(self):
+        data, sql = self.page_query("/api/blogs/?fields=title,slug")
+        self.assertEqual(set(data["results"][0]), {"title", "slug"})
+        for column in ('"body"', '"summary"', "auth_user"):
+            self.assertNotIn(column, sql)
+        data = self.client.get("/api/blogs/?fields=title,body,author_name&cursor=").json()
+        self.assertEqual(set(data["results"][0]), {"title", "body", "author_name"})
+        self.assertEqual(self.client.get(f"/api/blogs/{self.post.pk}/?fields=id").json(), {"id": self.post.pk})
+        data = self.client.get("/api/research/?fields=file,description").json()
+        self.assertEqual(set(data["results"][0]), {"file", "description"})
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class SearchTests(TestCase):
+    """?search= uses the full-text index and only ranks rows the caller can see."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.zanzibar = Blog.objects.create(title="Malaria elimination in Zanzibar", status=Blog.PUBLISHED,
+                                            summary="health")
+        self.nets = Blog.objects.create(title="Social protection", status=Blog.PUBLISHED, body=[
+            {"type": "paragraph", "text": "<p>Malaria bed nets</p>"},
+            {"type": "image", "url": "http://example.com/malaria.jpg"},
+        ])
+        Blog.objects.create(title="Malaria malaria", status=Blog.DRAFT, summary="malaria")
+        Research.objects.create(title="Financing", description="malaria costs", status=Research.PUBLISHED)
+
+    def ids(self, url):
+        return [item["id"] for item in self.client.get(url).json()["results"]]
+
+    def test_ranked_matches(self):
+        self.assertEqual(self.ids("/api/blogs/?search=malaria"), [self.zanzibar.pk, self.nets.pk])
+        self.assertEqual(self.ids("/api/blogs/?search=nets"), [self.nets.pk])
+        self.assertEqual(len(self.ids("/api/blogs/?search=mal")), 2)
+        self.assertEqual(self.client.get('/api/blogs/?search="AND OR(*').json()["count"], 0)
+        self.assertEqual(len(self.ids("/api/research/?search=costs")), 1)
+
+    def test_slug_is_indexed(self):
+        self.nets.slug = "bed-nets-kenya"
+        self.nets.save()
+        self.assertEqual(self.ids("/api/blogs/?search=kenya"), [self.nets.pk])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.nets.body = []
+        self.nets.save()
+        self.assertEqual(self.ids("/api/blogs/?search=nets"), [])
+        self.zanzibar.delete()
+        self.assertEqual(self.ids("/api/blogs/?search=malaria&ordering=created_at"), [])
+
+    def test_cap_applies_to_visible_rows(self):
+        # The draft ranks first but must not take the only slot
+        with mock.patch("content.search.MAX_RESULTS", 1):
+            self.assertEqual(self.ids("/api/blogs/?search=malaria"), [self.zanzibar.pk])
+
+
+class SlugTests(TestCase):
+    """Slugs are allocated in one query per batch and retried on collisions."""
+
+    def test_suffixes(self):
+        first = Blog.objects.create(title="Hello World")
+        second = Blog.objects.create(title="Hello World")
+        Blog.objects.create(title="Hello World Again")
+        self.assertEqual([first.slug, second.slug], ["hello-world", "hello-world-2"])
+        with CaptureQueriesContext(connection) as ctx:
+            third = Blog.objects.create(title="Hello World")
+        self.assertEqual(third.slug, "hello-world-3")
+        lookups = [q for q in ctx.captured_queries if q["sql"].startswith('SELECT "content_blog"."slug"')]
+        self.assertEqual(len(lookups), 1)
+        first.title = "Renamed"
+        first.save()
+        self.assertEqual(first.slug, "hello-world")
+
+    def test_bulk_create(self):
+        Blog.objects.create(title="Hello World")
+        objs = Blog.objects.bulk_create(
+            [Blog(title="Hello World") for _ in range(2)] + [Blog(title="New one"), Blog(title="New one")]
+        )
+        self.assertEqual([obj.slug for obj in objs], ["hello-world-2", "hello-world-3", "new-one", "new-one-2"])
+
+    def test_year_in_title_is_not_a_counter(self):
+        Research.objects.create(title="Budget")
+        Research.objects.create(title="Budget 2025")
+        with CaptureQueriesContext(connection) as ctx:
+            report = Research.objects.create(title="Budget")
+        self.assertEqual(report.slug, "budget-2")
+        lookups = [q for q in ctx.captured_queries if q["sql"].startswith('SELECT "content_research"."slug"')]
+        self.assertEqual(len(lookups), 1)
+        self.assertEqual(Research.objects.create(title="Budget").slug, "budget-3")
+
+    def test_collision_retries(self):
+        Blog.objects.create(title="Hello World")
+        allocate = Blog.allocate_slugs.__func__
+        calls = []
+
+        def stale(cls, instances):
+            # The first allocation loses a race to another writer
+            allocate(cls, instances)
+            calls.append(instances[0].slug)
+            if len(calls) == 1:
+                instances[0].slug = "hello-world"
+
+        post = Blog(title="Hello World")
+        with mock.patch.object(Blog, "allocate_slugs", classmethod(stale)):
+            post.save()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(post.slug, "hello-world-2")
+
+
+class CloudinaryMigrationTests(TestCase):
+    """migrate_to_cloudinary rewrites rows in place and runs the save bookkeeping for them."""
+
+    def test_migrates_and_touches_rows(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        root = Path(media.name)
+        (root / "docs").mkdir()
+        (root / "docs" / "report.pdf").write_bytes(b"%PDF-1.4")
+        report = Research.objects.create(title="Report", status=Research.PUBLISHED)
+        Research.objects.filter(pk=report.pk).update(file="docs/report.pdf")
+        stamp = PublishedResearch.objects.get(pk=report.pk).updated_at
+
+        out = StringIO()
+        call_command("migrate_to_cloudinary", uploader="local", local_dir=str(root / "cloud"),
+                     media_root=str(root), journal=str(root / "journal.jsonl"), stdout=out)
+        report.refresh_from_db()
+        self.assertTrue(report.file.name.startswith("file:"))
+        self.assertGreater(report.updated_at, stamp)
+        self.assertEqual(PublishedResearch.objects.get(pk=report.pk).updated_at, report.updated_at)
+        self.assertIn("1 local files", out.getvalue())
+
+        # A rerun finds nothing left on local disk
+        out = StringIO()
+        call_command("migrate_to_cloudinary", uploader="local", local_dir=str(root / "cloud"),
+                     media_root=str(root), journal=str(root / "journal.jsonl"), stdout=out)
+        self.assertIn("0 local files", out.getvalue())
+
+
+@override_settings(IMAGE_UPLOAD_ASYNC=False)
+class ImageDedupTests(TestCase):
+    """Identical uploads share one ImageAsset; dedupe_images merges existing duplicates."""
+
+    def test_upload_reuses_identical_asset(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="editor", is_staff=True))
+
+        def upload(value, **options):
+            import cloudinary
+            return cloudinary.CloudinaryResource("images/abc", format="jpg", version=1, type="upload",
+                                                 resource_type="image")
+
+        with mock.patch("cloudinary.uploader.upload_resource", side_effect=upload) as uploaded:
+            first = client.post("/api/images/", {"file": SimpleUploadedFile("a.jpg", jpeg_bytes(40, 30)),
+                                                 "alt_text": "a"}, format="multipart")
+            same = client.post("/api/images/", {"file": SimpleUploadedFile("b.jpg", jpeg_bytes(40, 30))},
+                               format="multipart")
+            other = client.post("/api/images/", {"file": SimpleUploadedFile("c.jpg", jpeg_bytes(30, 40))},
+                                format="multipart")
+        self.assertEqual((first.status_code, same.status_code, other.status_code), (201, 200, 201))
+        self.assertEqual(first.json()["id"], same.json()["id"])
+        self.assertEqual(uploaded.call_count, 2)
+
+    def test_command_merges_duplicates(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        for name, content in (("a.jpg", b"same"), ("b.jpg", b"same"), ("c.jpg", b"different")):
+            (Path(media.name) / name).write_bytes(content)
+        keep = ImageAsset.objects.create(file="a.jpg")
+        duplicate = ImageAsset.objects.create(file="b.jpg", alt_text="alt b")
+        ImageAsset.objects.create(file="c.jpg")
+        post = Blog.objects.create(title="Post", status=Blog.PUBLISHED, featured_image=duplicate)
+
+        out = StringIO()
+        call_command("dedupe_images", media_root=media.name, dry_run=True, stdout=out)
+        self.assertIn("Would merge 1", out.getvalue())
+        self.assertTrue(ImageAsset.objects.filter(pk=duplicate.pk).exists())
+
+        stamp = post.updated_at
+        call_command("dedupe_images", media_root=media.name, stdout=out)
+        post.refresh_from_db()
+        keep.refresh_from_db()
+        self.assertEqual(post.featured_image_id, keep.pk)
+        self.assertGreater(post.updated_at, stamp)
+        self.assertEqual(PublishedBlog.objects.get(pk=post.pk).updated_at, post.updated_at)
+        self.assertEqual(keep.alt_text, "alt b")
+        self.assertFalse(ImageAsset.objects.filter(pk=duplicate.pk).exists())
+
+
+@override_settings(IMAGE_UPLOAD_ASYNC=False, STORAGES={
+    **settings.STORAGES, "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+})
+class ImageDerivativeTests(TestCase):
+    """Uploads get their size and resized variants; the command backfills older assets."""
+
+    @staticmethod
+    def upload(value, **options):
+        import cloudinary
+        return cloudinary.CloudinaryResource("images/abc", format="jpg", version=1, type="upload",
+                                             resource_type="image", metadata={"width": 1200, "height": 800})
+
+    def create_asset(self):
+        with mock.patch("cloudinary.uploader.upload_resource", side_effect=self.upload):
+            asset = ImageAsset.objects.create(file=SimpleUploadedFile("a.jpg", jpeg_bytes()))
+        asset.refresh_from_db()
+        return asset
+
+    def test_cloudinary_urls(self):
+        asset = self.create_asset()
+        self.assertEqual((asset.width, asset.height), (1200, 800))
+        self.assertEqual(len(asset.derivatives), 4 * 3)
+        srcset = self.client.get(f"/api/images/{asset.pk}/").json()["srcset"]
+        self.assertIn("320w", srcset["webp"])
+
+    @override_settings(IMAGE_DERIVATIVE_BACKEND="content.images.PillowDerivativeBackend")
+    def test_pillow_variants(self):
+        asset = self.create_asset()
+        self.assertEqual({variant["format"] for variant in asset.derivatives}, set(available_formats()))
+        self.assertEqual(sorted({variant["width"] for variant in asset.derivatives}), [320, 640, 1024, 1200])
+
+    @override_settings(IMAGE_DERIVATIVE_BACKEND="content.images.PillowDerivativeBackend")
+    def test_backfill_touches_assets(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        (Path(media.name) / "photo.jpg").write_bytes(jpeg_bytes(500, 300))
+        asset = ImageAsset.objects.create(file="photo.jpg")
+        post = Blog.objects.create(title="Post", status=Blog.PUBLISHED, featured_image=asset)
+        etag = self.client.get(f"/api/blogs/{post.pk}/")["ETag"]
+
+        call_command("generate_image_derivatives", media_root=media.name, stdout=StringIO())
+        stamp = asset.updated_at
+        asset.refresh_from_db()
+        self.assertEqual((asset.width, asset.height), (500, 300))
+        self.assertGreater(asset.updated_at, stamp)
+        self.assertNotEqual(self.client.get(f"/api/blogs/{post.pk}/")["ETag"], etag)
+
+
+@override_settings(IMAGE_UPLOAD_ASYNC=True, STORAGES={
+    **settings.STORAGES,
+    "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+    "staging": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+})
+class JobQueueTests(TestCase):
+    """Uploads are staged and pushed by the run_jobs worker, with retries and backoff."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username="editor", is_staff=True))
+
+    def test_upload_job_retries_then_succeeds(self):
+        response = self.client.post("/api/images/", {"file": SimpleUploadedFile("a.jpg", jpeg_bytes()),
+                                                     "alt_text": "a"}, format="multipart")
+        self.assertEqual(response.status_code, 202, response.content)
+        body = response.json()
+        job_id = body["job"]["id"]
+        self.assertIsNone(body["file"])
+        self.assertTrue(response["Location"].endswith(f"/api/jobs/{job_id}/"))
+
+        attempts = []
+
+        def upload(value, **options):
+            attempts.append(value.name)
+            if len(attempts) == 1:
+                raise OSError("network down")
+            import cloudinary
+            return cloudinary.CloudinaryResource("images/abc", format="jpg", version=1, type="upload",
+                                                 resource_type="image", metadata={"width": 1200, "height": 800})
+
+        with mock.patch("cloudinary.uploader.upload_resource", side_effect=upload):
+            with self.assertLogs("content.jobs", "WARNING"):
+                self.assertEqual(run_pending("worker"), 1)
+            job = Job.objects.get(pk=job_id)
+            self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+            self.assertIn("network down", job.last_error)
+            self.assertEqual(run_pending("worker"), 0)  # backing off
+            Job.objects.filter(pk=job_id).update(run_after=timezone.now())
+            call_command("run_jobs", once=True, stdout=StringIO())
+
+        self.assertEqual(Job.objects.get(pk=job_id).status, Job.SUCCEEDED)
+        asset = ImageAsset.objects.get(pk=body["id"])
+        self.assertEqual(asset.width, 1200)
+        self.assertTrue(asset.derivatives)
+        self.assertEqual(self.client.get(f"/api/jobs/{job_id}/").json()["status"], Job.SUCCEEDED)
+        self.assertEqual(APIClient().get(f"/api/jobs/{job_id}/").status_code, 401)
+
+    def test_deleted_asset_finishes_job(self):
+        body = self.client.post("/api/images/", {"file": SimpleUploadedFile("a.jpg", jpeg_bytes())},
+                                format="multipart").json()
+        ImageAsset.objects.filter(pk=body["id"]).delete()
+        with mock.patch("cloudinary.uploader.upload_resource") as uploaded:
+            run_pending("worker")
+        job = Job.objects.get(pk=body["job"]["id"])
+        self.assertEqual((job.status, job.attempts), (Job.SUCCEEDED, 1))
+        uploaded.assert_not_called()
+
+    def test_failing_job_gives_up(self):
+        job = enqueue("process_image_upload", max_attempts=1, asset_id=1, staged_name="missing.jpg",
+                      original_name="missing.jpg")
+        ImageAsset.objects.create(pk=1)
+        with self.assertLogs("content.jobs", "WARNING"):
+            run_pending("worker")
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+
+@override_settings(API_CACHE_TIMEOUT=0, STORAGES={
+    **settings.STORAGES, "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+})
+class ResearchDownloadTests(TestCase):
+    """/download/ streams the document with byte ranges and validators."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.data = bytes(range(256)) * 1000
+        self.report = Research.objects.create(title="Report", status=Research.PUBLISHED)
+        self.report.file.save("report.pdf", ContentFile(self.data))
+        self.url = f"/api/research/{self.report.pk}/download/"
+
+    def test_full_and_ranged_reads(self):
+        full = self.client.get(self.url, HTTP_ACCEPT="application/pdf")
+        self.assertEqual(full.status_code, 200)
+        self.assertEqual(b"".join(full.streaming_content), self.data)
+        self.assertEqual(full["Content-Type"], "application/pdf")
+        self.assertIn("max-age=604800", full["Cache-Control"])
+
+        part = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+        self.assertEqual(part.status_code, 206)
+        self.assertEqual(b"".join(part.streaming_content), self.data[100:200])
+        self.assertEqual(part["Content-Range"], f"bytes 100-199/{len(self.data)}")
+        tail = self.client.get(self.url, HTTP_RANGE="bytes=-10")
+        self.assertEqual(b"".join(tail.streaming_content), self.data[-10:])
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.data)}-").status_code, 416)
+
+    def test_validators(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        stale = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag).status_code, 206)
+
+    def test_missing_hidden_and_remote_files(self):
+        empty = Research.objects.create(title="No file", status=Research.PUBLISHED)
+        self.assertEqual(self.client.get(f"/api/research/{empty.pk}/download/").status_code, 404)
+        remote = Research.objects.create(title="Remote", status=Research.DRAFT, file="https://example.com/r.pdf")
+        self.assertEqual(self.client.get(f"/api/research/{remote.pk}/download/").status_code, 404)
+        remote.status = Research.PUBLISHED
+        remote.save()
+        self.assertEqual(self.client.get(f"/api/research/{remote.pk}/download/").status_code, 302)
+
+    def test_errors_are_json(self):
+        empty = Research.objects.create(title="No file", status=Research.PUBLISHED)
+        lost = Research.objects.create(title="Lost", status=Research.PUBLISHED, file="research/missing.pdf")
+        for pk in (empty.pk, lost.pk, 0):
+            response = self.client.get(f"/api/research/{pk}/download/")
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response["Content-Type"], "application/json")
+            self.assertIn("detail", response.json())
+        self.assertEqual(self.client.get(f"/api/research/{lost.pk}/download/", HTTP_RANGE="bytes=0-9").status_code, 404)
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class BlockRenderingTests(TestCase):
+    """Blog bodies are compiled to sanitized HTML and text on save."""
+
+    def test_render_sanitizes(self):
+        rendered = render_blocks([
+            {"type": "heading", "level": 2, "text": "Hi <script>x</script>"},
+            {"type": "paragraph", "data": {"text": 'a <b>bold</b> <a href="javascript:alert(1)" onclick="x">l</a>'}},
+            {"type": "list", "style": "ordered", "items": ["one", {"content": "two"}]},
+            {"type": "image", "url": "javascript:x", "caption": "cap"},
+            {"type": "unknown", "text": "kept as text", "url": "http://example.com"},
+        ])
+        self.assertNotIn("script>", rendered["html"])
+        self.assertNotIn("javascript", rendered["html"])
+        self.assertIn("<b>bold</b>", rendered["html"])
+        self.assertIn("<ol><li>one</li><li>two</li></ol>", rendered["html"])
+        self.assertEqual(rendered["reading_time"], 1)
+
+    def test_api_fields(self):
+        post = Blog.objects.create(title="Post", status=Blog.PUBLISHED,
+                                   body=[{"type": "paragraph", "text": "word " * 450}])
+        self.assertEqual((post.word_count, post.reading_time), (450, 3))
+        detail = self.client.get(f"/api/blogs/{post.pk}/").json()
+        self.assertNotIn("body_html", detail)
+        self.assertEqual(detail["reading_time"], 3)
+        detail = self.client.get(f"/api/blogs/{post.pk}/?include=body_html").json()
+        self.assertTrue(detail["body_html"].startswith("<p>"))
+        self.assertIn("body_text", self.client.get("/api/blogs/?include=body_text").json()["results"][0])
+        data = self.client.get("/api/blogs/?fields=id,body_text").json()
+        self.assertEqual(set(data["results"][0]), {"id", "body_text"})
+
+        post.body = [{"type": "paragraph", "text": "short"}]
+        post.save(update_fields=["body"])
+        post.refresh_from_db()
+        self.assertEqual(post.body_text, "short")
+
+    def test_command_touches_blogs(self):
+        post = Blog.objects.create(title="Post", status=Blog.PUBLISHED,
+                                   body=[{"type": "paragraph", "text": "<p>Malaria nets</p>"}])
+        Blog.objects.filter(pk=post.pk).update(body_text="", body_html="", word_count=0)
+        stamp = post.updated_at
+        call_command("render_blog_bodies", only_missing=True, stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.body_text, "Malaria nets")
+        self.assertGreater(post.updated_at, stamp)
+        self.assertEqual(PublishedBlog.objects.get(pk=post.pk).updated_at, post.updated_at)
+        self.assertEqual(self.client.get("/api/blogs/?search=nets").json()["count"], 1)
+
+    def test_command_leaves_unchanged_blogs_alone(self):
+        posts = [Blog.objects.create(title=f"Post {n}", status=Blog.PUBLISHED,
+                                     body=[{"type": "paragraph", "text": f"Text {n}"}]) for n in range(3)]
+        Blog.objects.filter(pk=posts[1].pk).update(body_text="")
+        stamps = dict(Blog.objects.values_list("pk", "updated_at"))
+        out = StringIO()
+        call_command("render_blog_bodies", chunk_size=2, stdout=out)
+        self.assertIn("Rendered 3 blog bodies (1 changed)", out.getvalue())
+        after = dict(Blog.objects.values_list("pk", "updated_at"))
+        self.assertEqual([after[p.pk] == stamps[p.pk] for p in posts], [True, False, True])
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class StaticExportTests(TestCase):
+    """export_static writes only what changed; the middleware serves each new build."""
+
+    def setUp(self):
+        export = tempfile.TemporaryDirectory()
+        self.addCleanup(export.cleanup)
+        self.root = Path(export.name)
+        self.enterContext(override_settings(STATIC_EXPORT_ROOT=export.name))
+        for n in range(12):
+            Blog.objects.create(title=f"Entry {n}", status=Blog.PUBLISHED, body=[{"type": "paragraph", "text": "x"}])
+        Blog.objects.create(title="Draft")
+
+    def read(self, relative):
+        return json.loads((self.root / relative).read_bytes())
+
+    def test_incremental_builds(self):
+        # 12 details, 2 blog pages, 1 research page, sitemap chunk and index, 2 feeds of each kind
+        self.assertEqual(build_static_export()["written"], 12 + 2 + 1 + 6)
+        index = self.read("blogs/index.json")
+        self.assertEqual((index["count"], index["next"]), (12, "/static-api/blogs/page-2.json"))
+        self.assertEqual(json.loads(gzip.decompress((self.root / "blogs/entry-0.json.gz").read_bytes()))["title"],
+                         "Entry 0")
+        self.assertEqual(list(self.root.rglob("*.tmp")), [])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(build_static_export(), {"written": 0, "removed": 0})
+        self.assertEqual(len(ctx), 6)
+
+        Blog.objects.filter(slug="entry-3").update(status=Blog.DRAFT)
+        Blog.objects.get(slug="entry-3").save()
+        renamed = Blog.objects.get(slug="entry-4")
+        renamed.title = "Changed"
+        renamed.save()
+        # One detail, both pages, then sitemap chunk, index and the two feeds
+        self.assertEqual(build_static_export(), {"written": 1 + 2 + 4, "removed": 1})
+        self.assertFalse((self.root / "blogs/entry-3.json").exists())
+
+        Blog.objects.filter(slug__startswith="entry-1").delete()  # entry-1, entry-10, entry-11
+        self.assertEqual(build_static_export()["removed"], 3 + 1)
+        self.assertFalse((self.root / "blogs/page-2.json").exists())
+
+    def test_middleware_serves_new_builds(self):
+        build_static_export()
+        response = self.client.get("/static-api/blogs/entry-0.json", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual((response.status_code, response["Content-Encoding"]), (200, "gzip"))
+
+        self.assertEqual(self.client.get("/static-api/blogs/new-entry.json").status_code, 404)
+
+        Blog.objects.create(title="New entry", status=Blog.PUBLISHED)
+        build_static_export()
+        # The same client, so the same middleware instance as above
+        response = self.client.get("/static-api/blogs/new-entry.json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response["Content-Length"]), (self.root / "blogs/new-entry.json").stat().st_size)
+
+    def test_saves_queue_one_export(self):
+        with override_settings(STATIC_EXPORT_ON_SAVE=True), self.captureOnCommitCallbacks(execute=True):
+            Blog.objects.create(title="First")
+            Blog.objects.create(title="Second")
+        self.assertEqual(Job.objects.filter(kind="export_static").count(), 1)
+
+
+class RenderingTests(TestCase):
+    """The fast renderer matches DRF's JSON byte for byte; large responses are compressed."""
+
+    def test_fast_renderer_matches_json_renderer(self):
+        data = {"text": "x y é", "when": datetime(2024, 1, 1, tzinfo=dt_timezone.utc), "amount": Decimal("1.5"),
+                1: [None, True]}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    @override_settings(API_CACHE_TIMEOUT=0)
+    def test_compression(self):
+        for n in range(10):
+            Blog.objects.create(title=f"Post {n}", summary="s" * 300, status=Blog.PUBLISHED)
+        client = APIClient()
+        response = client.get("/api/blogs/", HTTP_ACCEPT_ENCODING="gzip;q=0.5, br;q=0")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        revalidated = client.get("/api/blogs/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertFalse(client.get("/api/blogs/", HTTP_ACCEPT_ENCODING="identity").has_header("Content-Encoding"))
+        # Below COMPRESSION_MIN_SIZE
+        small = client.get("/api/blogs/?fields=id", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(small.has_header("Content-Encoding"))
+
+    def test_payload_benchmark(self):
+        out = StringIO()
+        call_command("benchmark_api_payload", seed=3, repeat=1, stdout=out)
+        self.assertIn("list page with body", out.getvalue())
+        self.assertFalse(Blog.objects.exists())
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class InstrumentationTests(TestCase):
+    """Requests are measured per endpoint, with queries and serializer time."""
+
+    def setUp(self):
+        registry.reset()
+        for n in range(3):
+            Blog.objects.create(title=f"Post {n}", status=Blog.PUBLISHED)
+
+    def test_stats_and_server_timing(self):
+        client = APIClient()
+        with override_settings(SERVER_TIMING=True, SLOW_REQUEST_MS=0):
+            with self.assertLogs("zrcp_backend.instrumentation", "WARNING") as logs:
+                response = client.get("/api/blogs/")
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertIn("SELECT", logs.output[0])
+        # A new client: the one above logs every request as slow
+        client = APIClient()
+        self.assertEqual(client.get("/api/_stats/").status_code, 401)
+        client.force_authenticate(User.objects.create(username="admin", is_staff=True))
+        endpoint = client.get("/api/_stats/").json()["endpoints"]["GET blog-list"]
+        self.assertEqual(endpoint["count"], 1)
+        self.assertEqual(endpoint["queries"]["max"], 3)
+        self.assertGreater(endpoint["serializer_ms"]["mean"], 0)
+
+    def test_serializers_are_not_patched(self):
+        self.client.get("/api/blogs/")
+        self.assertIs(BaseSerializer.data, BaseSerializer.__dict__["data"])
+        self.assertNotIsInstance(BlogSerializer(), TimedDataMixin)
+        self.assertTrue(issubclass(BlogViewSet(action="retrieve").get_serializer_class(), BlogSerializer))
+
+
+class BenchmarkTests(TestCase):
+    """The benchmark commands seed content the API serves, and roll it back."""
+
+    def test_seeded_content_is_published(self):
+        seed_content(blogs=4, research=2, images=1)
+        self.assertEqual((PublishedBlog.objects.count(), PublishedResearch.objects.count()), (4, 2))
+        self.assertEqual(self.client.get("/api/blogs/").json()["count"], 4)
+        term = Blog.objects.first().title.split()[0]
+        self.assertGreater(self.client.get(f"/api/blogs/?search={term}").json()["count"], 0)
+
+    def test_api_benchmark(self):
+        output = tempfile.NamedTemporaryFile(suffix=".json")
+        self.addCleanup(output.close)
+        call_command("benchmark_api", blogs=6, research=3, images=2, requests=2, output=output.name,
+                     stdout=StringIO())
+        scenarios = json.loads(Path(output.name).read_bytes())["scenarios"]
+        self.assertEqual({name: result["errors"] for name, result in scenarios.items() if result["errors"]}, {})
+        self.assertGreater(scenarios["blogs.list"]["bytes"], 1000)
+        self.assertFalse(Blog.objects.exists())
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class QueryCountTests(TestCase):
+    """
+    Each endpoint must cost a fixed number of queries however many rows a
+    page holds: validators aggregate, COUNT for page numbers, the page itself.
+    """
+    LIST_QUERIES = 3
+    DETAIL_QUERIES = 1
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create(username="author", first_name="Asha", last_name="Ali")
+
+    def seed(self, n):
+        for i in range(n):
+            image = ImageAsset.objects.create(file=f"zrcp/sample-{i}", alt_text=f"image {i}")
+            Blog.objects.create(
+                title=f"Post {i}", status=Blog.PUBLISHED, author=self.author,
+                featured_image=image, body=[{"type": "paragraph", "text": "text"}],
+            )
+            Research.objects.create(title=f"Report {i}", status=Research.PUBLISHED, featured_image=image)
+
+    def assertQueries(self, url, expected):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        self.assertEqual(len(ctx), expected, f"{url}:\n" + "\n".join(q["sql"] for q in ctx.captured_queries))
+        return response
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        for n in (1, 10):
+            Blog.objects.all().delete()
+            Research.objects.all().delete()
+            self.seed(n)
+            for url in ("/api/blogs/", "/api/research/", "/api/blogs/?fields=title,author_name,featured_image"):
+                response = self.assertQueries(url, self.LIST_QUERIES)
+                self.assertEqual(len(response.json()["results"]), n)
+
+    def test_keyset_list_skips_count(self):
+        self.seed(10)
+        self.assertQueries("/api/blogs/?cursor=", self.LIST_QUERIES - 1)
+        self.assertQueries("/api/research/?cursor=", self.LIST_QUERIES - 1)
+
+    def test_detail_query_count(self):
+        self.seed(1)
+        for url in (f"/api/blogs/{Blog.objects.get().pk}/", f"/api/research/{Research.objects.get().pk}/"):
+            self.assertQueries(url, self.DETAIL_QUERIES)
+            self.assertQueries(f"{url}?fields=id,title", self.DETAIL_QUERIES)
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class BulkTests(TestCase):
+    """/bulk/ creates and updates many items in a constant number of queries."""
+
+    def setUp(self):
+        self.admin = User.objects.create(username="admin", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.image = ImageAsset.objects.create(alt_text="a")
+
+    def items(self, n, **fields):
+        return [{"title": "Same title", "status": Blog.PUBLISHED, "featured_image_id": self.image.pk,
+                 "author": self.admin.pk, "body": [{"type": "paragraph", "text": "zebra words"}], **fields}
+                for _ in range(n)]
+
+    def test_bulk_create(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post("/api/blogs/bulk/", self.items(50), format="json")
+        self.assertEqual(response.status_code, 201, response.content[:500])
+        self.assertLess(len(ctx), 15)
+        self.assertEqual(len(set(Blog.objects.values_list("slug", flat=True))), 50)
+        self.assertEqual(Blog.objects.first().word_count, 2)
+        self.assertEqual(self.client.get("/api/blogs/?search=zebra").json()["count"], 50)
+        self.assertEqual(PublishedBlog.objects.count(), 50)
+
+    def test_bulk_update(self):
+        self.client.post("/api/blogs/bulk/", self.items(20), format="json")
+        ids = list(Blog.objects.values_list("pk", flat=True))
+        changes = [{"id": pk, "title": f"New {pk}", "body": [{"type": "paragraph", "text": "okapi"}]} for pk in ids]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch("/api/blogs/bulk/", changes, format="json")
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        queries = len(ctx)
+        self.assertEqual(Blog.objects.get(pk=ids[0]).title, f"New {ids[0]}")
+        self.assertEqual(self.client.get("/api/blogs/?search=okapi").json()["count"], 20)
+        self.assertEqual(PublishedBlog.objects.get(pk=ids[0]).title, f"New {ids[0]}")
+
+        # Twice the items, the same number of queries
+        self.client.post("/api/blogs/bulk/", self.items(20), format="json")
+        changes = [{"id": pk, "title": "Again"} for pk in Blog.objects.values_list("pk", flat=True)]
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.patch("/api/blogs/bulk/", changes, format="json")
+        self.assertEqual(len(ctx), queries)
+
+    def test_errors(self):
+        invalid = self.client.post("/api/blogs/bulk/", [{"title": "ok"}, {"featured_image_id": 999}], format="json")
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual([error["index"] for error in invalid.json()["errors"]], [1])
+        self.assertFalse(Blog.objects.exists())
+        missing = self.client.patch("/api/blogs/bulk/", [{"id": 99999, "title": "x"}], format="json")
+        self.assertEqual(missing.status_code, 400)
+        self.assertEqual(APIClient().post("/api/blogs/bulk/", self.items(1), format="json").status_code, 401)
+
+    @override_settings(STORAGES={
+        **settings.STORAGES, "staging": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+    })
+    def test_bulk_images(self):
+        existing = jpeg_bytes(4, 4)
+        ImageAsset.objects.filter(pk=self.image.pk).update(content_hash=hash_file(BytesIO(existing)))
+        blue = jpeg_bytes(4, 4, (0, 0, 255))
+        files = [SimpleUploadedFile("a.jpg", existing, "image/jpeg"), SimpleUploadedFile("b.jpg", blue, "image/jpeg"),
+                 SimpleUploadedFile("c.jpg", blue, "image/jpeg")]
+        response = self.client.post("/api/images/bulk/", {"file": files, "alt_text": ["x", "y", "z"]},
+                                    format="multipart")
+        self.assertEqual(response.status_code, 202, response.content)
+        results = response.json()["results"]
+        self.assertEqual([result["status"] for result in results], ["existing", "queued", "queued"])
+        self.assertEqual(results[0]["asset"]["id"], self.image.pk)
+        self.assertEqual(results[1]["asset"]["id"], results[2]["asset"]["id"])
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class QueryPlanTests(TestCase):
+    """
+    The list endpoints' queries, as the views actually run them, must be
+    answered from an index: no full table scan and no separate sort step.
+    """
+    URLS = [
+        "/api/blogs/", "/api/blogs/?cursor=", "/api/blogs/?ordering=created_at",
+        "/api/blogs/?ordering=-published_at", "/api/research/", "/api/research/?cursor=",
+        "/api/research/?ordering=updated_at", "/api/research/?ordering=-created_at",
+    ]
+    STAFF_URLS = ["/api/blogs/", "/api/research/"]
+
+    def setUp(self):
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest("EXPLAIN output is only checked on SQLite and Postgres")
+        self.client = APIClient()
+        for i in range(20):
+            status = Blog.PUBLISHED if i % 2 else Blog.DRAFT
+            Blog.objects.create(title=f"Post {i}", status=status, body=[{"type": "paragraph", "text": "text"}])
+            Research.objects.create(title=f"Report {i}", status=status)
+
+    def plan(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                return [row[-1] for row in cursor.fetchall()]
+            # A few rows are cheaper to scan; make the planner show whether an index can serve the query
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql)
+            return [row[0] for row in cursor.fetchall()]
+
+    def assertIndexedPlan(self, sql, url):
+        plan = self.plan(sql)
+        if connection.vendor == "sqlite":
+            bad = [line for line in plan if (line.startswith("SCAN") and "USING" not in line) or "TEMP B-TREE" in line]
+        else:
+            bad = [line for line in plan if "Seq Scan on content_" in line or line.strip(" ->").startswith("Sort")]
+        self.assertFalse(bad, f"{url}\n{sql}\n" + "\n".join(plan))
+
+    def assertListQueriesIndexed(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        queries = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT")]
+        self.assertTrue(queries, url)
+        for sql in queries:
+            self.assertIndexedPlan(sql, url)
+
+    def test_public_list_queries_use_indexes(self):
+        for url in self.URLS:
+            self.assertListQueriesIndexed(url)
+
+    def test_staff_list_queries_use_indexes(self):
+        self.client.force_authenticate(User.objects.create(username="staff", is_staff=True))
+        for url in self.STAFF_URLS:
+            self.assertListQueriesIndexed(url)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """A repeated token skips the user query until the user is saved again."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(username="editor", is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/blogs/?cursor=")
+        return response, [q["sql"] for q in ctx.captured_queries if "auth_user" in q["sql"]]
+
+    def test_repeat_requests_skip_user_query(self):
+        _, queries = self.user_queries()
+        self.assertEqual(len(queries), 1)
+        response, queries = self.user_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+    def test_cached_auth_is_a_token(self):
+        request = RequestFactory().get("/api/blogs/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        _, fresh = CachedJWTAuthentication().authenticate(request)
+        with self.assertNumQueries(0):
+            user, cached = CachedJWTAuthentication().authenticate(request)
+        self.assertEqual(user, self.user)
+        self.assertIsInstance(cached, AccessToken)
+        self.assertEqual(cached.payload, fresh.payload)
+        self.assertEqual(cached["user_id"], str(self.user.pk))
+        self.assertEqual(cached.get("token_type"), "access")
+        self.assertEqual(str(cached), str(fresh))
+
+    def test_per_process_cache_warning(self):
+        local = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(CACHES=local, JWT_AUTH_CACHE_TIMEOUT=60):
+            self.assertEqual([e.id for e in check_jwt_auth_cache(None)], ["content.W001"])
+        with override_settings(JWT_AUTH_CACHE_TIMEOUT=0):
+            self.assertEqual(check_jwt_auth_cache(None), [])
+
+    def test_deactivating_user_invalidates_cached_token(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+        response, queries = self.user_queries()
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(len(queries), 1)
+
+
+class AsyncReadTests(TestCase):
+    """The async read path answers exactly like the sync viewsets, with the same queries."""
+    URLS = [
+        "/api/blogs/", "/api/blogs/?page=2", "/api/blogs/?page=9", "/api/blogs/?cursor=",
+        "/api/blogs/?ordering=created_at", "/api/blogs/?search=report", "/api/blogs/?fields=title,author_name",
+        "/api/blogs/?include=body_html", "/api/research/", "/api/research/?cursor=", "/api/research/?search=zanzibar",
+    ]
+
+    def setUp(self):
+        author = User.objects.create(username="author", first_name="Asha", last_name="Ali")
+        image = ImageAsset.objects.create(file="zrcp/sample", alt_text="image")
+        for i in range(15):
+            status = Blog.PUBLISHED if i % 3 else Blog.DRAFT
+            Blog.objects.create(
+                title=f"Report {i}", status=status, author=author, featured_image=image,
+                body=[{"type": "paragraph", "text": f"Zanzibar text {i}"}],
+            )
+            Research.objects.create(title=f"Zanzibar study {i}", status=status, featured_image=image)
+
+    def get(self, url, asynchronous, **headers):
+        with CaptureQueriesContext(connection) as ctx:
+            if asynchronous:
+                with override_settings(ROOT_URLCONF=__name__):
+                    self.assertTrue(iscoroutinefunction(resolve(url.split("?")[0]).func))
+                    response = async_to_sync(AsyncClient().get)(url, headers=headers)
+            else:
+                response = APIClient().get(url, headers=headers)
+        return response, len(ctx)
+
+    def assertSameResponse(self, url, **headers):
+        expected, expected_queries = self.get(url, False, **headers)
+        response, queries = self.get(url, True, **headers)
+        self.assertEqual(response.status_code, expected.status_code, url)
+        self.assertEqual(response.content, expected.content, url)
+        for name in ("ETag", "Last-Modified", "Content-Type", "Vary", "Allow"):
+            self.assertEqual(response.get(name), expected.get(name), f"{url} {name}")
+        self.assertEqual(queries, expected_queries, url)
+        return response
+
+    @override_settings(API_CACHE_TIMEOUT=0)
+    def test_list_and_detail_match_sync_views(self):
+        for url in self.URLS:
+            self.assertSameResponse(url)
+        for model, resource in ((Blog, "blogs"), (Research, "research")):
+            self.assertSameResponse(f"/api/{resource}/{model.objects.filter(status='published').first().pk}/")
+            self.assertSameResponse(f"/api/{resource}/{model.objects.filter(status='draft').first().pk}/")
+            self.assertSameResponse(f"/api/{resource}/abc/")
+
+    @override_settings(API_CACHE_TIMEOUT=0)
+    def test_conditional_get(self):
+        etag = self.assertSameResponse("/api/blogs/")["ETag"]
+        response = self.assertSameResponse("/api/blogs/", if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_cached_responses_are_shared(self):
+        for url in ("/api/research/", "/api/blogs/"):
+            response, _ = self.get(url, True)
+            self.assertEqual(response["X-Cache"], "MISS")
+            response, queries = self.get(url, False)
+            self.assertEqual((response["X-Cache"], queries), ("HIT", 0))
+
+    def test_token_requests_use_sync_views(self):
+        staff = User.objects.create(username="staff", is_staff=True)
+        response, _ = self.get("/api/blogs/", True, authorization=f"Bearer {AccessToken.for_user(staff)}")
+        self.assertEqual(response.json()["count"], 15)
+
+
+class ScheduledPublishingTests(TestCase):
+    """A future published_at keeps a post out of the public feed until the scheduler publishes it."""
+
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.post = Blog.objects.create(
+            title="Next week", status=Blog.PUBLISHED, published_at=timezone.now() + timezone.timedelta(hours=1),
+        )
+
+    def test_scheduled_post_goes_public_when_due(self):
+        self.assertEqual(self.client.get("/api/blogs/").json()["count"], 0)
+        self.assertEqual(self.client.get(f"/api/blogs/{self.post.pk}/").status_code, 404)
+        self.assertEqual(publish_due(), [])
+
+        # Time passes; update() as the clock would, without a save
+        Blog.objects.filter(pk=self.post.pk).update(published_at=timezone.now() - timezone.timedelta(minutes=1))
+        self.assertEqual([blog.pk for blog in publish_due()], [self.post.pk])
+        self.assertEqual(self.client.get("/api/blogs/").json()["count"], 1)
+        self.assertEqual(self.client.get(f"/api/blogs/{self.post.pk}/").status_code, 200)
+
+    @override_settings(API_CACHE_TIMEOUT=7200,
+                       CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_cached_pages_expire_when_a_post_is_due(self):
+        self.assertEqual(self.client.get("/api/blogs/").json()["count"], 0)
+        self.assertEqual(self.client.get("/api/blogs/")["X-Cache"], "HIT")
+
+        # The scheduler runs in another process whose cache the web workers do not share
+        Blog.objects.filter(pk=self.post.pk).update(published_at=timezone.now() - timezone.timedelta(minutes=1))
+        elsewhere = LocMemCache("scheduler", {})
+        with mock.patch("content.cache.get_cache", return_value=elsewhere):
+            self.assertEqual([blog.pk for blog in publish_due()], [self.post.pk])
+        # An hour on, when the post was due, but well within API_CACHE_TIMEOUT
+        with mock.patch("django.core.cache.backends.locmem.time") as clock:
+            clock.time.return_value = time.time() + 3601
+            self.assertEqual(self.client.get("/api/blogs/").json()["count"], 1)
+
+    def test_unpublishing_leaves_the_feed(self):
+        self.post.published_at = None
+        self.post.save()
+        self.assertTrue(PublishedBlog.objects.filter(pk=self.post.pk).exists())
+        self.post.status = Blog.DRAFT
+        self.post.save()
+        self.assertFalse(PublishedBlog.objects.exists())
+
+    def test_rebuild_picks_up_loaded_fixtures(self):
+        fixtures = tempfile.TemporaryDirectory()
+        self.addCleanup(fixtures.cleanup)
+        fixture = Path(fixtures.name) / "research.json"
+        fixture.write_text(json.dumps([{"model": "content.research", "pk": 900, "fields": {
+            "title": "Loaded", "slug": "loaded", "status": Research.PUBLISHED,
+            "created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z",
+        }}]))
+        call_command("loaddata", str(fixture), verbosity=0)
+        # Raw saves skip the feed receivers
+        self.assertFalse(PublishedResearch.objects.exists())
+        call_command("publish_scheduled", rebuild=True, once=True, stdout=StringIO())
+        self.assertEqual(list(PublishedResearch.objects.values_list("pk", flat=True)), [900])
+
+
+class SyndicationTests(TestCase):
+    """Feeds and sitemaps are rewritten only where entries changed, and served with validators."""
+
+    def setUp(self):
+        export = tempfile.TemporaryDirectory()
+        self.addCleanup(export.cleanup)
+        self.enterContext(override_settings(STATIC_EXPORT_ROOT=export.name, SITE_URL="https://example.org"))
+        self.posts = [Blog.objects.create(title=f"Post {n}", status=Blog.PUBLISHED) for n in range(2)]
+        Blog.objects.create(title="Draft")
+
+    def test_only_changed_entries_are_rewritten(self):
+        build_static_export()
+        self.assertEqual(build_static_export(), {"written": 0, "removed": 0})
+        self.posts[0].title = "Renamed"
+        self.posts[0].save()
+        # detail + list page, then sitemap chunk, index, RSS and Atom
+        self.assertEqual(build_static_export()["written"], 6)
+
+        rss = self.client.get("/feeds/blogs.rss")
+        self.assertEqual(rss["Content-Type"], "application/rss+xml")
+        body = b"".join(rss.streaming_content).decode()
+        self.assertIn("<title>Renamed</title>", body)
+        self.assertNotIn("Draft", body)
+        sitemap = self.client.get("/sitemaps/blogs-1.xml", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(sitemap["Content-Encoding"], "gzip")
+        self.assertEqual(
+            self.client.get("/sitemaps/blogs-1.xml", headers={"If-None-Match": sitemap["ETag"]}).status_code, 304
+        )
+        self.assertIn(b"/sitemaps/blogs-1.xml", b"".join(self.client.get("/sitemap.xml").streaming_content))
+
+    @override_settings(STATIC_EXPORT_ON_SAVE=True)
+    def test_posts_published_after_startup_reach_the_feeds(self):
+        build_static_export(full=True)  # at boot
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Blog.objects.create(title="Scheduled", status=Blog.PUBLISHED,
+                                       published_at=timezone.now() + timezone.timedelta(hours=1))
+        run_pending("test")
+        self.assertNotIn("Scheduled", b"".join(self.client.get("/feeds/blogs.atom").streaming_content).decode())
+
+        Blog.objects.filter(pk=post.pk).update(published_at=timezone.now() - timezone.timedelta(minutes=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_due()
+        run_pending("test")  # the job worker next to gunicorn (start.sh)
+        self.assertIn("<title>Scheduled</title>",
+                      b"".join(self.client.get("/feeds/blogs.atom").streaming_content).decode())
+        self.assertIn(post.slug, b"".join(self.client.get("/sitemaps/blogs-1.xml").streaming_content).decode())
+
+
+def make_pdf(pages):
+    """A minimal PDF with one line of text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    pdf, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return pdf
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class ResearchDocumentTests(TestCase):
+    """Uploaded PDFs are measured and their pages indexed after commit, once per distinct file."""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.client = APIClient()
+        self.pdf = make_pdf(["Annual report on coastal fisheries", "Mangrove restoration in Pemba"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.research = Research.objects.create(
+                title="Annual report", status=Research.PUBLISHED,
+                file=SimpleUploadedFile("report.pdf", self.pdf, content_type="application/pdf"),
+            )
+        run_pending("test")
+
+    def test_upload_is_measured_and_indexed(self):
+        self.research.refresh_from_db()
+        self.assertEqual((self.research.page_count, self.research.file_size), (2, len(self.pdf)))
+        self.assertEqual(self.research.extracted_hash, self.research.content_hash)
+        results = self.client.get("/api/research/?search=mangrove").json()["results"]
+        self.assertEqual([r["id"] for r in results], [self.research.pk])
+
+    def test_page_hits(self):
+        response = self.client.get("/api/research/pages/?search=mangrove")
+        self.assertEqual(response.status_code, 200)
+        [hit] = response.json()["results"]
+        self.assertEqual((hit["research"]["id"], hit["page"]), (self.research.pk, 2))
+        self.assertIn("<mark>Mangrove</mark>", hit["snippet"])
+        self.research.status = Research.DRAFT
+        self.research.save()
+        self.assertEqual(self.client.get("/api/research/pages/?search=mangrove").json()["results"], [])
+
+    def test_resaving_does_not_extract_again(self):
+        self.research.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.research.save()
+        self.assertFalse(Job.objects.filter(status=Job.QUEUED).exists())
+
+    @override_settings(STORAGES={**settings.STORAGES,
+                                 "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"}})
+    def test_extracts_where_the_file_is(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            report = Research.objects.create(
+                title="Remote", file=SimpleUploadedFile("remote.pdf", self.pdf, content_type="application/pdf"),
+            )
+        # No local path, and a job worker in another process could not open the file
+        with mock.patch("django.core.files.storage.InMemoryStorage.open", side_effect=FileNotFoundError):
+            run_pending("test")
+        report.refresh_from_db()
+        self.assertEqual((report.page_count, report.file_size), (2, len(self.pdf)))
+        self.assertFalse(Job.objects.filter(kind="extract_research_text").exists())
+
+    @override_settings(RESEARCH_EXTRACT_ASYNC=True)
+    def test_async_extraction_is_queued(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            report = Research.objects.create(
+                title="Queued", file=SimpleUploadedFile("queued.pdf", self.pdf, content_type="application/pdf"),
+            )
+        self.assertIsNone(Research.objects.get(pk=report.pk).page_count)
+        run_pending("test")
+        self.assertEqual(Research.objects.get(pk=report.pk).page_count, 2)
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"], DATABASE_REPLICA_STICKY_SECONDS=5)
+class ReplicaRouterTests(SimpleTestCase):
+    """GET requests read from a replica, except models written within the sticky window."""
+
+    def setUp(self):
+        get_cache().clear()
+
+    def read_alias(self, method):
+        middleware = ReplicaReadMiddleware(lambda request: db_router.db_for_read(Blog))
+        return middleware(getattr(RequestFactory(), method)("/api/blogs/"))
+
+    def test_reads_of_get_requests_go_to_replica(self):
+        self.assertEqual(self.read_alias("get"), "replica1")
+        self.assertEqual(self.read_alias("post"), "default")
+        self.assertEqual(db_router.db_for_read(Blog), "default")
+
+    def test_writes_pin_model_to_primary(self):
+        self.assertEqual(db_router.db_for_write(Blog), "default")
+        self.assertEqual(self.read_alias("get"), "default")
+        with replica_reads():
+            self.assertEqual(db_router.db_for_read(Research), "replica1")
+
+    def test_replicas_require_shared_cache(self):
+        local = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(CACHES=local):
+            self.assertEqual([e.id for e in check_replica_pin_cache(None)], ["content.E001"])
+        shared = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                              "LOCATION": tempfile.gettempdir()}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_replica_pin_cache(None), [])
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(check_replica_pin_cache(None), [])
+
+
+@skipUnless(settings.DATABASE_REPLICAS, "set DATABASE_REPLICA_URLS, e.g. to sqlite:///replica.sqlite3, and a shared CACHE_BACKEND")
+@override_settings(API_CACHE_TIMEOUT=0)
+class ReplicaQueryTests(TransactionTestCase):
+    """Against real aliases; TestCase's transaction would keep every read on the primary."""
+    databases = {"default", *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        get_cache().clear()
+        Blog.objects.create(title="Post", status=Blog.PUBLISHED)
+        get_cache().clear()
+
+    def replica_queries(self, url):
+        with ExitStack() as stack:
+            replicas = [stack.enter_context(CaptureQueriesContext(connections[alias]))
+                        for alias in settings.DATABASE_REPLICAS]
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return sum(len(capture.captured_queries) for capture in replicas)
+
+    def test_public_list_reads_from_replica_until_pinned(self):
+        self.assertGreater(self.replica_queries("/api/blogs/"), 0)
+        Blog.objects.create(title="Another", status=Blog.PUBLISHED)
+        self.assertEqual(self.replica_queries("/api/blogs/"), 0)
@@ -1,6 +1,31 @@
-from rest_framework import viewsets, permissions, filters
-from .models import Blog, Research, ImageAsset
-from .serializers import BlogSerializer, ResearchSerializer, ImageAssetSerializer
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.storage import storages
+from django.db import transaction
+from django.http import Http404
+from rest_framework import viewsets, permissions, filters, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from .models import Blog, Research, ImageAsset, Job
+from .serializers import (
+    BlogSerializer, BlogListSerializer, ResearchSerializer, ResearchListSerializer,
+    ImageAssetSerializer, JobSerializer, included_fields, requested_fields,
+)
+from .cache import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .pagination import ContentPagination
+from .search import FullTextSearchFilter, page_hits
+from .published import PublishedFeedMixin, anext_scheduled, feed_item_field, next_scheduled, until_scheduled
+from .media import upload_hash
+from .jobs import enqueue, enqueue_many
+from .bulk import BulkMixin, as_pk
+from .async_reads import AsyncReadMixin
+from .signals import bulk_saved
+from .downloads import FileDownloadMixin, PassthroughRenderer, serve_file
+from zrcp_backend.instrumentation import SerializerTimingMixin
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -9,42 +34,262 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         return request.user and request.user.is_staff
 
 
-class ImageAssetViewSet(viewsets.ModelViewSet):
+class SlimReadMixin:
+    """
+    Keep heavy columns out of read queries. Lists use ``list_serializer_class``
+    and defer ``list_deferred_fields``; the serializer's ``optional_fields``
+    are deferred unless ``?include=``d. A ``?fields=`` sparse fieldset (on list
+    or detail) loads only the columns backing the requested fields.
+    """
+    list_serializer_class = None
+    list_deferred_fields = ()
+
+    def get_serializer_class(self):
+        if self.action == "list" and self.list_serializer_class and not requested_fields(self.request):
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def narrow_columns(self, qs):
+        if self.request.method not in permissions.SAFE_METHODS:
+            return qs
+        # Published feed rows (content.published) narrow the item they join
+        item_field = feed_item_field(qs.model)
+        prefix = f"{item_field}__" if item_field else ""
+        requested = requested_fields(self.request)
+        if requested:
+            model = qs.model._meta.get_field(item_field).related_model if item_field else qs.model
+            columns = self.sparse_columns(model, requested)
+            select_related = qs.query.select_related
+            if item_field and isinstance(select_related, dict):
+                select_related = select_related.get(item_field, {})
+            related = [name for name in select_related if name in columns] if isinstance(select_related, dict) else []
+            # Detail validators read the inline relations' updated_at (content.conditional)
+            stamps = [name for name in getattr(self, "validator_relations", ()) if name not in columns]
+            related += stamps
+            columns |= {f"{name}__updated_at" for name in stamps}
+            if not item_field:
+                return qs.select_related(None).select_related(*related).only(*columns)
+            # Of the feed row itself, only the ordering keys and updated_at
+            own = [f.name for f in qs.model._meta.concrete_fields if f.name not in qs.model.LIST_FIELDS]
+            return qs.select_related(None).select_related(item_field, *(prefix + name for name in related)).only(
+                *own, *(prefix + name for name in columns)
+            )
+        deferred = set(getattr(self.serializer_class, "optional_fields", ())) - included_fields(self.request)
+        if self.action == "list":
+            deferred.update(self.list_deferred_fields)
+        return qs.defer(*(prefix + name for name in deferred)) if deferred else qs
+
+    def sparse_columns(self, model, requested):
+        # Always load what validators and keyset cursors read off each row
+        columns = {"id", "updated_at"} | {key.lstrip("-") for key in getattr(self, "keyset_ordering", ())} - {"pk"}
+        for name, field in self.serializer_class().fields.items():
+            if name not in requested or field.write_only:
+                continue
+            source = name if field.source == "*" else field.source
+            try:
+                model_field = model._meta.get_field(source.split(".")[0])
+            except FieldDoesNotExist:
+                continue
+            if model_field.concrete:
+                columns.add(model_field.name)
+        return columns
+
+
+class ImageAssetViewSet(SerializerTimingMixin, BulkMixin, viewsets.ModelViewSet):
     queryset = ImageAsset.objects.all().order_by("-created_at")
     serializer_class = ImageAssetSerializer
     permission_classes = [IsAdminOrReadOnly]
 
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data.get("file")
+        if upload is not None:
+            # Identical bytes already stored: hand back that asset instead of uploading again
+            digest = upload_hash(upload)
+            existing = ImageAsset.objects.filter(content_hash=digest).order_by("pk").first()
+            if existing is not None:
+                return Response(self.get_serializer(existing).data, status=status.HTTP_200_OK)
+            if settings.IMAGE_UPLOAD_ASYNC:
+                return self.create_deferred(serializer, upload, digest)
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+    def create_deferred(self, serializer, upload, digest):
+        """Stage the upload locally and let the job worker push it to Cloudinary."""
+        staged_name = storages["staging"].save(f"{digest}/{upload.name}", upload)
+        asset = serializer.save(file=None, content_hash=digest)
+        job = enqueue(
+            "process_image_upload", asset_id=asset.pk, staged_name=staged_name,
+            original_name=upload.name, content_type=upload.content_type,
+        )
+        data = dict(serializer.data, job=JobSerializer(job).data)
+        location = reverse("job-detail", args=[job.pk], request=self.request)
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers={"Location": location})
+
+    def bulk_items(self, request):
+        # multipart: repeated ``file`` parts, optionally with ``alt_text`` parts in the same order
+        if request.method != "POST" or not hasattr(request.data, "getlist"):
+            return request.data
+        alt_texts = request.data.getlist("alt_text")
+        return [
+            {"file": upload, "alt_text": alt_texts[i] if i < len(alt_texts) else ""}
+            for i, upload in enumerate(request.FILES.getlist("file"))
+        ]
+
+    def bulk_create(self, items):
+        """
+        Reuse assets whose content is already stored (one hash lookup for the
+        whole batch), then stage and queue the rest like ``create``.
+        """
+        serializers, context, errors = self.validate_items(items)
+        if errors:
+            return self.errors_response(errors)
+        uploads = [serializer.validated_data.get("file") for serializer in serializers]
+        digests = [upload_hash(upload) if upload is not None else None for upload in uploads]
+        known = {}
+        for asset in ImageAsset.objects.filter(content_hash__in={d for d in digests if d}).order_by("-pk"):
+            known[asset.content_hash] = asset  # lowest pk wins
+
+        results, new = [None] * len(serializers), {}
+        for index, (serializer, upload, digest) in enumerate(zip(serializers, uploads, digests)):
+            if digest in known:
+                results[index] = {"status": "existing", "asset": known[digest]}
+            elif digest in new:
+                # Same bytes twice in one request: one asset
+                new[digest][1].append(index)
+            else:
+                new[digest or f"#{index}"] = (serializer, [index], upload)
+
+        jobs = {}
+        with transaction.atomic():
+            if settings.IMAGE_UPLOAD_ASYNC:
+                staged = {}
+                assets = []
+                for digest, (serializer, indexes, upload) in new.items():
+                    asset = ImageAsset(alt_text=serializer.validated_data.get("alt_text", ""))
+                    if upload is not None:
+                        asset.content_hash = digest
+                        staged[digest] = storages["staging"].save(f"{digest}/{upload.name}", upload)
+                    assets.append((digest, asset))
+                ImageAsset.objects.bulk_create([asset for _, asset in assets])
+                queued = [(digest, asset) for digest, asset in assets if digest in staged]
+                created_jobs = enqueue_many("process_image_upload", [
+                    {"asset_id": asset.pk, "staged_name": staged[digest], "original_name": new[digest][2].name,
+                     "content_type": new[digest][2].content_type}
+                    for digest, asset in queued
+                ])
+                jobs = {digest: job for (digest, _), job in zip(queued, created_jobs)}
+                bulk_saved(ImageAsset, [asset for _, asset in assets])
+                saved = dict(assets)
+            else:
+                # Each upload goes to Cloudinary on save(); there is no batch upload
+                saved = {digest: serializer.save() for digest, (serializer, _, _) in new.items()}
+        for digest, (_, indexes, _) in new.items():
+            for index in indexes:
+                results[index] = {"status": "queued" if digest in jobs else "created", "asset": saved[digest]}
+                if digest in jobs:
+                    results[index]["job"] = jobs[digest]
 
-class BlogViewSet(viewsets.ModelViewSet):
-    # ✅ Removed 'featured_image' from select_related (it's now an ImageField)
-    queryset = Blog.objects.select_related("author").all()
+        data = []
+        for result in results:
+            entry = {"status": result["status"], "asset": ImageAssetSerializer(result["asset"], context=context).data}
+            if "job" in result:
+                entry["job"] = JobSerializer(result["job"]).data
+            data.append(entry)
+        code = status.HTTP_202_ACCEPTED if jobs else status.HTTP_201_CREATED
+        return Response({"count": len(data), "results": data}, status=code)
+
+
+class JobViewSet(SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
+    """Status of background jobs, e.g. the upload started by POST /api/images/."""
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+
+class BlogViewSet(SerializerTimingMixin, CachedResponseMixin, ConditionalGetMixin, SlimReadMixin, PublishedFeedMixin,
+                  AsyncReadMixin, BulkMixin, viewsets.ModelViewSet):
+    queryset = Blog.objects.select_related("author", "featured_image").all()
     serializer_class = BlogSerializer
+    list_serializer_class = BlogListSerializer
+    list_deferred_fields = ("body",)
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    cache_models = (Blog, ImageAsset)
+    validator_relations = ("featured_image",)
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     search_fields = ["title", "summary", "slug"]
     ordering_fields = ["published_at", "created_at"]
     ordering = ["-published_at", "-created_at"]
+    pagination_class = ContentPagination
+    keyset_ordering = ["-published_at", "-created_at", "-pk"]
 
     def get_queryset(self):
         qs = super().get_queryset()
-        # Public can see only published; staff sees all
+        # Public sees the published feed (no drafts, nothing scheduled); staff sees all
         if not (self.request.user and self.request.user.is_staff):
-            qs = qs.filter(status="published")
-        return qs
+            qs = self.public_queryset(qs)
+        return self.narrow_columns(qs)
+
+    def cache_timeout(self):
+        return until_scheduled(super().cache_timeout(), next_scheduled())
 
+    async def acache_timeout(self):
+        return until_scheduled(await super().acache_timeout(), await anext_scheduled())
 
-class ResearchViewSet(viewsets.ModelViewSet):
-    # ✅ Removed 'featured_image' from select_related (it's now an ImageField)
-    queryset = Research.objects.all()
+
+class ResearchViewSet(SerializerTimingMixin, FileDownloadMixin, CachedResponseMixin, ConditionalGetMixin,
+                      SlimReadMixin, PublishedFeedMixin, AsyncReadMixin, BulkMixin, viewsets.ModelViewSet):
+    queryset = Research.objects.select_related("featured_image").all()
     serializer_class = ResearchSerializer
+    list_serializer_class = ResearchListSerializer
+    list_deferred_fields = ("description",)
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    cache_models = (Research, ImageAsset)
+    validator_relations = ("featured_image",)
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     search_fields = ["title", "description", "slug"]
     ordering_fields = ["created_at", "updated_at"]
     ordering = ["-created_at"]
+    pagination_class = ContentPagination
+    keyset_ordering = ["-created_at", "-pk"]
 
     def get_queryset(self):
         qs = super().get_queryset()
         if not (self.request.user and self.request.user.is_staff):
-            qs = qs.filter(status="published")
-        return qs
+            qs = self.public_queryset(qs)
+        return self.narrow_columns(qs)
+
+    @action(detail=True, methods=["get"], renderer_classes=[PassthroughRenderer])
+    def download(self, request, pk=None):
+        """Stream the research document, with Range support for PDF viewers."""
+        research = self.get_object()
+        if not research.file:
+            raise Http404("This research item has no file.")
+        return serve_file(request, research.file, public=research.status == Research.PUBLISHED)
+
+    @action(detail=False, methods=["get"])
+    def pages(self, request):
+        """
+        Pages inside research documents matching ``?search=``, best first,
+        each with a highlighted snippet; ``?research=<id>`` searches one item.
+        """
+        term = FullTextSearchFilter().search_term(request)
+        if not term:
+            raise ValidationError({"search": ["This query parameter is required."]})
+        queryset = self.get_queryset()
+        if "research" in request.query_params:
+            queryset = queryset.filter(pk=as_pk(request.query_params["research"]))
+        hits = page_hits(queryset, term) or []
+
+        # The hits are a ranked list, so page numbers rather than keyset cursors
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(hits, request, view=self)
+        shown = hits if page is None else page
+        items = {
+            row["id"]: row
+            for row in queryset.filter(pk__in={hit.object_id for hit in shown}).values("id", "title", "slug")
+        }
+        data = [{"research": items[hit.object_id], "page": hit.page, "snippet": hit.snippet} for hit in shown]
+        return Response(data) if page is None else paginator.get_paginated_response(data)
@@ -0,0 +1,20 @@
+#!/usr/bin/env bash
+# Exit on error
+set -o errexit
+
+# The disk is ephemeral, so the static API export is rebuilt in full on every start; after that the job
+# worker below keeps it, the feeds and the sitemaps current (STATIC_EXPORT_ON_SAVE)
+python manage.py export_static --full
+
+# The job worker and the scheduler run in this container: jobs read the uploads staged on its disk and
+# write the export it serves. Each is restarted if it exits.
+supervise() {
+    while true; do
+        "$@" || echo "$* exited with status $?, restarting" >&2
+        sleep 5
+    done
+}
+supervise python manage.py run_jobs &
+supervise python manage.py publish_scheduled &
+
+exec gunicorn zrcp_backend.wsgi:application
@@ -3,6 +3,30 @@ ASGI config for zrcp_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Deploying with ASGI
+-------------------
+Run gunicorn with uvicorn workers and turn the async read path on::
+
+    ASYNC_READS=True CONN_MAX_AGE=0 \\
+        gunicorn zrcp_backend.asgi:application -k uvicorn.workers.UvicornWorker --workers 2
+
+(``uvicorn zrcp_backend.asgi:application`` works for a single process.)
+
+- ``ASYNC_READS`` serves anonymous GETs of the blog and research list/detail
+  endpoints (search, ordering and both paginations included) from async
+  views (content.async_reads). Writes, token-authenticated requests and the
+  browsable API still run the sync DRF viewsets, in a thread per request.
+- Django's async ORM runs each query in the request's own thread, so a
+  worker keeps serving other readers while one waits on the database, the
+  cache or Cloudinary. Persistent connections are per thread and would pile
+  up rather than be reused, hence ``CONN_MAX_AGE=0``; on Postgres,
+  ``DATABASE_POOL_MAX_SIZE`` lets those threads share a pool instead.
+- Every async request still pays for Django's stock middleware handing its
+  hooks to a thread. With a local database nothing waits, and a sync worker
+  answers each request sooner; the gain is under concurrent load against a
+  remote database. ``manage.py benchmark_asgi --db-latency 10`` measures
+  both servers against the same data.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
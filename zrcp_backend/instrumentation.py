@@ -0,0 +1,283 @@
+"""
+Per-endpoint request instrumentation.
+
+``InstrumentationMiddleware`` measures every request: wall time, number and
+duration of DB queries (through an execute wrapper on every connection, so
+DEBUG is not needed, and queries an async view runs in a worker thread still
+count against its request), time spent producing ``serializer.data`` (in
+views with ``SerializerTimingMixin``) and response bytes. The
+numbers are aggregated per ``"<METHOD> <view name>"`` into in-process
+histograms, served to staff at ``/api/_stats/`` and, with
+``SERVER_TIMING``, returned in a ``Server-Timing`` header. Requests slower
+than ``SLOW_REQUEST_MS`` are logged together with the SQL they ran.
+
+Stats are per worker process and reset on restart.
+"""
+import bisect
+import contextvars
+import functools
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import permissions, serializers
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the wall-time histogram buckets; the last one is open
+BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+MAX_LOGGED_QUERIES = 100
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self, capture_sql=False):
+        self.queries = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self.sql = [] if capture_sql else None
+
+    def add_query(self, elapsed, alias, sql):
+        self.queries += 1
+        self.query_time += elapsed
+        if self.sql is not None and len(self.sql) < MAX_LOGGED_QUERIES:
+            self.sql.append((elapsed, alias, sql))
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection. Looks the request up in
+    a context variable, which sync_to_async carries into worker threads.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(time.perf_counter() - start, context["connection"].alias, sql)
+
+
+def _add_query_recording(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def _add_thread_query_recording(**kwargs):
+    for connection in connections.all(initialized_only=True):
+        _add_query_recording(connection)
+
+
+def _install_query_recording():
+    # Connections are per thread. request_started runs in the thread that
+    # will serve the request (under ASGI too) and covers connections opened
+    # before this was installed; connection_created covers the rest.
+    _add_thread_query_recording()
+    request_started.connect(_add_thread_query_recording, dispatch_uid="instrumentation.thread_connections")
+    connection_created.connect(_add_query_recording, dispatch_uid="instrumentation.record_query")
+
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.total = self.max = 0.0
+        self.queries = self.query_time = self.serializer_time = self.bytes = 0
+        self.max_queries = 0
+        self.errors = 0
+
+    def add(self, elapsed_ms, metrics, size, status):
+        self.count += 1
+        self.buckets[bisect.bisect_left(BUCKETS, elapsed_ms)] += 1
+        self.total += elapsed_ms
+        self.max = max(self.max, elapsed_ms)
+        self.queries += metrics.queries
+        self.max_queries = max(self.max_queries, metrics.queries)
+        self.query_time += metrics.query_time * 1000
+        self.serializer_time += metrics.serializer_time * 1000
+        self.bytes += size
+        self.errors += status >= 500
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the ``fraction`` quantile (max for the open bucket)."""
+        rank = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return BUCKETS[i] if i < len(BUCKETS) else round(self.max, 2)
+        return None
+
+    def as_dict(self):
+        n = self.count or 1
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "time_ms": {
+                "mean": round(self.total / n, 2), "max": round(self.max, 2),
+                "p50": self.percentile(0.5), "p95": self.percentile(0.95), "p99": self.percentile(0.99),
+            },
+            "queries": {"mean": round(self.queries / n, 2), "max": self.max_queries,
+                        "mean_ms": round(self.query_time / n, 2)},
+            "serializer_ms": {"mean": round(self.serializer_time / n, 2)},
+            "bytes": {"mean": round(self.bytes / n), "total": self.bytes},
+            "histogram_ms": {
+                (f"<={bound}" if i < len(BUCKETS) else f">{BUCKETS[-1]}"): count
+                for i, (bound, count) in enumerate(zip(BUCKETS + (None,), self.buckets)) if count
+            },
+        }
+
+
+class StatsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        self.since = time.time()
+
+    def record(self, key, elapsed_ms, metrics, size, status):
+        with self.lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+            stats.add(elapsed_ms, metrics, size, status)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "since": self.since,
+                "endpoints": {key: stats.as_dict() for key, stats in sorted(self.endpoints.items())},
+            }
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+            self.since = time.time()
+
+
+registry = StatsRegistry()
+
+
+class TimedDataMixin:
+    """Counts ``serializer.data`` against the current request's serializer time."""
+
+    @property
+    def data(self):
+        metrics = _current.get()
+        if metrics is None:
+            return super().data
+        start = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            metrics.serializer_time += time.perf_counter() - start
+
+
+@functools.cache
+def timed_serializer(serializer_class):
+    """``serializer_class`` with timed ``.data``, for ``many=True`` too (through its list serializer)."""
+    meta = getattr(serializer_class, "Meta", None)
+    list_class = getattr(meta, "list_serializer_class", serializers.ListSerializer)
+    attrs = {
+        "__module__": serializer_class.__module__,
+        "Meta": type("Meta", (meta,) if meta else (), {
+            "list_serializer_class": type(list_class.__name__, (TimedDataMixin, list_class), {}),
+        }),
+    }
+    return type(serializer_class.__name__, (TimedDataMixin, serializer_class), attrs)
+
+
+class SerializerTimingMixin:
+    """
+    For the project's views: their serializers report the time spent in
+    ``.data`` to InstrumentationMiddleware. Nested serializers run through
+    to_representation and are not counted twice.
+    """
+
+    def get_serializer_class(self):
+        return timed_serializer(super().get_serializer_class())
+
+
+def endpoint_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return f"{request.method} <unresolved>"
+    return f"{request.method} {match.view_name or match.route}"
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = settings.SLOW_REQUEST_MS
+        self.server_timing = settings.SERVER_TIMING
+        _install_query_recording()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics(capture_sql=self.slow_ms is not None)
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, (time.perf_counter() - start) * 1000)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics(capture_sql=self.slow_ms is not None)
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, (time.perf_counter() - start) * 1000)
+
+    def finish(self, request, response, metrics, elapsed_ms):
+        if response.streaming:
+            size = int(response.get("Content-Length") or 0)
+        else:
+            size = len(response.content)
+        key = endpoint_name(request)
+        registry.record(key, elapsed_ms, metrics, size, response.status_code)
+
+        if self.server_timing:
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={metrics.query_time * 1000:.1f};desc="{metrics.queries} queries"',
+                f"serialize;dur={metrics.serializer_time * 1000:.1f}",
+                f"total;dur={elapsed_ms:.1f}",
+            ])
+        if self.slow_ms is not None and elapsed_ms >= self.slow_ms:
+            statements = "\n".join(f"  [{t * 1000:.1f} ms {alias}] {sql}" for t, alias, sql in metrics.sql)
+            logger.warning(
+                "Slow request %s %s (%s): %.1f ms, %d queries in %.1f ms, serializer %.1f ms\n%s",
+                request.method, request.get_full_path(), key, elapsed_ms, metrics.queries,
+                metrics.query_time * 1000, metrics.serializer_time * 1000, statements,
+            )
+        return response
+
+
+class StatsView(APIView):
+    """Per-endpoint timing, query and size stats for this worker; DELETE resets them."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(registry.snapshot())
+
+    def delete(self, request):
+        registry.reset()
+        return Response(status=204)
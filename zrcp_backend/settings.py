@@ -10,7 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import dj_database_url
-from decouple import config
+from decouple import Csv, config
 from pathlib import Path
 import cloudinary
 
@@ -27,7 +27,7 @@ SECRET_KEY = 'django-insecure-!po28bv(0%w=q*4!&tjf_3n4th#jmnyup^0gz6n@26uq%#=)mb
 # SECURITY WARNING: don't run with debug turned on in production!
 # DEBUG = True
 # DEBUG = config('DEBUG', default=False, cast=bool)
-DEBUG = True
+DEBUG = config('DEBUG', default=True, cast=bool)
 
 
 ALLOWED_HOSTS = [
@@ -75,8 +75,11 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware', 
-    'django.middleware.security.SecurityMiddleware',
+    'content.middleware.AsyncCapableWhiteNoiseMiddleware',
+    'content.middleware.StaticExportMiddleware',
+    'zrcp_backend.instrumentation.InstrumentationMiddleware',
+    'content.middleware.ReplicaReadMiddleware',
+    'content.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -115,22 +118,95 @@ WSGI_APPLICATION = 'zrcp_backend.wsgi.application'
 #     }
 # }
 
+# Under ASGI each request runs its queries in its own thread, so persistent
+# connections pile up instead of being reused: set CONN_MAX_AGE=0 there, or
+# pool them (Postgres only, with psycopg 3) with DATABASE_POOL_MAX_SIZE > 0.
+CONN_MAX_AGE = config('CONN_MAX_AGE', default=600, cast=int)
+# Ping a persistent connection before reusing it in a new request, so one the
+# server dropped while idle is reopened instead of failing the first query
+CONN_HEALTH_CHECKS = config('CONN_HEALTH_CHECKS', default=True, cast=bool)
+DATABASE_POOL_MIN_SIZE = config('DATABASE_POOL_MIN_SIZE', default=1, cast=int)
+DATABASE_POOL_MAX_SIZE = config('DATABASE_POOL_MAX_SIZE', default=0, cast=int)
+
+
+def database(url):
+    db = dj_database_url.parse(url, conn_max_age=CONN_MAX_AGE, conn_health_checks=CONN_HEALTH_CHECKS)
+    if DATABASE_POOL_MAX_SIZE and db['ENGINE'] == 'django.db.backends.postgresql':
+        # Every worker thread borrows from one pool per process; Django requires
+        # CONN_MAX_AGE=0 with it, and the pool drops connections that went bad
+        db['CONN_MAX_AGE'] = 0
+        db.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': DATABASE_POOL_MIN_SIZE,
+            'max_size': DATABASE_POOL_MAX_SIZE,
+            'timeout': config('DATABASE_POOL_TIMEOUT', default=10, cast=int),
+        }
+    return db
+
+
 DATABASES = {
-    'default': dj_database_url.config(
-        default=config('DATABASE_URL', default='sqlite:///db.sqlite3'),
-        conn_max_age=600
-    )
+    'default': database(config('DATABASE_URL', default='sqlite:///db.sqlite3')),
+}
+
+# Read replicas (content.routers): comma-separated URLs become replica1,
+# replica2, ... Reads of GET/HEAD/OPTIONS requests go to one of them, except
+# for models written in the last DATABASE_REPLICA_STICKY_SECONDS, which is
+# tracked in the API cache, so replicas require a shared CACHE_BACKEND (content.E001).
+DATABASES.update({
+    f'replica{number}': {**database(url), 'TEST': {'MIRROR': 'default'}}
+    for number, url in enumerate(config('DATABASE_REPLICA_URLS', default='', cast=Csv()), start=1)
+})
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_REPLICA_STICKY_SECONDS = config('DATABASE_REPLICA_STICKY_SECONDS', default=5, cast=int)
+DATABASE_ROUTERS = ['content.routers.ReplicaRouter']
+
+
+# Cache for rendered API responses. LocMem by default; point CACHE_BACKEND at
+# django.core.cache.backends.filebased.FileBasedCache (with CACHE_LOCATION a
+# directory) to share entries between gunicorn workers.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='zrcp-api'),
+    }
 }
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=300, cast=int)
+# Cache-Control max-age for /api/research/<id>/download/
+DOWNLOAD_CACHE_MAX_AGE = config('DOWNLOAD_CACHE_MAX_AGE', default=7 * 24 * 3600, cast=int)
 
 
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticatedOrReadOnly"],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "content.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
+    "DEFAULT_RENDERER_CLASSES": [
+        "content.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
+# Seconds a verified JWT and its user's flags are reused (content.authentication); 0 disables
+JWT_AUTH_CACHE_TIMEOUT = config('JWT_AUTH_CACHE_TIMEOUT', default=60, cast=int)
+# Serve anonymous blog/research reads from async views (content.async_reads).
+# Only worth it under ASGI (zrcp_backend/asgi.py); under WSGI each would run in its own event loop.
+ASYNC_READS = config('ASYNC_READS', default=False, cast=bool)
+# Largest list accepted by the /bulk/ endpoints (content.bulk)
+BULK_MAX_ITEMS = 1000
+# "orjson" (used when installed) or "json" for DRF's stdlib encoder
+API_JSON_BACKEND = config('API_JSON_BACKEND', default='orjson')
+
+# Request instrumentation (zrcp_backend.instrumentation); stats at /api/_stats/
+SERVER_TIMING = config('SERVER_TIMING', default=DEBUG, cast=bool)
+# Log requests slower than this many ms with their SQL; unset to disable
+SLOW_REQUEST_MS = config('SLOW_REQUEST_MS', default='', cast=lambda v: int(v) if v else None)
+
+# content.middleware.CompressionMiddleware
+COMPRESSION_MIN_SIZE = 1024  # bytes; smaller responses are sent as-is
+COMPRESSION_CONTENT_TYPES = ('application/json',)
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5  # 11 is for offline compression, far too slow per request
 
 
 # INSTALLED_APPS += ["corsheaders"]
@@ -156,6 +232,49 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Media files settings
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+
+# Responsive image derivatives (content.images). The Cloudinary backend only
+# records transformation URLs; the Pillow backend resizes locally into the
+# default storage and works offline.
+IMAGE_DERIVATIVE_BACKEND = config('IMAGE_DERIVATIVE_BACKEND', default='content.images.CloudinaryDerivativeBackend')
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1024, 1600)
+
+# DEFAULT_FILE_STORAGE/STATICFILES_STORAGE above are no longer read by Django
+# 5.x; "default" and "staticfiles" keep the effective backends. "staging"
+# holds image uploads until the run_jobs worker pushes them to Cloudinary.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    'staging': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {'location': config('STAGING_ROOT', default=os.path.join(BASE_DIR, 'staging'))},
+    },
+}
+
+# Background jobs (content.jobs, run with `manage.py run_jobs`)
+IMAGE_UPLOAD_ASYNC = config('IMAGE_UPLOAD_ASYNC', default=True, cast=bool)
+# Research text extraction (content.documents) runs after commit in the process that saved the file,
+# which can read it whatever the storage; True queues a job instead, for workers sharing that storage
+RESEARCH_EXTRACT_ASYNC = config('RESEARCH_EXTRACT_ASYNC', default=False, cast=bool)
+JOB_RETRY_BACKOFF = 30  # seconds before the first retry, doubled per attempt
+JOB_RETRY_BACKOFF_MAX = 3600
+JOB_LOCK_TIMEOUT = 15 * 60  # requeue jobs whose worker stopped responding
+
+# Pre-rendered public API (content.export, `manage.py export_static`), served
+# from STATIC_EXPORT_URL by content.middleware.StaticExportMiddleware
+STATIC_EXPORT_ROOT = config('STATIC_EXPORT_ROOT', default=os.path.join(BASE_DIR, 'export'))
+STATIC_EXPORT_URL = '/static-api/'
+STATIC_EXPORT_MAX_AGE = 60
+# Queue an incremental export job whenever published content changes
+STATIC_EXPORT_ON_SAVE = config('STATIC_EXPORT_ON_SAVE', default=False, cast=bool)
+# RSS/Atom feeds and sitemaps (content.syndication), written with the export and
+# also served at /feeds/, /sitemaps/ and /sitemap.xml. Entries link to the
+# frontend's pages; SYNDICATION_URL is where this backend is reachable.
+SITE_NAME = 'ZRCP'
+SITE_URL = config('SITE_URL', default='https://zrcp.or.tz')
+SITE_ITEM_PATHS = {'blogs': '/blogs/{slug}', 'research': '/research/{slug}'}
+SYNDICATION_URL = config('SYNDICATION_URL', default='https://zrcp-backend.onrender.com')
+SYNDICATION_FEED_SIZE = 50  # newest entries per feed
 # MEDIA_URL = '/media/'  # This will be served by Cloudinary
 
 # For production, use S3 or similar for media files
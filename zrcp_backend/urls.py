@@ -2,9 +2,11 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .instrumentation import StatsView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("api/_stats/", StatsView.as_view(), name="request-stats"),
     path("api/", include("content.api_urls")),
 ]
 